@@ -1,8 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import chatbot, focus_ws, focus_score
+from app.routers import admin, chatbot, focus_ws, focus_score, focus_offline, focus_history, metrics
+from app.services.inference_workers import start_inference_workers, stop_inference_workers
+from app.services.session_store import start_session_store, stop_session_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Inference worker processes (only if FOCUS_INFERENCE_WORKERS > 0)
+    start_inference_workers()
+    # Session history in SQLite (only if FOCUS_DB_PATH is set)
+    start_session_store()
+    yield
+    stop_inference_workers()
+    stop_session_store()
+
 
-app = FastAPI(title="STUDY BUDDY API")
+app = FastAPI(title="STUDY BUDDY API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,6 +31,10 @@ app.add_middleware(
 app.include_router(chatbot.router, prefix="/api", tags=["chat"])
 app.include_router(focus_ws.router)
 app.include_router(focus_score.router, prefix="/api")
+app.include_router(focus_offline.router, prefix="/api")
+app.include_router(focus_history.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 
 @app.get("/api/health")
@@ -0,0 +1,80 @@
+# backend/app/routers/admin.py
+import asyncio
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from ..services.profiler import (
+    PROFILE_MAX_HZ,
+    PROFILE_MAX_SECONDS,
+    TRACE_MAX_FRAMES,
+    collect_profile,
+    get_trace,
+    start_trace,
+    stop_trace,
+)
+
+# Shared secret for the admin endpoints (X-Admin-Token header). Unset = the
+# endpoints don't exist.
+FOCUS_ADMIN_TOKEN = os.getenv("FOCUS_ADMIN_TOKEN", "")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not FOCUS_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, FOCUS_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Bad admin token")
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    hz: float = Query(100.0, gt=0, le=PROFILE_MAX_HZ),
+    all_threads: bool = False,
+) -> str:
+    """
+    Sample this process for `seconds` and return collapsed stacks, e.g.
+
+        curl -H "X-Admin-Token: $TOKEN" "localhost:8000/api/admin/profile?seconds=30" > out.folded
+        flamegraph.pl out.folded > out.svg
+
+    Stacks start with stage=...;session=... for frame-path work. With
+    inference workers the detectors run in other processes and aren't sampled.
+    """
+    folded = await asyncio.to_thread(collect_profile, seconds, hz, all_threads)
+    if folded is None:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return folded
+
+
+@router.post("/trace/{session_id}")
+def start_session_trace(session_id: str, frames: int = Query(50, ge=1, le=TRACE_MAX_FRAMES)) -> dict:
+    """Record per-stage timings for the next `frames` frames of one session."""
+    start_trace(session_id, frames)
+    return get_trace(session_id)
+
+
+@router.get("/trace/{session_id}")
+def read_session_trace(session_id: str) -> dict:
+    trace = get_trace(session_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="No trace for this session")
+    return trace
+
+
+@router.delete("/trace/{session_id}")
+def end_session_trace(session_id: str) -> dict:
+    trace = stop_trace(session_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="No trace for this session")
+    return trace
@@ -0,0 +1,71 @@
+# backend/app/routers/focus_history.py
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from ..services.session_store import get_session_store
+
+router = APIRouter(
+    prefix="/focus/history",
+    tags=["focus-history"],
+)
+
+
+class SessionSummary(BaseModel):
+    session_id: str
+    user_id: Optional[str] = None
+    started_at: float  # unix time
+    ended_at: Optional[float] = None  # None while the session is still going
+    duration_seconds: float
+    frames: int
+    phone: int
+    tired: int
+    fidgety: int
+    away: int
+    away_seconds: float
+    focus_score: float
+
+
+class MinuteRollup(BaseModel):
+    minute: int  # unix time of the start of the minute
+    frames: int
+    phone: int
+    tired: int
+    fidgety: int
+    away: int
+    away_seconds: float
+    focus_score: float
+
+
+class SessionDetail(SessionSummary):
+    minutes: List[MinuteRollup]
+
+
+def _store():
+    store = get_session_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Session history is disabled (FOCUS_DB_PATH unset)")
+    return store
+
+
+@router.get("", response_model=List[SessionSummary])
+def list_sessions(
+    user_id: str,
+    limit: int = Query(20, ge=1, le=200),
+    before: Optional[float] = None,
+) -> List[SessionSummary]:
+    """
+    A user's past sessions, newest first. Pass the last `started_at` you got
+    as `before` to page further back.
+    """
+    return [SessionSummary(**s) for s in _store().list_sessions(user_id, limit=limit, before=before)]
+
+
+@router.get("/{session_id}", response_model=SessionDetail)
+def get_session(session_id: str) -> SessionDetail:
+    """One session with its per-minute rollups, for charts."""
+    session = _store().get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return SessionDetail(**session)
@@ -0,0 +1,144 @@
+# backend/app/routers/focus_offline.py
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from pydantic import BaseModel
+import asyncio
+
+from .focus_score import FocusSummary
+from ..services.offline_analysis import (
+    OFFLINE_CHUNK_SECONDS,
+    OFFLINE_MAX_UPLOAD_MB,
+    OFFLINE_SAMPLE_FPS,
+    analyze_image_chunk,
+    analyze_video_chunk,
+    create_job,
+    get_job,
+    plan_image_chunks,
+    plan_video_chunks,
+    start_job,
+)
+
+router = APIRouter(
+    prefix="/focus/analyze",
+    tags=["focus-offline"],
+)
+
+# Uploads are copied to disk in pieces this big, never held in memory whole
+_UPLOAD_CHUNK_BYTES = 1 << 20
+
+
+class AnalysisJobStatus(BaseModel):
+    job_id: str
+    status: str  # queued / running / done / cancelled / failed
+    progress: float  # 0–1
+    chunks_done: int
+    chunks_total: int
+    frames_processed: int
+    error: Optional[str] = None
+    summary: Optional[FocusSummary] = None  # same shape as /focus/summary, once done
+
+
+def _job_status(job) -> AnalysisJobStatus:
+    return AnalysisJobStatus(
+        job_id=job.id,
+        status=job.status,
+        progress=job.progress,
+        chunks_done=job.chunks_done,
+        chunks_total=job.chunks_total,
+        frames_processed=job.frames_processed,
+        error=job.error,
+        summary=FocusSummary(**job.summary) if job.summary else None,
+    )
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+async def _save_upload(upload: UploadFile, dest: Path, max_bytes: int) -> int:
+    """Copy an upload to `dest` without blocking the event loop; returns its size."""
+    written = 0
+    out = await asyncio.to_thread(open, dest, "wb")
+    try:
+        while True:
+            chunk = await upload.read(_UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise UploadTooLarge()
+            await asyncio.to_thread(out.write, chunk)
+    finally:
+        await asyncio.to_thread(out.close)
+    return written
+
+
+@router.post("", response_model=AnalysisJobStatus, status_code=202)
+async def start_analysis(
+    files: List[UploadFile] = File(...),
+    sample_fps: float = OFFLINE_SAMPLE_FPS,
+    chunk_seconds: float = OFFLINE_CHUNK_SECONDS,
+) -> AnalysisJobStatus:
+    """
+    Analyze a recorded study video (one file) or a batch of images (in upload
+    order, treated as frames 1 / sample_fps seconds apart) in the background.
+    Poll GET /focus/analyze/{job_id} for progress and the final summary.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    if sample_fps <= 0 or chunk_seconds <= 0:
+        raise HTTPException(status_code=400, detail="sample_fps and chunk_seconds must be positive")
+
+    all_images = all((f.content_type or "").startswith("image/") for f in files)
+    if not all_images and len(files) != 1:
+        raise HTTPException(status_code=400, detail="Upload either one video or only images")
+
+    job = create_job(sample_fps=sample_fps, chunk_seconds=chunk_seconds)
+    # Shared by all files of the job
+    budget = int(OFFLINE_MAX_UPLOAD_MB * (1 << 20))
+
+    try:
+        if all_images:
+            paths = []
+            for i, upload in enumerate(files):
+                dest = job.workdir / f"{i:06d}{Path(upload.filename or '').suffix}"
+                budget -= await _save_upload(upload, dest, budget)
+                paths.append(str(dest))
+            chunk_fn, chunk_args = analyze_image_chunk, plan_image_chunks(job, paths)
+        else:
+            dest = job.workdir / f"video{Path(files[0].filename or '').suffix}"
+            await _save_upload(files[0], dest, budget)
+            chunk_fn = analyze_video_chunk
+            chunk_args = await asyncio.to_thread(plan_video_chunks, job, str(dest))
+    except UploadTooLarge:
+        job.status = "failed"
+        job.error = f"Upload larger than {OFFLINE_MAX_UPLOAD_MB:g} MB"
+        job.cleanup()
+        raise HTTPException(status_code=413, detail=job.error)
+    except ValueError as e:
+        job.status = "failed"
+        job.error = str(e)
+        job.cleanup()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    start_job(job, chunk_fn, chunk_args)
+    return _job_status(job)
+
+
+@router.get("/{job_id}", response_model=AnalysisJobStatus)
+def get_analysis(job_id: str) -> AnalysisJobStatus:
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return _job_status(job)
+
+
+@router.delete("/{job_id}", response_model=AnalysisJobStatus)
+def cancel_analysis(job_id: str) -> AnalysisJobStatus:
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    job.cancel()
+    return _job_status(job)
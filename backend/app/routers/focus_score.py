@@ -1,77 +1,84 @@
 # backend/app/routers/focus_score.py
 from fastapi import APIRouter
 from pydantic import BaseModel
-from typing import List,Tuple
+from typing import Dict, List, Optional
+
+from ..services.session_state import ALL_SESSIONS, get_session_state
 
 router = APIRouter(
     prefix="/focus",
     tags=["focus-summary"],
 )
 
-# --- simple global counters (per server process) -----------------
-phone_count = 0
-tired_count = 0
-fidgety_count = 0
-focus_timeline: List[Tuple[float, float]] = []
-time_counter: float = 0.0
-
+# Counters live in the session-state backend (in-process, or shared by
+# every worker, see FOCUS_STATE_BACKEND)
 
 class FocusSummary(BaseModel):
     phone: int
     tired: int
     fidgety: int
+    away: int
+    away_seconds: float
     focus_score: float
     focus_timeline: List[List[float]]
 
-
-def update_focus_counters(*, phone: bool, tired: bool, fidgety: bool, focus_score: float) -> None:
+    # Kept up to date per frame (see FocusAnalytics); durations in seconds.
+    # Durations, streaks and causes are per session: null in the overall summary.
+    focus_histogram: List[int]  # frames per 0.1-wide focus-score bin
+    focused_seconds: Optional[float]
+    distracted_seconds: Optional[float]
+    longest_focused_streak_s: Optional[float]
+    longest_distracted_streak_s: Optional[float]
+    current_streak_state: Optional[str]  # "focused" / "distracted" / "away"
+    current_streak_s: Optional[float]
+    time_to_first_distraction_s: Optional[float]
+    distraction_seconds: Optional[Dict[str, float]]  # per cause: phone / tired / fidgety
+    rolling_focus: Dict[str, Optional[float]]  # "1m" / "5m" / "15m" average focus score
+
+
+def update_focus_counters(
+    session_id: str = ALL_SESSIONS,
+    *,
+    phone: bool,
+    tired: bool,
+    fidgety: bool,
+    focus_score: float,
+    away: bool = False,
+    away_seconds: float = 0.0,
+    t: Optional[float] = None,
+) -> None:
     """
-    Called from the WebSocket router for each processed frame.
-    Increments the global counters when a condition is true.
+    Called from the WebSocket router for each processed frame, on the event
+    loop: never waits on disk (the SQLite backend just queues the frame).
+    Increments the session's (and the overall) counters when a condition is true.
     """
-    global phone_count, tired_count, fidgety_count, focus_timeline, time_counter
-
-    # ranked by priority. Ex: If all true, only phone notification is displayed
-    if phone:
-        phone_count += 1
-    if tired:
-        tired_count += 1
-    if fidgety:
-        fidgety_count += 1
-
-    focus_timeline.append((time_counter, focus_score))
-    time_counter += 1.0 
-
+    get_session_state().update(
+        session_id,
+        phone=phone,
+        tired=tired,
+        fidgety=fidgety,
+        focus_score=focus_score,
+        away=away,
+        away_seconds=away_seconds,
+        t=t,
+    )
 
 
 @router.get("/summary", response_model=FocusSummary)
-def get_focus_summary(reset: bool = False) -> FocusSummary:
+def get_focus_summary(reset: bool = False, session_id: Optional[str] = None, timeline: bool = True) -> FocusSummary:
     """
-    Returns how many times phone/tired/fidgety were true overall.
-    If reset=true, also clears the counters after returning them.
+    Returns how many times phone/tired/fidgety were true for one session
+    (or overall, without session_id), plus how many frames / seconds the
+    student was away from the desk, and streaks / histogram / rolling
+    averages. With timeline=false the per-frame timeline is left out, and
+    the answer takes the same time however long the session ran.
+    If reset=true, also clears those counters after returning them.
     """
-    global phone_count, tired_count, fidgety_count, focus_timeline, time_counter
-
-    # calculate average focus score using average of all frames
-    if focus_timeline:
-        avg_focus = sum(score for _, score in focus_timeline) / len(focus_timeline)
-    else:
-        avg_focus = 0.0
-
-    summary = FocusSummary(
-        focus_score=avg_focus,
-        phone=phone_count,
-        tired=tired_count,
-        fidgety=fidgety_count,
-        focus_timeline=[[t, s] for (t, s) in focus_timeline],  # convert tuples to lists
-    )
+    state = get_session_state()
+    key = session_id or ALL_SESSIONS
+    summary = FocusSummary(**state.summary(key, timeline))
 
     if reset:
-        phone_count = 0
-        tired_count = 0
-        fidgety_count = 0
-        focus_timeline = []
-        time_counter = 0.0
+        state.reset(key)
 
     return summary
-
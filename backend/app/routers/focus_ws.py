@@ -1,49 +1,40 @@
 # app/routers/focus_ws.py
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import cv2
 import numpy as np
-import base64
 import json
-
-from ..services.phone_detection import detect_phone
-from ..services.tired_detection import detect_tired
-from ..services.fidgety_detection import detect_fidgety
-from ..services.focus_score_calculator import calculate_focus_score
+import re
+import uuid
+
+from ..services.focus_session import FocusSession
+from ..services.inference_workers import get_inference_workers
+from ..services.frame_pipeline import FOCUS_LANDMARKS_MAX_HZ, FramePipeline
+from ..services.load_control import get_load_controller
+from ..services.session_store import get_session_store
+from ..services.session_routing import owner_url, redirect_url
+from ..services.profiler import stage_tag
+from ..services.video_ingest import stream_format
+from ..services.result_encoding import negotiate_encoder
+from ..services.landmark_adapter import FACE_INDICES, HAND_INDICES, POSE_INDICES, parse_client_landmarks
 from ..routers.focus_score import update_focus_counters
 
 
 
 router = APIRouter()
 
+# Close code telling the client to reconnect to the URL it was just sent
+REDIRECT_CLOSE_CODE = 4307
+
+# Client-chosen session ids end up in file names (recordings) and routing
+# keys, so only plain ids are accepted
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
 
-def detect_focus(frame: np.ndarray):
+def detect_focus(frame: np.ndarray, session: FocusSession):
     """
     Run all 3 detectors + focus score on a single frame.
     Returns a plain dict that can be sent over WebSocket as JSON.
     """
-    phone_res = detect_phone(frame)
-    tired_res = detect_tired(frame)
-    fidgety_res = detect_fidgety(frame)
-    focus_res = calculate_focus_score(frame)
-
-    return {
-        "type": "focus_result",
-
-        # Notifications 
-        "phone": phone_res.phone_detected,
-        "phone_confidence": phone_res.confidence,
-
-        "tired": tired_res.is_tired,
-        "tired_score": tired_res.score,  # 0–1
-
-        "fidgety": fidgety_res.is_fidgety,
-        "fidgety_score": fidgety_res.movement_score,  # 0–1
-
-        #  overall focus info
-        "focus_score": focus_res.focus_score,  # 0–1
-        "is_focused": focus_res.is_focused,
-    }
-    
+    return session.process(frame)
 
 
 @router.websocket("/ws/focus")
@@ -51,52 +42,188 @@ async def websocket_focus(websocket: WebSocket):
     # Accept the WebSocket connection
     await websocket.accept()
     print("Client connected to /ws/focus")
-    
 
+    # With several instances, a session always runs on the same one (its
+    # detectors are stateful). Ids we make up ourselves just stay here.
+    requested_id = websocket.query_params.get("session_id")
+    if requested_id is not None and not _SESSION_ID_RE.match(requested_id):
+        await websocket.send_json({"type": "rejected", "reason": "invalid_session_id"})
+        await websocket.close(code=1008, reason="Invalid session_id")
+        return
+    target = redirect_url(requested_id) if requested_id else None
+    if target is not None:
+        url = f"{target}/ws/focus?{websocket.url.query}"
+        await websocket.send_json({"type": "redirect", "url": url})
+        await websocket.close(code=REDIRECT_CLOSE_CODE, reason="Session lives on another instance")
+        return
+
+    # Admission control: when this node is full (or too slow even after
+    # degrading), tell the client to come back later instead of making
+    # every session worse
+    load = get_load_controller()
+    if not load.try_admit():
+        retry_after = load.retry_after_s()
+        print(f"Rejecting /ws/focus client, retry in {retry_after}s")
+        await websocket.send_json({"type": "rejected", "reason": "overloaded", "retry_after": retry_after})
+        await websocket.close(code=1013, reason=f"Server busy, retry after {retry_after}s")
+        return
+
+    # Per-connection detector state, so one student's session doesn't affect another.
+    # With inference workers it lives in the worker this session is pinned to.
+    session_id = requested_id or uuid.uuid4().hex
+    user_id = websocket.query_params.get("user_id")
+    workers = get_inference_workers()
+    session = None
+    store = None
+    pipeline = None
+
+    # Everything from here on runs under the finally below, so the admission
+    # slot is given back even if setting the session up fails
     try:
+        if workers is None:
+            session = FocusSession(session_id)
+            await session.open()
+
+        # Session history; every store call just queues, so nothing here waits on disk
+        store = get_session_store()
+        if store is not None:
+            store.start_session(session_id, user_id)
+
+        # How focus results are sent: ?encoding=json|struct&fields=phone,tired,...
+        # Without either, every field as JSON like always.
+        encoding = websocket.query_params.get("encoding")
+        fields = websocket.query_params.get("fields")
+        encoder = negotiate_encoder(encoding, fields)
+        if encoding or fields:
+            await websocket.send_json(encoder.describe())
+
+        async def deliver(json_response: dict) -> None:
+            # Everything up to the send is synchronous, so the profiler can
+            # attribute it (counters, JSON encoding) to this session
+            with stage_tag("deliver", session_id):
+                # storing stats for the final session stats
+                update_focus_counters(
+                    session_id,
+                    phone=json_response["phone"],
+                    tired=json_response["tired"],
+                    fidgety=json_response["fidgety"],
+                    focus_score=json_response["focus_score"],
+                    away=json_response["away"],
+                    away_seconds=json_response["away_seconds"],
+                )
+                if store is not None:
+                    store.record_frame(session_id, json_response)
+                # Only the fields this client subscribed to
+                payload = encoder.encode(json_response)
+
+            # Send result back to client (frontend to be parsed)
+            if encoder.binary:
+                await websocket.send_bytes(payload)
+            else:
+                await websocket.send_text(payload)
+
+        # decode -> detectors -> send run as separate stages, see FramePipeline
+        pipeline = FramePipeline(session_id, deliver, session=session, workers=workers)
+        pipeline.start()
+
         while True:
-            # Wait for a text message from the client
-            msg = await websocket.receive_text()
+            # Text messages are JSON, binary ones are video stream chunks
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            chunk = message.get("bytes")
+            if chunk is not None:
+                if pipeline.stream is None:
+                    continue
+                await pipeline.put_chunk(chunk)
+                if pipeline.stream.error is not None:
+                    # Undecodable stream: have the client send stills instead
+                    print(f"Stream failed for {session_id}, falling back to frames")
+                    pipeline.stop_stream()
+                    await websocket.send_json({"type": "stream_unsupported", "reason": "decode_error"})
+                continue
 
             # Expect JSON like: { "type": "frame", "image": "<base64>" }
             try:
-                data = json.loads(msg)
+                data = json.loads(message.get("text") or "")
             except json.JSONDecodeError:
                 print("Received non-JSON message")
                 continue
 
-            if data.get("type") != "frame":
-                # Ignore unknown message types
+            if data.get("type") == "stream_start":
+                # { "type": "stream_start", "mime": "video/webm;codecs=vp8" },
+                # then binary chunks starting with the container header
+                fmt = stream_format(str(data.get("mime", "")))
+                if fmt is None:
+                    await websocket.send_json({"type": "stream_unsupported", "reason": "format"})
+                else:
+                    pipeline.start_stream(fmt)
+                    await websocket.send_json({"type": "stream_ready"})
                 continue
 
-            base64_image = data.get("image")
-            if not base64_image:
+            if data.get("type") == "landmarks":
+                # Rate limit first: only messages that will be analysed get parsed
+                if not pipeline.accept_landmarks():
+                    continue
+                try:
+                    landmarks = parse_client_landmarks(data)
+                except ValueError as e:
+                    await websocket.send_json({"type": "landmarks_rejected", "reason": str(e)})
+                    continue
+                await pipeline.put_landmarks(landmarks)
                 continue
 
-            try:
-                # Decode base64 -> bytes -> np array -> OpenCV image
-                img_bytes = base64.b64decode(base64_image)
-                np_img = np.frombuffer(img_bytes, np.uint8)
-                frame = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
+            if data.get("type") == "landmarks_start":
+                # The client runs MediaPipe itself and sends landmarks; frames
+                # are still wanted, rarely, for presence and phone detection
+                if pipeline.start_landmarks():
+                    await websocket.send_json({
+                        "type": "landmarks_ready",
+                        "face_indices": list(FACE_INDICES),
+                        "pose_indices": list(POSE_INDICES),
+                        "hand_indices": list(HAND_INDICES),
+                        "max_hz": FOCUS_LANDMARKS_MAX_HZ,
+                        "frame_interval_ms": pipeline.frame_interval_ms(),
+                    })
+                else:
+                    await websocket.send_json({"type": "landmarks_unsupported", "reason": "inference_workers"})
+                continue
 
-                ###NOW: RETURN THE OPENCV FOCUS DETECTION RESULT
-                json_response = detect_focus(frame)
+            if data.get("type") == "landmarks_stop":
+                pipeline.stop_landmarks()
+                continue
 
-                # storing stats for the final session stats
-                update_focus_counters(
-                    phone=json_response["phone"],
-                    tired=json_response["tired"],
-                    fidgety=json_response["fidgety"],
-                    focus_score=json_response["focus_score"],
-                )
+            if data.get("type") != "frame":
+                # Ignore unknown message types
+                continue
 
-                # Send result back to client (frontend to be parsed)
-                await websocket.send_json(json_response)
+            base64_image = data.get("image")
+            if not base64_image:
+                continue
 
-            except Exception as e:
-                print(f"Error processing frame: {e}")
+            # Blocks while the pipeline is full, so we stop reading the socket
+            await pipeline.put(base64_image)
 
     except WebSocketDisconnect:
         print("Client disconnected from /ws/focus")
     except Exception as e:
         print(f"WebSocket error: {e}")
+    finally:
+        if pipeline is not None:
+            await pipeline.stop()
+        load.release()
+        if store is not None:
+            store.end_session(session_id)
+
+        # Hand the Holistic instance back to the pool for the next session
+        if workers is not None:
+            workers.close_session(session_id)
+        elif session is not None:
+            session.close()
+
+
+@router.get("/api/focus/route")
+async def route_session(session_id: str) -> dict:
+    """Which instance to open /ws/focus on for this session ("" = this one)."""
+    return {"session_id": session_id, "url": owner_url(session_id)}
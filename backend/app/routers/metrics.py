@@ -0,0 +1,32 @@
+# backend/app/routers/metrics.py
+from fastapi import APIRouter
+
+from ..services.holistic_pool import get_holistic_pool
+from ..services.inference_workers import get_inference_workers
+from ..services.frame_pipeline import pipeline_stats
+from ..services.load_control import get_load_controller
+from ..services.session_store import get_session_store
+from ..services.session_routing import routing_stats
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+)
+
+
+@router.get("")
+async def get_metrics() -> dict:
+    """
+    Process-level resource stats for whoever is watching this node.
+    """
+    workers = get_inference_workers()
+    store = get_session_store()
+    return {
+        # With inference workers, Holistic lives in the worker processes instead
+        "holistic_pool": get_holistic_pool().stats() if workers is None else None,
+        "inference_workers": workers.stats() if workers is not None else None,
+        "load": get_load_controller().stats(),
+        "pipelines": pipeline_stats(),
+        "session_store": store.stats() if store is not None else None,
+        "routing": routing_stats(),
+    }
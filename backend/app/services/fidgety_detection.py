@@ -3,10 +3,11 @@ from dataclasses import dataclass
 from typing import Optional
 
 import cv2
-import mediapipe as mp
 import numpy as np
 
-from face_state import FaceStateCalculator  
+from face_state import FaceStateCalculator
+
+from .holistic_pool import build_holistic
 
 
 @dataclass
@@ -15,18 +16,26 @@ class FidgetyDetectionResult:
     movement_score: float  # 0–1 (1 = very fidgety)
 
 
+# Floor for movement_score once the fidgety trigger fires
+# (module-level so tools/rescore.py can try other values)
+FIDGETY_MIN_MOVEMENT_SCORE = 0.7
+
+
 # ---------- GLOBAL ANALYZER + MEDIAPIPE HOLISTIC (stateful) ---------- #
 
 # This analyzer keeps state across frames (hand velocity history, etc.)
 _analyzer = FaceStateCalculator()
 
-_mp_holistic = mp.solutions.holistic
-_holistic = _mp_holistic.Holistic(
-    model_complexity=0,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5,
-    refine_face_landmarks=True,
-)
+# Built on first use, so importing the assess_* helpers (sessions, the
+# rescoring tool) doesn't build a Holistic graph nobody runs.
+_holistic = None
+
+
+def _get_holistic():
+    global _holistic
+    if _holistic is None:
+        _holistic = build_holistic()
+    return _holistic
 
 
 def detect_fidgety(frame: np.ndarray) -> FidgetyDetectionResult:
@@ -47,11 +56,19 @@ def detect_fidgety(frame: np.ndarray) -> FidgetyDetectionResult:
 
     # MediaPipe expects RGB
     frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = _holistic.process(frame_rgb)
+    results = _get_holistic().process(frame_rgb)
 
     # Update analyzer with new frame
     _analyzer.update(results, img_h, img_w)
-    feedback = _analyzer.get_feedback()
+
+    return assess_fidgety(_analyzer)
+
+
+def assess_fidgety(analyzer: FaceStateCalculator) -> FidgetyDetectionResult:
+    """
+    Fidgetiness from an analyzer that has already been updated with this frame.
+    """
+    feedback = analyzer.get_feedback()
 
     # Defaults
     is_fidgety = False
@@ -73,8 +90,8 @@ def detect_fidgety(frame: np.ndarray) -> FidgetyDetectionResult:
             is_fidgety = True
 
             # Ensure fidgety cases get a noticeably high movement_score
-            if movement_score < 0.7:
-                movement_score = 0.7
+            if movement_score < FIDGETY_MIN_MOVEMENT_SCORE:
+                movement_score = FIDGETY_MIN_MOVEMENT_SCORE
 
     return FidgetyDetectionResult(
         is_fidgety=is_fidgety,
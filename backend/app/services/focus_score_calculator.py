@@ -7,6 +7,13 @@ from .tired_detection import detect_tired, TiredDetectionResult
 from .fidgety_detection import detect_fidgety, FidgetyDetectionResult
 
 
+# Weights / threshold (module-level so tools/rescore.py can try other values)
+PHONE_PENALTY = 0.5
+TIRED_WEIGHT = 0.3
+FIDGETY_WEIGHT = 0.2
+FOCUSED_THRESHOLD = 0.6
+
+
 @dataclass
 class FocusScoreResult:
     focus_score: float     # 0–1
@@ -26,20 +33,32 @@ def calculate_focus_score(frame: np.ndarray) -> FocusScoreResult:
     tired_res = detect_tired(frame)
     fidgety_res = detect_fidgety(frame)
 
+    return combine_focus_score(phone_res, tired_res, fidgety_res)
+
+
+def combine_focus_score(
+    phone_res: PhoneDetectionResult,
+    tired_res: TiredDetectionResult,
+    fidgety_res: FidgetyDetectionResult,
+) -> FocusScoreResult:
+    """
+    Turn detector results that were already computed into a focus score,
+    so callers that ran the detectors themselves don't run them twice.
+    """
     # Start from perfect focus = 1.0
     score = 1.0
 
     # Subtract penalties
     if phone_res.phone_detected:
-        score -= 0.5  # Big penalty for phone
-    score -= 0.3 * tired_res.score
-    score -= 0.2 * fidgety_res.movement_score
+        score -= PHONE_PENALTY  # Big penalty for phone
+    score -= TIRED_WEIGHT * tired_res.score
+    score -= FIDGETY_WEIGHT * fidgety_res.movement_score
 
     # Clip to [0, 1]
     score = max(0.0, min(1.0, score))
 
     # Decide a binary focus flag (you can tune this threshold)
-    is_focused = score >= 0.6
+    is_focused = score >= FOCUSED_THRESHOLD
 
     return FocusScoreResult(
         focus_score=score,
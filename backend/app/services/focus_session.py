@@ -0,0 +1,371 @@
+# backend/services/focus_session.py
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from face_state import FaceStateCalculator
+
+from .focus_score_calculator import combine_focus_score
+from .phone_detection import PhoneTracker, PhoneDetectionResult
+from .tired_detection import assess_tired, TiredDetectionResult
+from .fidgety_detection import assess_fidgety, FidgetyDetectionResult
+from .presence_detection import PresenceGate, PresenceDetectionResult
+from .holistic_pool import HolisticPool, HolisticLease, get_holistic_pool
+from .session_recorder import SessionRecorder, open_recorder
+from .load_control import DegradationSettings
+from .frame_scheduler import FrameScheduler, SIGNAL_PHONE, SIGNAL_POSTURE, SIGNALS
+from .profiler import tagged
+from .holistic_roi import FOCUS_HOLISTIC_ROI, RoiTracker
+from .landmark_adapter import ClientLandmarks
+
+
+def away_result(presence_res: PresenceDetectionResult) -> dict:
+    """focus_result for a frame where the student is away from the desk."""
+    return {
+        "type": "focus_result",
+        "away": True,
+        "away_seconds": presence_res.away_seconds,
+        "phone": False,
+        "phone_confidence": 0.0,
+        "phone_source": "detection",
+        "tired": False,
+        "tired_score": 0.0,
+        "fidgety": False,
+        "fidgety_score": 0.0,
+        "focus_score": 0.0,
+        "is_focused": False,
+    }
+
+
+def focus_result(
+    phone_res: PhoneDetectionResult,
+    tired_res: TiredDetectionResult,
+    fidgety_res: FidgetyDetectionResult,
+) -> dict:
+    """Score the detector results and build the focus_result dict."""
+    focus_res = combine_focus_score(phone_res, tired_res, fidgety_res)
+
+    return {
+        "type": "focus_result",
+        "away": False,
+        "away_seconds": 0.0,
+
+        # Notifications
+        "phone": phone_res.phone_detected,
+        "phone_confidence": phone_res.confidence,
+        "phone_source": phone_res.source,  # "detection" or "tracking"
+
+        "tired": tired_res.is_tired,
+        "tired_score": tired_res.score,  # 0–1
+
+        "fidgety": fidgety_res.is_fidgety,
+        "fidgety_score": fidgety_res.movement_score,  # 0–1
+
+        #  overall focus info
+        "focus_score": focus_res.focus_score,  # 0–1
+        "is_focused": focus_res.is_focused,
+    }
+
+
+class FocusSession:
+    """
+    All the per-connection detector state for one study session.
+
+    Holistic and FaceStateCalculator both track state across frames, so each
+    session gets its own analyzer and checks a Holistic instance out of the
+    shared pool for as long as it is connected.
+
+    The analyzer runs on a per-frame clock (the time the frame started
+    processing), which is also what gets recorded, so a replay through
+    tools/rescore.py sees exactly the timings the live session saw.
+
+    With a frame budget set, a FrameScheduler picks which detectors refresh
+    on each frame; the others carry their last result forward, and every
+    result says how old each signal is (phone_age_s, tired_age_s, ...).
+
+    With client_landmarks set, the browser runs MediaPipe and sends its
+    landmarks (process_landmarks); frames then only feed presence and phone
+    detection, and the session gives its Holistic instance back to the pool.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        holistic_pool: Optional[HolisticPool] = None,
+        recorder: Optional[SessionRecorder] = None,
+        start_t: Optional[float] = None,
+        frame_budget_ms: Optional[float] = None,
+    ):
+        self.session_id = session_id
+        self.presence = PresenceGate()
+        self.phone_tracker = PhoneTracker()
+
+        # Offline analysis passes video time here and to process(t=...)
+        self._frame_t = time.time() if start_t is None else start_t
+        self._start_t = self._frame_t
+        self._presence_t: Optional[float] = None
+        self.analyzer = FaceStateCalculator(clock=self._frame_clock)
+
+        self._pool = holistic_pool or get_holistic_pool()
+        self._lease: Optional[HolisticLease] = None
+
+        # Where in the frame to point Holistic (None = always the full frame)
+        self.roi = RoiTracker() if FOCUS_HOLISTIC_ROI else None
+
+        # Set per frame from the LoadController when the node is overloaded
+        self.degradation = DegradationSettings()
+        self._phone_frames = 0
+        self._last_phone = PhoneDetectionResult(phone_detected=False)
+
+        # Which detectors refresh on this frame; the rest reuse these
+        self.scheduler = (
+            FrameScheduler() if frame_budget_ms is None else FrameScheduler(frame_budget_ms)
+        )
+        self._plan = set(SIGNALS)
+        self._last_tired = TiredDetectionResult(is_tired=False, score=0.0)
+        self._last_fidgety = FidgetyDetectionResult(is_fidgety=False, movement_score=0.0)
+
+        # Only set when FOCUS_RECORD_DIR is configured
+        self._recorder = recorder or open_recorder(session_id, start_t=self._frame_t)
+        self._last_results = None
+
+        # Where the last frame's time went (ms), for per-session traces
+        self.timings: Dict[str, float] = {}
+
+        # Posture comes from landmarks the client extracted itself
+        self.client_landmarks = False
+
+    async def open(self) -> None:
+        """Check out a Holistic instance (may wait, or come back empty)."""
+        self._lease = await self._pool.acquire(self.session_id)
+        self._report_lease()
+
+    def open_blocking(self) -> None:
+        """Same as open(), for callers without an event loop (worker processes)."""
+        self._lease = self._pool.acquire_blocking(self.session_id, self._pool.wait_s)
+        self._report_lease()
+
+    def _report_lease(self) -> None:
+        if self._lease is None:
+            print(f"[focus_session] {self.session_id}: Holistic pool exhausted, running degraded")
+
+    def close(self) -> None:
+        self._pool.release(self._lease)
+        self._lease = None
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    @property
+    def degraded(self) -> bool:
+        return self._lease is None or self._lease.revoked
+
+    # ------------------------ per-frame entry ------------------------
+
+    def process(self, frame: np.ndarray, t: Optional[float] = None) -> dict:
+        """
+        Run presence, phone and Holistic-based detectors + focus score on one
+        frame and return the focus_result dict sent to the client.
+
+        If nobody has been at the desk for a while, the heavy detectors are
+        skipped and an "away" result is returned instead. `t` is the frame's
+        timestamp in seconds; leave it out for live frames (wall clock).
+        """
+        self._begin_frame(t)
+
+        presence_res = self.check_presence(frame)
+        if presence_res.away:
+            self._record_frame(*frame.shape[:2])
+            return self._with_ages(away_result(presence_res))
+
+        self._plan_frame(parallel=False)
+        phone_res = self.detect_phone(frame)
+        tired_res, fidgety_res = self.detect_posture(frame)
+        self._record_frame(*frame.shape[:2], phone_res)
+        return self._with_ages(focus_result(phone_res, tired_res, fidgety_res))
+
+    async def process_async(self, frame: np.ndarray) -> dict:
+        """
+        Same as process(), but YOLO and Holistic (which don't depend on each
+        other) run at the same time in worker threads. Both release the GIL
+        for the heavy lifting, so this overlaps for real.
+        """
+        self._begin_frame()
+
+        check_presence = tagged("presence", self.session_id, self.check_presence)
+        presence_res = await asyncio.to_thread(check_presence, frame)
+        if presence_res.away:
+            self._record_frame(*frame.shape[:2])
+            return self._with_ages(away_result(presence_res))
+
+        self._plan_frame(parallel=True)
+        phone_res, (tired_res, fidgety_res) = await asyncio.gather(
+            self._refresh_async(SIGNAL_PHONE, self.detect_phone, frame),
+            self._refresh_async(SIGNAL_POSTURE, self.detect_posture, frame),
+        )
+        self._record_frame(*frame.shape[:2], phone_res)
+        return self._with_ages(focus_result(phone_res, tired_res, fidgety_res))
+
+    def process_landmarks(self, landmarks: ClientLandmarks, t: Optional[float] = None) -> dict:
+        """
+        focus_result for landmarks the client extracted itself. Only the
+        analyzer runs; phone detection carries forward from the last frame.
+        """
+        self._begin_frame(t)
+
+        presence_res = self.presence.observe(landmarks.present, self._presence_t)
+        if presence_res.away:
+            self._record_frame(landmarks.img_h, landmarks.img_w)
+            return self._with_ages(away_result(presence_res))
+
+        self._plan = {SIGNAL_POSTURE}
+        tired_res, fidgety_res = self._analyze(
+            landmarks.results, landmarks.img_h, landmarks.img_w, time.perf_counter()
+        )
+        self._record_frame(landmarks.img_h, landmarks.img_w, self._last_phone)
+        return self._with_ages(focus_result(self._last_phone, tired_res, fidgety_res))
+
+    def _plan_frame(self, parallel: bool) -> None:
+        self._plan = self.scheduler.plan(self._frame_t, parallel=parallel)
+        if self.client_landmarks:
+            # Posture comes in separately; a frame only refreshes the phone
+            self._plan.discard(SIGNAL_POSTURE)
+
+    async def _refresh_async(self, signal: str, detector, frame: np.ndarray):
+        # Carried-forward signals come straight back without a thread hop
+        if signal in self._plan:
+            return await asyncio.to_thread(tagged(signal, self.session_id, detector), frame)
+        return detector(frame)
+
+    def _with_ages(self, res: dict) -> dict:
+        """Add how old each signal in `res` is, in seconds."""
+        phone_age = self.scheduler.age(SIGNAL_PHONE, self._frame_t)
+        posture_age = self.scheduler.age(SIGNAL_POSTURE, self._frame_t)
+        since_start = self._frame_t - self._start_t
+        res["phone_age_s"] = since_start if phone_age is None else phone_age
+        res["tired_age_s"] = res["fidgety_age_s"] = (
+            since_start if posture_age is None else posture_age
+        )
+        return res
+
+    # ------------------------ clock / recording ------------------------
+
+    def _frame_clock(self) -> float:
+        return self._frame_t
+
+    def _begin_frame(self, t: Optional[float] = None) -> None:
+        self._frame_t = time.time() if t is None else t
+        self._presence_t = t
+        self._last_results = None
+        self._plan = set(SIGNALS)
+        self.timings = {}
+        if self.client_landmarks and self._lease is not None:
+            # Nothing left for Holistic to do here; let another session have it.
+            # Done between frames so it never pulls the instance from under one.
+            self._pool.release(self._lease)
+            self._lease = None
+            if self.roi is not None:
+                self.roi.reset()
+
+    def _record_frame(
+        self, img_h: int, img_w: int, phone_res: Optional[PhoneDetectionResult] = None
+    ) -> None:
+        if self._recorder is None:
+            return
+        self._recorder.record(
+            self._frame_t,
+            img_h,
+            img_w,
+            away=phone_res is None,
+            phone_detected=phone_res.phone_detected if phone_res else False,
+            phone_confidence=phone_res.confidence if phone_res else 0.0,
+            holistic_results=self._last_results,
+            posture_carried=SIGNAL_POSTURE not in self._plan,
+        )
+
+    # ------------------------ individual detectors ------------------------
+
+    def check_presence(self, frame: np.ndarray) -> PresenceDetectionResult:
+        t0 = time.perf_counter()
+        res = self.presence.check(frame, self._presence_t)
+        self.timings["presence"] = (time.perf_counter() - t0) * 1000.0
+        return res
+
+    def detect_phone(self, frame: np.ndarray) -> PhoneDetectionResult:
+        if SIGNAL_PHONE not in self._plan:
+            return self._last_phone
+
+        # Under load, only look for the phone every few frames and carry the
+        # last answer forward in between
+        self._phone_frames += 1
+        if self._phone_frames >= self.degradation.phone_every:
+            self._phone_frames = 0
+            t0 = time.perf_counter()
+            self._last_phone = self.phone_tracker.detect(frame)
+            self.timings["phone"] = (time.perf_counter() - t0) * 1000.0
+            self.scheduler.record_refresh(SIGNAL_PHONE, self._frame_t, self.timings["phone"])
+        return self._last_phone
+
+    def detect_posture(
+        self, frame: np.ndarray
+    ) -> Tuple[TiredDetectionResult, FidgetyDetectionResult]:
+        """
+        Run Holistic once and derive both tired and fidgety from it.
+        Without a Holistic instance both signals read as "not detected".
+        When the scheduler skipped posture this frame, the last results are
+        returned as they are.
+        """
+        if SIGNAL_POSTURE not in self._plan:
+            return self._last_tired, self._last_fidgety
+
+        t0 = time.perf_counter()
+        results = None
+        if self.degraded:
+            # Our instance was reassigned or we never got one; grab a free one if any
+            self._lease = self._pool.try_acquire(self.session_id)
+            if self.roi is not None:
+                # A fresh instance knows nothing about where we were looking
+                self.roi.reset()
+
+        if self._lease is not None:
+            if self.roi is not None:
+                # Crop around last frame's landmarks; results come back in
+                # full-frame coordinates
+                results = self.roi.process(frame, self._lease.process, self.degradation.holistic_scale)
+            else:
+                # Landmarks are normalized, so a smaller input (under load) still
+                # maps back onto the full-size frame below
+                small = frame
+                if self.degradation.holistic_scale < 1.0:
+                    scale = self.degradation.holistic_scale
+                    small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+                # MediaPipe expects RGB
+                frame_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+                results = self._lease.process(frame_rgb)
+            self.timings["holistic"] = (time.perf_counter() - t0) * 1000.0
+
+        if results is None:
+            self._last_tired = TiredDetectionResult(is_tired=False, score=0.0)
+            self._last_fidgety = FidgetyDetectionResult(is_fidgety=False, movement_score=0.0)
+            return self._last_tired, self._last_fidgety
+
+        img_h, img_w = frame.shape[:2]
+        return self._analyze(results, img_h, img_w, t0)
+
+    def _analyze(
+        self, results, img_h: int, img_w: int, t0: float
+    ) -> Tuple[TiredDetectionResult, FidgetyDetectionResult]:
+        """Feed Holistic-shaped landmarks to the analyzer and assess tired / fidgety."""
+        t1 = time.perf_counter()
+        self.analyzer.update(results, img_h, img_w)
+        self._last_results = results
+        self._last_tired = assess_tired(self.analyzer)
+        self._last_fidgety = assess_fidgety(self.analyzer)
+        t2 = time.perf_counter()
+        self.timings["analyzer"] = (t2 - t1) * 1000.0
+        self.scheduler.record_refresh(SIGNAL_POSTURE, self._frame_t, (t2 - t0) * 1000.0)
+        return self._last_tired, self._last_fidgety
@@ -0,0 +1,242 @@
+# backend/services/focus_stats.py
+import math
+import time
+from typing import List, Optional, Tuple
+
+# ---------------- CONFIG ---------------- #
+
+# Focus-score histogram: this many equal bins over [0, 1]
+HISTOGRAM_BINS = 10
+
+# Rolling average focus score over these windows (seconds, label)
+ROLLING_WINDOWS = ((60.0, "1m"), (300.0, "5m"), (900.0, "15m"))
+
+# Rolling averages are kept as per-bucket sums, so a window costs the same
+# however many frames fall into it
+ROLLING_BUCKET_S = 10.0
+_ROLLING_SLOTS = int(math.ceil(max(w for w, _ in ROLLING_WINDOWS) / ROLLING_BUCKET_S))
+
+# A gap between two frames longer than this (disconnect, paused tab) only
+# counts for this long towards streaks and distraction time
+MAX_FRAME_GAP_S = 5.0
+
+FOCUSED = "focused"
+DISTRACTED = "distracted"
+AWAY = "away"
+
+CAUSES = ("phone", "tired", "fidgety")
+
+
+class FocusAnalytics:
+    """
+    Per-session analytics that update in O(1) per frame and never rescan:
+    focus-score histogram, focused / distracted time and streaks, time to
+    the first distraction, time per distraction cause, and rolling averages.
+
+    Durations are sample-and-hold: whatever a frame said holds until the
+    next frame. A frame is distracted when phone, tired or fidgety is set
+    (what the client notifies on); away frames break streaks.
+
+    All state is plain numbers and lists (to_dict / from_dict), so the
+    SQLite backend can keep it in a row.
+
+    With `aggregate`, frames from many sessions are mixed together and only
+    what still means something is kept (histogram, average, rolling
+    averages); durations, streaks and causes come back as None.
+    """
+
+    def __init__(self, aggregate: bool = False):
+        self.aggregate = aggregate
+        self.histogram = [0] * HISTOGRAM_BINS
+        self.frames = 0  # non-away frames
+        self.score_sum = 0.0
+
+        self.first_t: Optional[float] = None
+        self.last_t: Optional[float] = None
+        self.last_state: Optional[str] = None
+        self.last_causes = [False] * len(CAUSES)
+
+        self.state_s = {FOCUSED: 0.0, DISTRACTED: 0.0, AWAY: 0.0}
+        self.longest_streak_s = {FOCUSED: 0.0, DISTRACTED: 0.0}
+        self.streak_s = 0.0
+        self.first_distraction_s: Optional[float] = None
+        self.cause_s = [0.0] * len(CAUSES)
+
+        # Ring of ROLLING_BUCKET_S buckets: which bucket each slot holds, and its sums
+        self.bucket_ids = [-1] * _ROLLING_SLOTS
+        self.bucket_sums = [0.0] * _ROLLING_SLOTS
+        self.bucket_counts = [0] * _ROLLING_SLOTS
+
+    def update(self, t: float, away: bool, causes: Tuple[bool, bool, bool], focus_score: float) -> None:
+        state = AWAY if away else (DISTRACTED if any(causes) else FOCUSED)
+
+        if self.aggregate:
+            # Sessions interleave, so only the newest time is meaningful
+            self.last_t = t if self.last_t is None else max(self.last_t, t)
+        elif self.last_state is None:
+            self.first_t = t
+        else:
+            # The previous frame's state held until now
+            dt = min(max(t - self.last_t, 0.0), MAX_FRAME_GAP_S)
+            self.state_s[self.last_state] += dt
+            for i, active in enumerate(self.last_causes):
+                if active:
+                    self.cause_s[i] += dt
+            self.streak_s += dt
+            if self.last_state != AWAY:
+                self.longest_streak_s[self.last_state] = max(self.longest_streak_s[self.last_state], self.streak_s)
+            if state != self.last_state:
+                self.streak_s = 0.0
+
+        if not self.aggregate:
+            self.last_t = t
+            self.last_state = state
+            self.last_causes = [bool(c) and not away for c in causes]
+        if away:
+            return
+
+        if state == DISTRACTED and self.first_distraction_s is None and not self.aggregate:
+            self.first_distraction_s = t - self.first_t
+
+        self.frames += 1
+        self.score_sum += focus_score
+        self.histogram[min(HISTOGRAM_BINS - 1, max(0, int(focus_score * HISTOGRAM_BINS)))] += 1
+
+        bucket = int(t // ROLLING_BUCKET_S)
+        slot = bucket % _ROLLING_SLOTS
+        if self.bucket_ids[slot] != bucket:
+            self.bucket_ids[slot] = bucket
+            self.bucket_sums[slot] = 0.0
+            self.bucket_counts[slot] = 0
+        self.bucket_sums[slot] += focus_score
+        self.bucket_counts[slot] += 1
+
+    def rolling_average(self, window_s: float) -> Optional[float]:
+        """Mean focus score over the last `window_s` seconds before the latest frame."""
+        if self.last_t is None:
+            return None
+        newest = int(self.last_t // ROLLING_BUCKET_S)
+        oldest = newest - int(math.ceil(window_s / ROLLING_BUCKET_S)) + 1
+        total, count = 0.0, 0
+        for bucket_id, s, n in zip(self.bucket_ids, self.bucket_sums, self.bucket_counts):
+            if oldest <= bucket_id <= newest:
+                total += s
+                count += n
+        return total / count if count else None
+
+    def summary(self) -> dict:
+        if self.aggregate:
+            return {
+                "focus_histogram": list(self.histogram),
+                "focused_seconds": None,
+                "distracted_seconds": None,
+                "longest_focused_streak_s": None,
+                "longest_distracted_streak_s": None,
+                "current_streak_state": None,
+                "current_streak_s": None,
+                "time_to_first_distraction_s": None,
+                "distraction_seconds": None,
+                "rolling_focus": {label: self.rolling_average(w) for w, label in ROLLING_WINDOWS},
+            }
+        return {
+            "focus_histogram": list(self.histogram),
+            "focused_seconds": self.state_s[FOCUSED],
+            "distracted_seconds": self.state_s[DISTRACTED],
+            "longest_focused_streak_s": self.longest_streak_s[FOCUSED],
+            "longest_distracted_streak_s": self.longest_streak_s[DISTRACTED],
+            "current_streak_state": self.last_state,
+            "current_streak_s": self.streak_s,
+            "time_to_first_distraction_s": self.first_distraction_s,
+            "distraction_seconds": dict(zip(CAUSES, self.cause_s)),
+            "rolling_focus": {label: self.rolling_average(w) for w, label in ROLLING_WINDOWS},
+        }
+
+    # ------------------------ persistence ------------------------
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FocusAnalytics":
+        analytics = cls()
+        analytics.__dict__.update(data)
+        return analytics
+
+
+class FocusStats:
+    """
+    Running counters + timeline behind /focus/summary.
+
+    One of these backs the live WebSocket sessions; offline analysis jobs
+    build their own so they report exactly the same numbers. An `aggregate`
+    (frames of many sessions) keeps no timeline and only the analytics that
+    survive mixing sessions, see FocusAnalytics.
+    """
+
+    def __init__(self, aggregate: bool = False):
+        self.aggregate = aggregate
+        self.reset()
+
+    def reset(self) -> None:
+        self.phone_count = 0
+        self.tired_count = 0
+        self.fidgety_count = 0
+        self.away_count = 0
+        self.away_time = 0.0  # seconds
+        self.focus_timeline: List[Tuple[float, float]] = []
+        self.time_counter = 0.0
+        self.analytics = FocusAnalytics(self.aggregate)
+
+    def update(
+        self,
+        *,
+        phone: bool,
+        tired: bool,
+        fidgety: bool,
+        focus_score: float,
+        away: bool = False,
+        away_seconds: float = 0.0,
+        t: Optional[float] = None,
+    ) -> None:
+        """
+        Add one processed frame. Away frames only add to the away metrics:
+        they don't show up in the timeline or drag the average focus score down.
+        `t` is the frame's time in seconds (wall clock if left out; offline
+        analysis passes video time).
+        """
+        self.analytics.update(time.time() if t is None else t, away, (phone, tired, fidgety), focus_score)
+
+        self.away_time += away_seconds
+        if away:
+            self.away_count += 1
+            self.time_counter += 1.0
+            return
+
+        # ranked by priority. Ex: If all true, only phone notification is displayed
+        if phone:
+            self.phone_count += 1
+        if tired:
+            self.tired_count += 1
+        if fidgety:
+            self.fidgety_count += 1
+
+        if not self.aggregate:
+            self.focus_timeline.append((self.time_counter, focus_score))
+        self.time_counter += 1.0
+
+    def summary(self, timeline: bool = True) -> dict:
+        """Everything is kept up to date per frame; only the timeline grows with the session."""
+        analytics = self.analytics
+        avg_focus = analytics.score_sum / analytics.frames if analytics.frames else 0.0
+
+        return {
+            "focus_score": avg_focus,
+            "phone": self.phone_count,
+            "tired": self.tired_count,
+            "fidgety": self.fidgety_count,
+            "away": self.away_count,
+            "away_seconds": self.away_time,
+            # convert tuples to lists
+            "focus_timeline": [[t, s] for (t, s) in self.focus_timeline] if timeline else [],
+            **analytics.summary(),
+        }
@@ -0,0 +1,333 @@
+# backend/services/frame_pipeline.py
+import asyncio
+import os
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from utils.image_utils import decode_base64_image
+
+from .focus_session import FocusSession
+from .inference_workers import InferenceWorkerPool
+from .landmark_adapter import ClientLandmarks
+from .load_control import DEFAULT_FRAME_INTERVAL_MS, LoadController, get_load_controller
+from .profiler import new_trace_record, tagged
+from .video_ingest import FOCUS_STREAM_FRAME_INTERVAL_MS, StreamDecoder
+
+# Max items waiting between two stages. Small on purpose: a deep queue only
+# adds latency, and a full one is what pushes back on the socket reader.
+FOCUS_STAGE_QUEUE_SIZE = int(os.getenv("FOCUS_STAGE_QUEUE_SIZE", "2"))
+
+# Client-side landmark mode: most landmark messages per second we analyse
+# (extra ones are dropped), and how often frames are still wanted, now only
+# for presence and phone detection
+FOCUS_LANDMARKS_MAX_HZ = float(os.getenv("FOCUS_LANDMARKS_MAX_HZ", "5"))
+FOCUS_LANDMARKS_FRAME_INTERVAL_MS = int(os.getenv("FOCUS_LANDMARKS_FRAME_INTERVAL_MS", "2000"))
+
+# Moving-average weight for per-stage timings
+_EWMA_ALPHA = 0.2
+
+# Every live pipeline in this process, for /api/metrics
+_active_pipelines: "weakref.WeakSet[FramePipeline]" = weakref.WeakSet()
+
+
+class FramePipeline:
+    """
+    Per-connection focus pipeline split into stages joined by bounded queues:
+
+        socket reader -> [raw] -> decode -> [decoded] -> infer -> [results] -> deliver
+
+    Each stage is its own task, so decoding frame n+1 overlaps with inference
+    on frame n, and inference itself runs YOLO and Holistic concurrently.
+    Within a stage frames stay in order. When a stage falls behind its input
+    queue fills up, and put() blocks the socket reader, so backpressure ends
+    up on the client's connection instead of in an unbounded buffer.
+
+    Inference latency feeds the process-wide LoadController, whose current
+    degradation settings are applied to every frame and reported back to the
+    client with each result.
+
+    Frames travel through the queues with an optional trace record (see
+    profiler.start_trace) that each stage fills in with its timings.
+
+    A client can instead stream compressed video (start_stream/put_chunk).
+    Its StreamDecoder thread samples frames at the pipeline's rate and puts
+    them straight on the decoded queue, replacing the oldest waiting frame
+    rather than blocking when inference is behind, since for live video
+    the newest frame is the one worth analysing.
+
+    In landmark mode (start_landmarks) the client runs MediaPipe itself:
+    put_landmarks() messages skip decode and go through the infer stage in
+    order with the (now much rarer) frames, which only do presence and phone.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        deliver: Callable[[dict], Awaitable[None]],
+        session: Optional[FocusSession] = None,
+        workers: Optional[InferenceWorkerPool] = None,
+        queue_size: int = FOCUS_STAGE_QUEUE_SIZE,
+        load: Optional[LoadController] = None,
+    ):
+        self.session_id = session_id
+        self._deliver = deliver
+        self._session = session
+        self._workers = workers
+        self._load = load or get_load_controller()
+        self._last_accepted_t = 0.0
+        self._dropped = 0
+        self.landmark_mode = False
+        self._last_landmarks_t = 0.0
+        self._landmarks_dropped = 0
+
+        self._raw_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._decoded_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._result_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stream: Optional[StreamDecoder] = None
+
+        self._stage_ms: Dict[str, float] = {"decode": 0.0, "infer": 0.0, "landmarks": 0.0, "deliver": 0.0}
+        self._frames_done = 0
+
+    # ------------------------ lifecycle ------------------------
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [
+            asyncio.create_task(self._decode_stage()),
+            asyncio.create_task(self._infer_stage()),
+            asyncio.create_task(self._deliver_stage()),
+        ]
+        _active_pipelines.add(self)
+
+    async def stop(self) -> None:
+        self.stop_stream()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        _active_pipelines.discard(self)
+
+    async def put(self, base64_image: str) -> None:
+        """Called by the socket reader; blocks while the pipeline is full."""
+        interval_ms = self.frame_interval_ms()
+        if interval_ms > DEFAULT_FRAME_INTERVAL_MS:
+            # Reduced frame rate (load, landmark mode): drop frames a client sends early
+            now_t = time.monotonic()
+            if (now_t - self._last_accepted_t) * 1000.0 < interval_ms * 0.9:
+                self._dropped += 1
+                return
+            self._last_accepted_t = now_t
+
+        record = new_trace_record(self.session_id)
+        if record is not None:
+            record["t0"] = time.perf_counter()
+        await self._raw_q.put((base64_image, record))
+
+    def frame_interval_ms(self) -> float:
+        interval_ms = self._load.settings().frame_interval_ms
+        if self.landmark_mode:
+            interval_ms = max(interval_ms, FOCUS_LANDMARKS_FRAME_INTERVAL_MS)
+        return interval_ms
+
+    # ------------------------ client-side landmarks ------------------------
+
+    def start_landmarks(self) -> bool:
+        """Switch to client-extracted landmarks; False if this setup can't."""
+        if self._session is None:
+            # With inference workers the session's analyzer lives in a worker
+            return False
+        self.landmark_mode = True
+        self._session.client_landmarks = True
+        return True
+
+    def stop_landmarks(self) -> None:
+        self.landmark_mode = False
+        if self._session is not None:
+            self._session.client_landmarks = False
+
+    def accept_landmarks(self) -> bool:
+        """
+        Whether the next landmarks message will be analysed. The socket reader
+        asks before parsing one, so messages over FOCUS_LANDMARKS_MAX_HZ are
+        dropped without converting their points.
+        """
+        if not self.landmark_mode:
+            return False
+        now_t = time.monotonic()
+        if (now_t - self._last_landmarks_t) * FOCUS_LANDMARKS_MAX_HZ < 0.9:
+            self._landmarks_dropped += 1
+            return False
+        self._last_landmarks_t = now_t
+        return True
+
+    async def put_landmarks(self, landmarks: ClientLandmarks) -> None:
+        """Called by the socket reader with a validated landmarks message it accept_landmarks()-ed."""
+        record = new_trace_record(self.session_id)
+        if record is not None:
+            record["t0"] = record["t1"] = time.perf_counter()
+            record["landmarks"] = True
+        # Nothing to decode
+        await self._decoded_q.put((landmarks, record))
+
+    # ------------------------ video stream ingest ------------------------
+
+    def start_stream(self, fmt: str) -> None:
+        """Take frames from a compressed stream (demuxer `fmt`) from now on."""
+        self.stop_stream()
+        self.stream = StreamDecoder(self.session_id, fmt, self._offer_frame_threadsafe, self._stream_interval_ms)
+        self.stream.start()
+
+    def stop_stream(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    async def put_chunk(self, chunk: bytes) -> None:
+        """Called by the socket reader; waits while the decoder is behind."""
+        if self.stream is not None:
+            await asyncio.to_thread(self.stream.feed, chunk)
+
+    def _stream_interval_ms(self) -> float:
+        # Streams are sampled faster than the JPEG cadence, until the load
+        # controller (or landmark mode) asks for fewer frames
+        interval_ms = self.frame_interval_ms()
+        if interval_ms > DEFAULT_FRAME_INTERVAL_MS:
+            return interval_ms
+        return FOCUS_STREAM_FRAME_INTERVAL_MS
+
+    def _offer_frame_threadsafe(self, frame, convert_ms: float) -> None:
+        # Decoder thread -> event loop
+        self._loop.call_soon_threadsafe(self._offer_frame, frame, convert_ms)
+
+    def _offer_frame(self, frame, convert_ms: float) -> None:
+        if self._decoded_q.full():
+            _, stale_record = self._decoded_q.get_nowait()
+            _trace_error(stale_record, RuntimeError("dropped for a newer stream frame"))
+            self._dropped += 1
+        record = new_trace_record(self.session_id)
+        if record is not None:
+            record["t0"] = time.perf_counter()
+            record["decode_wait_ms"] = 0.0
+            record["decode_ms"] = convert_ms
+            record["t1"] = record["t0"]
+        self._decoded_q.put_nowait((frame, record))
+
+    # ------------------------ stages ------------------------
+
+    async def _decode_stage(self) -> None:
+        decode = tagged("decode", self.session_id, decode_base64_image)
+        while True:
+            base64_image, record = await self._raw_q.get()
+            t0 = time.perf_counter()
+            try:
+                frame = await asyncio.to_thread(decode, base64_image)
+            except Exception as e:
+                print(f"Error decoding frame: {e}")
+                _trace_error(record, e)
+                continue
+            elapsed_ms = self._record("decode", t0)
+            if record is not None:
+                record["decode_wait_ms"] = (t0 - record["t0"]) * 1000.0
+                record["decode_ms"] = elapsed_ms
+                record["t1"] = time.perf_counter()
+            await self._decoded_q.put((frame, record))
+
+    async def _infer_stage(self) -> None:
+        while True:
+            frame, record = await self._decoded_q.get()
+            degradation = self._load.settings()
+            t0 = time.perf_counter()
+            is_landmarks = isinstance(frame, ClientLandmarks)
+            try:
+                if is_landmarks:
+                    # Just the analyzer: cheap enough to run right here
+                    result = self._session.process_landmarks(frame)
+                elif self._workers is not None:
+                    result = await self._workers.submit(self.session_id, frame, degradation)
+                else:
+                    self._session.degradation = degradation
+                    result = await self._session.process_async(frame)
+            except Exception as e:
+                print(f"Error processing frame: {e}")
+                _trace_error(record, e)
+                continue
+            elapsed_ms = self._record("landmarks" if is_landmarks else "infer", t0)
+            if not is_landmarks:
+                # Landmark messages would make the node look idler than it is
+                self._load.record_frame_latency(elapsed_ms)
+            if record is not None:
+                record["infer_wait_ms"] = (t0 - record["t1"]) * 1000.0
+                record["infer_ms"] = elapsed_ms
+                if self._session is not None:
+                    # Per-detector split; with inference workers it stays in the worker
+                    record["detectors_ms"] = dict(self._session.timings)
+                record["t2"] = time.perf_counter()
+            if result is not None:
+                # Lets the client slow its frame rate down when we ask it to
+                result["degradation_level"] = degradation.level
+                result["frame_interval_ms"] = self.frame_interval_ms()
+                await self._result_q.put((result, record))
+
+    async def _deliver_stage(self) -> None:
+        while True:
+            result, record = await self._result_q.get()
+            t0 = time.perf_counter()
+            try:
+                await self._deliver(result)
+            except Exception as e:
+                print(f"Error sending focus result: {e}")
+                _trace_error(record, e)
+                continue
+            elapsed_ms = self._record("deliver", t0)
+            self._frames_done += 1
+            if record is not None:
+                record["deliver_wait_ms"] = (t0 - record.pop("t2")) * 1000.0
+                record["deliver_ms"] = elapsed_ms
+                record["total_ms"] = (time.perf_counter() - record.pop("t0")) * 1000.0
+                record.pop("t1")
+
+    # ------------------------ stats ------------------------
+
+    def _record(self, stage: str, t0: float) -> float:
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        prev = self._stage_ms[stage]
+        self._stage_ms[stage] = elapsed_ms if prev == 0.0 else (
+            (1.0 - _EWMA_ALPHA) * prev + _EWMA_ALPHA * elapsed_ms
+        )
+        return elapsed_ms
+
+    def stats(self) -> dict:
+        stats = {
+            "session_id": self.session_id,
+            "queue_depth": {
+                "raw": self._raw_q.qsize(),
+                "decoded": self._decoded_q.qsize(),
+                "results": self._result_q.qsize(),
+            },
+            "queue_size": self._raw_q.maxsize,
+            "stage_ms": dict(self._stage_ms),
+            "frames": self._frames_done,
+            "dropped": self._dropped,
+        }
+        if self.landmark_mode:
+            stats["landmarks_dropped"] = self._landmarks_dropped
+        if self.stream is not None:
+            stats["stream"] = self.stream.stats()
+        if self._session is not None:
+            # In worker mode the session (and its scheduler) lives in another process
+            stats["scheduler"] = self._session.scheduler.stats()
+        return stats
+
+
+def _trace_error(record: Optional[dict], error: Exception) -> None:
+    if record is not None:
+        for key in ("t0", "t1", "t2"):
+            record.pop(key, None)
+        record["error"] = str(error)
+
+
+def pipeline_stats() -> List[dict]:
+    return [pipeline.stats() for pipeline in list(_active_pipelines)]
@@ -0,0 +1,110 @@
+# backend/services/frame_scheduler.py
+import os
+from typing import Dict, Optional, Set
+
+# ---------------- CONFIG ---------------- #
+
+# Per-frame time budget for the detectors (ms). 0 = refresh every signal on
+# every frame, like before.
+FOCUS_FRAME_BUDGET_MS = float(os.getenv("FOCUS_FRAME_BUDGET_MS", "0"))
+
+# Oldest each signal may get (seconds) before it is refreshed no matter what
+# the budget says. A phone is picked up / put down over seconds; tired and
+# fidgety come from Holistic and need a steadier stream of landmarks for
+# blink and movement tracking.
+PHONE_MAX_AGE_S = 2.0
+POSTURE_MAX_AGE_S = 1.0
+
+# Moving-average weight for measured detector costs
+_EWMA_ALPHA = 0.2
+
+SIGNAL_PHONE = "phone"      # YOLO / phone tracker
+SIGNAL_POSTURE = "posture"  # Holistic -> tired + fidgety
+SIGNALS = (SIGNAL_PHONE, SIGNAL_POSTURE)
+
+
+class FrameScheduler:
+    """
+    Decides, per frame, which detectors of one session to refresh.
+
+    Every signal has a staleness tolerance and a measured cost. Signals past
+    their tolerance (or never measured yet) always run; the rest are added
+    stalest-first for as long as the estimated frame time stays within the
+    budget. Anything not refreshed is carried forward by the caller, which
+    reports each signal's age with the result. Focus scoring itself costs
+    microseconds, so it is recomputed on every frame from whatever is current.
+
+    Ages are in the session's frame clock (video time offline); costs are
+    real time.
+    """
+
+    def __init__(
+        self,
+        budget_ms: float = FOCUS_FRAME_BUDGET_MS,
+        max_age_s: Optional[Dict[str, float]] = None,
+    ):
+        self.budget_ms = budget_ms
+        self.max_age_s = max_age_s or {
+            SIGNAL_PHONE: PHONE_MAX_AGE_S,
+            SIGNAL_POSTURE: POSTURE_MAX_AGE_S,
+        }
+        self._cost_ms: Dict[str, Optional[float]] = {s: None for s in SIGNALS}
+        self._refreshed_t: Dict[str, Optional[float]] = {s: None for s in SIGNALS}
+        self._skipped: Dict[str, int] = {s: 0 for s in SIGNALS}
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_ms > 0
+
+    def plan(self, now_t: float, parallel: bool = False) -> Set[str]:
+        """
+        Signals to refresh on the frame at `now_t`. With `parallel` the
+        detectors run side by side, so a frame costs the slowest one rather
+        than the sum.
+        """
+        if not self.enabled:
+            return set(SIGNALS)
+
+        chosen = set()
+        optional = []
+        for signal in SIGNALS:
+            age = self.age(signal, now_t)
+            if self._cost_ms[signal] is None or age is None or age >= self.max_age_s[signal]:
+                chosen.add(signal)
+            else:
+                optional.append(signal)
+
+        optional.sort(key=lambda s: self.age(s, now_t) / self.max_age_s[s], reverse=True)
+        for signal in optional:
+            if self._estimate_ms(chosen | {signal}, parallel) <= self.budget_ms:
+                chosen.add(signal)
+            else:
+                self._skipped[signal] += 1
+        return chosen
+
+    def _estimate_ms(self, signals: Set[str], parallel: bool) -> float:
+        costs = [self._cost_ms[s] or 0.0 for s in signals]
+        if not costs:
+            return 0.0
+        return max(costs) if parallel else sum(costs)
+
+    # ------------------------ feedback from the detectors ------------------------
+
+    def record_refresh(self, signal: str, now_t: float, elapsed_ms: float) -> None:
+        self._refreshed_t[signal] = now_t
+        prev = self._cost_ms[signal]
+        self._cost_ms[signal] = elapsed_ms if prev is None else (
+            (1.0 - _EWMA_ALPHA) * prev + _EWMA_ALPHA * elapsed_ms
+        )
+
+    def age(self, signal: str, now_t: float) -> Optional[float]:
+        """Seconds since `signal` was last refreshed (None = never)."""
+        refreshed_t = self._refreshed_t[signal]
+        return None if refreshed_t is None else max(0.0, now_t - refreshed_t)
+
+    def stats(self) -> dict:
+        return {
+            "budget_ms": self.budget_ms,
+            "cost_ms": {s: self._cost_ms[s] or 0.0 for s in SIGNALS},
+            "skipped": dict(self._skipped),
+        }
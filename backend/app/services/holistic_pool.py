@@ -0,0 +1,246 @@
+# backend/services/holistic_pool.py
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+import mediapipe as mp
+import numpy as np
+
+# ---------------- CONFIG ---------------- #
+
+# Max number of Holistic graphs this process will ever hold. Each one costs a
+# fixed chunk of memory, so this bounds memory per node.
+HOLISTIC_POOL_SIZE = int(os.getenv("HOLISTIC_POOL_SIZE", "4"))
+
+# How long a new session waits for an instance before running degraded
+# (no tired / fidgety detection) when the pool is exhausted.
+HOLISTIC_POOL_WAIT_S = float(os.getenv("HOLISTIC_POOL_WAIT_S", "2.0"))
+
+# A checked-out instance that hasn't processed a frame for this long can be
+# reassigned to a waiting session (least recently used first).
+HOLISTIC_IDLE_REASSIGN_S = float(os.getenv("HOLISTIC_IDLE_REASSIGN_S", "30.0"))
+
+_mp_holistic = mp.solutions.holistic
+
+
+def build_holistic():
+    """Same settings the detectors have always used."""
+    return _mp_holistic.Holistic(
+        model_complexity=0,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+        refine_face_landmarks=True,
+    )
+
+
+class HolisticLease:
+    """
+    One session's hold on a pooled Holistic instance.
+
+    The pool can take the instance back (LRU reassignment) while the session
+    is idle, after which process() returns None and the session has to ask
+    the pool again.
+    """
+
+    def __init__(self, session_id: str, holistic):
+        self.session_id = session_id
+        self.last_used = time.monotonic()
+        self._holistic = holistic
+        self._lock = threading.Lock()
+
+    @property
+    def revoked(self) -> bool:
+        return self._holistic is None
+
+    def process(self, frame_rgb: np.ndarray):
+        with self._lock:
+            if self._holistic is None:
+                return None
+            self.last_used = time.monotonic()
+            return self._holistic.process(frame_rgb)
+
+    def _take(self):
+        """Detach the instance from this lease (pool-internal)."""
+        with self._lock:
+            holistic, self._holistic = self._holistic, None
+            return holistic
+
+
+class HolisticPool:
+    """
+    Bounded pool of MediaPipe Holistic instances, one checked out per session.
+
+    Holistic keeps temporal tracking state between frames, so sessions can't
+    share an instance. Instances are reset (not rebuilt) when they move from
+    one session to the next. When every instance is checked out, a new session
+    first tries to take one from the least recently used idle session, then
+    waits up to `wait_s` for a release, and finally gets None (degraded).
+    """
+
+    def __init__(
+        self,
+        max_size: int = HOLISTIC_POOL_SIZE,
+        wait_s: float = HOLISTIC_POOL_WAIT_S,
+        idle_reassign_s: float = HOLISTIC_IDLE_REASSIGN_S,
+    ):
+        self.max_size = max(1, max_size)
+        self.wait_s = wait_s
+        self.idle_reassign_s = idle_reassign_s
+
+        self._cond = threading.Condition()
+        self._free: List = []
+        self._leases: "OrderedDict[str, HolisticLease]" = OrderedDict()
+        self._built = 0
+
+        # Stats
+        self._build_ms: deque = deque(maxlen=100)
+        self._reset_ms: deque = deque(maxlen=100)
+        self._reassigned = 0
+        self._degraded = 0
+        self._waits = 0
+
+    # ------------------------ checkout / return ------------------------
+
+    async def acquire(self, session_id: str) -> Optional[HolisticLease]:
+        """Async wrapper so building / waiting never blocks the event loop."""
+        return await asyncio.to_thread(self.acquire_blocking, session_id, self.wait_s)
+
+    def acquire_blocking(
+        self, session_id: str, timeout: float, allow_reassign: bool = True
+    ) -> Optional[HolisticLease]:
+        deadline = time.monotonic() + max(0.0, timeout)
+
+        with self._cond:
+            existing = self._leases.get(session_id)
+            if existing is not None and not existing.revoked:
+                return existing
+
+            while True:
+                holistic, build = self._reserve_locked(allow_reassign)
+                if holistic is not None or build:
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._degraded += 1
+                    return None
+                self._waits += 1
+                self._cond.wait(remaining)
+
+        # Building takes hundreds of ms: the instance is ours alone by now, so
+        # build / reset it without the lock and release() / stats() don't wait
+        t0 = time.perf_counter()
+        try:
+            if build:
+                holistic = build_holistic()
+            else:
+                holistic.reset()  # the next session starts without the last one's tracking
+        except BaseException:
+            with self._cond:
+                # A failed build (or an instance that failed to reset) gives its place back
+                self._built -= 1
+                self._cond.notify()
+            raise
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+        with self._cond:
+            (self._build_ms if build else self._reset_ms).append(elapsed_ms)
+            existing = self._leases.get(session_id)
+            if existing is not None and not existing.revoked:
+                # A concurrent acquire for the same session won the race
+                self._free.append(holistic)
+                self._cond.notify()
+                return existing
+            lease = HolisticLease(session_id, holistic)
+            self._leases[session_id] = lease
+            return lease
+
+    def try_acquire(self, session_id: str) -> Optional[HolisticLease]:
+        """Non-blocking retry used by sessions that are running degraded."""
+        return self.acquire_blocking(session_id, timeout=0.0, allow_reassign=False)
+
+    def release(self, lease: Optional[HolisticLease]) -> None:
+        if lease is None:
+            return
+
+        holistic = lease._take()
+        with self._cond:
+            if self._leases.get(lease.session_id) is lease:
+                del self._leases[lease.session_id]
+            if holistic is not None:
+                self._free.append(holistic)
+                self._cond.notify()
+
+    # ------------------------ internals (lock held) ------------------------
+
+    def _reserve_locked(self, allow_reassign: bool) -> Tuple[Optional[object], bool]:
+        """
+        Claim an instance for the caller: (instance to reset, False), or
+        (None, True) when a slot was reserved for a new one the caller has to
+        build, or (None, False) when there is nothing to claim.
+        """
+        if self._free:
+            return self._free.pop(), False
+
+        if self._built < self.max_size:
+            self._built += 1
+            return None, True
+
+        if allow_reassign:
+            victim = self._least_recently_used_idle_locked()
+            if victim is not None:
+                del self._leases[victim.session_id]
+                holistic = victim._take()
+                if holistic is not None:
+                    self._reassigned += 1
+                    return holistic, False
+
+        return None, False
+
+    def _least_recently_used_idle_locked(self) -> Optional[HolisticLease]:
+        now_t = time.monotonic()
+        lru = None
+        for lease in self._leases.values():
+            if now_t - lease.last_used < self.idle_reassign_s:
+                continue
+            if lru is None or lease.last_used < lru.last_used:
+                lru = lease
+        return lru
+
+    # ------------------------ reporting ------------------------
+
+    def stats(self) -> Dict:
+        def _summary(samples) -> Dict:
+            if not samples:
+                return {"count": 0, "avg_ms": 0.0, "max_ms": 0.0}
+            return {
+                "count": len(samples),
+                "avg_ms": sum(samples) / len(samples),
+                "max_ms": max(samples),
+            }
+
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "built": self._built,
+                "in_use": len(self._leases),
+                "free": len(self._free),
+                "build": _summary(self._build_ms),
+                "reset": _summary(self._reset_ms),
+                "reassigned": self._reassigned,
+                "waits": self._waits,
+                "degraded": self._degraded,
+            }
+
+
+_pool: Optional[HolisticPool] = None
+
+
+def get_holistic_pool() -> HolisticPool:
+    global _pool
+    if _pool is None:
+        _pool = HolisticPool()
+    return _pool
@@ -0,0 +1,178 @@
+# backend/services/holistic_roi.py
+import os
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .landmark_adapter import (
+    FACE_INDICES,
+    HAND_INDICES,
+    POSE_INDICES,
+    HolisticLandmarks,
+    LandmarkList,
+    extract_xy,
+)
+
+# ---------------- CONFIG ---------------- #
+
+# Run Holistic on a crop around where the student was last seen instead of
+# the whole webcam frame. 0 = always use the full frame.
+FOCUS_HOLISTIC_ROI = os.getenv("FOCUS_HOLISTIC_ROI", "1") == "1"
+
+# Crops are downscaled so their longer side is at most this many pixels
+# (about what Holistic's detectors run at internally anyway).
+ROI_MAX_SIDE = 256
+
+# Grow the landmark bounding box by this fraction of its size on every side,
+# so a student leaning or reaching stays inside the crop.
+ROI_MARGIN = 0.35
+
+# Never crop tighter than this fraction of the frame's shorter side
+ROI_MIN_FRACTION = 0.35
+
+# Keep the current crop while every landmark stays this far (fraction of the
+# crop size) from its edges. Moving the crop around on every frame would
+# look like motion to Holistic's tracker.
+ROI_EDGE_FRACTION = 0.1
+
+# A full-frame pass every this many frames catches hands coming into view
+# from outside the crop.
+ROI_FULL_FRAME_EVERY = 30
+
+# Landmarks used to find the student in the frame. A handful per part is
+# plenty for a bounding box and much cheaper than walking all 478 face points.
+_FACE_BOX = (10, 152, 234, 454)          # forehead, chin, left / right cheek
+_POSE_BOX = (0, 11, 12, 13, 14, 15, 16)  # nose, shoulders, elbows, wrists
+_HAND_BOX = (0, 4, 8, 12, 20)            # wrist + finger tips
+_POSE_MIN_VISIBILITY = 0.5
+
+Roi = Tuple[int, int, int, int]  # x0, y0, x1, y1 in full-frame pixels
+
+
+def _box_points(results) -> Optional[np.ndarray]:
+    """(N, 2) normalized points outlining the face, upper body and hands."""
+    points = []
+    if results.face_landmarks:
+        lm = results.face_landmarks.landmark
+        points.extend((lm[i].x, lm[i].y) for i in _FACE_BOX)
+    if results.pose_landmarks:
+        lm = results.pose_landmarks.landmark
+        points.extend(
+            (lm[i].x, lm[i].y) for i in _POSE_BOX
+            if getattr(lm[i], "visibility", 1.0) >= _POSE_MIN_VISIBILITY
+        )
+    for hand in (results.left_hand_landmarks, results.right_hand_landmarks):
+        if hand:
+            lm = hand.landmark
+            points.extend((lm[i].x, lm[i].y) for i in _HAND_BOX)
+    return np.array(points, dtype=np.float32) if points else None
+
+
+def _remap(landmark_list, indices: Sequence[int], roi: Roi, img_w: int, img_h: int) -> Optional[LandmarkList]:
+    """Crop-normalized landmarks -> full-frame-normalized LandmarkList."""
+    xy = extract_xy(landmark_list, indices)
+    if xy is None:
+        return None
+    x0, y0, x1, y1 = roi
+    xy[:, 0] = (x0 + xy[:, 0] * (x1 - x0)) / img_w
+    xy[:, 1] = (y0 + xy[:, 1] * (y1 - y0)) / img_h
+    return LandmarkList(xy, indices)
+
+
+class RoiTracker:
+    """
+    Picks the part of the frame Holistic should look at, per session.
+
+    After a frame with landmarks, the next frame is cropped to an expanded box
+    around them and downscaled; the landmarks that come back are mapped to
+    full-frame coordinates, so FaceStateCalculator keeps measuring in the same
+    pixel units. When the crop finds nobody, the same frame is rerun on the
+    full image to reacquire.
+    """
+
+    def __init__(self):
+        self.roi: Optional[Roi] = None
+        self._frames_since_full = 0
+        self.reacquired = 0
+
+    def reset(self) -> None:
+        self.roi = None
+
+    def process(self, frame: np.ndarray, run_holistic, scale: float = 1.0):
+        """
+        Run `run_holistic(rgb)` on the crop (or full frame) and return results
+        in full-frame coordinates, or None. `scale` is the load controller's
+        extra downscale for full-frame passes.
+        """
+        img_h, img_w = frame.shape[:2]
+
+        roi = self.roi
+        if roi is not None and self._frames_since_full >= ROI_FULL_FRAME_EVERY:
+            roi = None
+
+        if roi is not None:
+            self._frames_since_full += 1
+            x0, y0, x1, y1 = roi
+            crop_scale = min(scale, ROI_MAX_SIDE / float(max(x1 - x0, y1 - y0)))
+            results = run_holistic(self._prepare(frame, roi, crop_scale))
+            points = None if results is None else _box_points(results)
+            if points is not None:
+                mapped = HolisticLandmarks(
+                    face_landmarks=_remap(results.face_landmarks, FACE_INDICES, roi, img_w, img_h),
+                    pose_landmarks=_remap(results.pose_landmarks, POSE_INDICES, roi, img_w, img_h),
+                    left_hand_landmarks=_remap(results.left_hand_landmarks, HAND_INDICES, roi, img_w, img_h),
+                    right_hand_landmarks=_remap(results.right_hand_landmarks, HAND_INDICES, roi, img_w, img_h),
+                )
+                self._update_roi(points, roi, img_w, img_h)
+                return mapped
+            # Lost inside the crop: fall through to a full-frame pass
+            self.reacquired += 1
+
+        self._frames_since_full = 0
+        results = run_holistic(self._prepare(frame, (0, 0, img_w, img_h), scale))
+        points = None if results is None else _box_points(results)
+        self.roi = None if points is None else self._expand(points, img_w, img_h)
+        return results
+
+    # ------------------------ helpers ------------------------
+
+    @staticmethod
+    def _prepare(frame: np.ndarray, roi: Roi, scale: float) -> np.ndarray:
+        x0, y0, x1, y1 = roi
+        crop = frame[y0:y1, x0:x1]
+        if scale < 1.0:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        # MediaPipe expects RGB
+        return cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+
+    def _update_roi(self, crop_points: np.ndarray, roi: Roi, img_w: int, img_h: int) -> None:
+        """Keep the crop unless the student drifted toward (or past) its edges."""
+        x0, y0, x1, y1 = roi
+        edge = ROI_EDGE_FRACTION
+        if crop_points.min() >= edge and crop_points.max() <= 1.0 - edge:
+            return
+        full = np.empty_like(crop_points)
+        full[:, 0] = (x0 + crop_points[:, 0] * (x1 - x0)) / img_w
+        full[:, 1] = (y0 + crop_points[:, 1] * (y1 - y0)) / img_h
+        self.roi = self._expand(full, img_w, img_h)
+
+    @staticmethod
+    def _expand(points: np.ndarray, img_w: int, img_h: int) -> Optional[Roi]:
+        """Square-ish box around normalized `points`, grown and clamped to the frame."""
+        px = np.clip(points[:, 0], 0.0, 1.0) * img_w
+        py = np.clip(points[:, 1], 0.0, 1.0) * img_h
+        cx, cy = (px.min() + px.max()) / 2.0, (py.min() + py.max()) / 2.0
+        side = max(px.max() - px.min(), py.max() - py.min()) * (1.0 + 2.0 * ROI_MARGIN)
+        side = max(side, ROI_MIN_FRACTION * min(img_w, img_h))
+
+        x0 = int(max(0, cx - side / 2.0))
+        y0 = int(max(0, cy - side / 2.0))
+        x1 = int(min(img_w, cx + side / 2.0))
+        y1 = int(min(img_h, cy + side / 2.0))
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None
+        # Nearly the whole frame anyway: skip the crop bookkeeping
+        if (x1 - x0) * (y1 - y0) > 0.8 * img_w * img_h:
+            return None
+        return (x0, y0, x1, y1)
@@ -0,0 +1,376 @@
+# backend/services/inference_workers.py
+import asyncio
+import math
+import multiprocessing as mp_proc
+import os
+import struct
+import threading
+import zlib
+from itertools import count
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from .load_control import DegradationSettings
+
+# ---------------- CONFIG ---------------- #
+
+# Number of inference worker processes. 0 = run inference inside the
+# uvicorn process like before.
+FOCUS_INFERENCE_WORKERS = int(os.getenv("FOCUS_INFERENCE_WORKERS", "0"))
+
+# Frames in flight per worker (size of each worker's shared-memory ring)
+FOCUS_SHM_SLOTS = int(os.getenv("FOCUS_SHM_SLOTS", "4"))
+
+# Bytes per ring slot. Big enough for a 1280x720 BGR frame; larger frames
+# are downscaled to fit before being handed off.
+FOCUS_SHM_SLOT_BYTES = int(os.getenv("FOCUS_SHM_SLOT_BYTES", str(1280 * 720 * 3)))
+
+
+# ---------------- RESULT WIRE FORMAT ---------------- #
+
+# request id, flag bits, away_seconds, phone_conf, tired, fidgety, focus score,
+# phone age, posture (tired / fidgety) age
+_RESULT = struct.Struct("<QBfffffff")
+
+# Sent instead of a result when the worker failed on a frame
+_ERROR = struct.Struct("<Q")
+
+_FLAG_AWAY = 1 << 0
+_FLAG_PHONE = 1 << 1
+_FLAG_TRACKED = 1 << 2
+_FLAG_TIRED = 1 << 3
+_FLAG_FIDGETY = 1 << 4
+_FLAG_FOCUSED = 1 << 5
+
+
+def _pack_result(request_id: int, res: dict) -> bytes:
+    flags = 0
+    if res["away"]:
+        flags |= _FLAG_AWAY
+    if res["phone"]:
+        flags |= _FLAG_PHONE
+    if res["phone_source"] == "tracking":
+        flags |= _FLAG_TRACKED
+    if res["tired"]:
+        flags |= _FLAG_TIRED
+    if res["fidgety"]:
+        flags |= _FLAG_FIDGETY
+    if res["is_focused"]:
+        flags |= _FLAG_FOCUSED
+
+    return _RESULT.pack(
+        request_id,
+        flags,
+        res["away_seconds"],
+        res["phone_confidence"],
+        res["tired_score"],
+        res["fidgety_score"],
+        res["focus_score"],
+        res["phone_age_s"],
+        res["tired_age_s"],
+    )
+
+
+def _unpack_result(payload: bytes):
+    (
+        request_id, flags, away_s, phone_conf, tired, fidgety, focus, phone_age, posture_age,
+    ) = _RESULT.unpack(payload)
+    # Same keys / order as FocusSession.process()
+    return request_id, {
+        "type": "focus_result",
+        "away": bool(flags & _FLAG_AWAY),
+        "away_seconds": away_s,
+        "phone": bool(flags & _FLAG_PHONE),
+        "phone_confidence": phone_conf,
+        "phone_source": "tracking" if flags & _FLAG_TRACKED else "detection",
+        "tired": bool(flags & _FLAG_TIRED),
+        "tired_score": tired,
+        "fidgety": bool(flags & _FLAG_FIDGETY),
+        "fidgety_score": fidgety,
+        "focus_score": focus,
+        "is_focused": bool(flags & _FLAG_FOCUSED),
+        "phone_age_s": phone_age,
+        "tired_age_s": posture_age,
+        "fidgety_age_s": posture_age,
+    }
+
+
+# ---------------- WORKER PROCESS ---------------- #
+
+def _worker_main(worker_idx: int, shm_name: str, slot_bytes: int, conn) -> None:
+    """
+    Entry point of one inference process. It owns its own YOLO and Holistic
+    models (loaded on import / on first session) and one FocusSession per
+    session routed to it.
+    """
+    # Imported here so the models only load inside the worker
+    from .focus_session import FocusSession
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    sessions: Dict[str, FocusSession] = {}
+    print(f"[inference_workers] worker {worker_idx} started (pid {os.getpid()})")
+
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                break
+
+            kind = msg[0]
+            if kind == "stop":
+                break
+
+            if kind == "close":
+                session = sessions.pop(msg[1], None)
+                if session is not None:
+                    session.close()
+                continue
+
+            # ("frame", request_id, session_id, slot, shape, degradation)
+            _, request_id, session_id, slot, shape, degradation = msg
+
+            session = sessions.get(session_id)
+            if session is None:
+                session = FocusSession(session_id)
+                session.open_blocking()
+                sessions[session_id] = session
+            session.degradation = degradation
+
+            # Zero-copy view of the frame the parent wrote into our ring
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            try:
+                res = session.process(frame)
+            except Exception as e:
+                print(f"[inference_workers] worker {worker_idx} error: {e}")
+                conn.send_bytes(_ERROR.pack(request_id))
+                continue
+            finally:
+                del frame
+
+            conn.send_bytes(_pack_result(request_id, res))
+    finally:
+        for session in sessions.values():
+            session.close()
+        try:
+            shm.close()
+        except BufferError:
+            # A detector still holds a view of the ring; the OS cleans up on exit
+            pass
+
+
+# ---------------- PARENT-SIDE POOL ---------------- #
+
+class _WorkerHandle:
+    def __init__(self, idx: int, n_slots: int, slot_bytes: int, ctx):
+        self.idx = idx
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=n_slots * slot_bytes)
+
+        self.conn, child_conn = ctx.Pipe(duplex=True)
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(idx, self.shm.name, slot_bytes, child_conn),
+            daemon=True,
+            name=f"focus-inference-{idx}",
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.free_slots: "asyncio.Queue[int]" = asyncio.Queue()
+        for slot in range(n_slots):
+            self.free_slots.put_nowait(slot)
+
+        # request id -> (future, slot); only touched from the event loop thread
+        self.pending: Dict[int, tuple] = {}
+        self.send_lock = threading.Lock()
+
+
+class InferenceWorkerPool:
+    """
+    Runs FocusSession inference in separate processes so one node can use all
+    of its cores (the GIL and MediaPipe's own threads cap a single process).
+
+    Decoded frames go through a per-worker shared-memory ring instead of being
+    pickled; results come back as a small packed struct over a pipe. Sessions
+    are pinned to a worker by id so each session's stateful detectors
+    (Holistic tracking, blink counts, phone tracker) always live in one place.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = FOCUS_INFERENCE_WORKERS,
+        n_slots: int = FOCUS_SHM_SLOTS,
+        slot_bytes: int = FOCUS_SHM_SLOT_BYTES,
+    ):
+        self.num_workers = max(1, num_workers)
+        self.n_slots = max(1, n_slots)
+        self.slot_bytes = slot_bytes
+
+        self._workers: List[_WorkerHandle] = []
+        self._readers: List[threading.Thread] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._request_ids = count(1)
+
+    # ------------------------ lifecycle ------------------------
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        # spawn: don't fork a process that already has MediaPipe threads running
+        ctx = mp_proc.get_context("spawn")
+
+        for idx in range(self.num_workers):
+            handle = _WorkerHandle(idx, self.n_slots, self.slot_bytes, ctx)
+            self._workers.append(handle)
+
+            reader = threading.Thread(
+                target=self._read_results, args=(handle,), daemon=True,
+                name=f"focus-inference-reader-{idx}",
+            )
+            reader.start()
+            self._readers.append(reader)
+
+        print(f"[inference_workers] started {self.num_workers} worker(s)")
+
+    def stop(self) -> None:
+        for handle in self._workers:
+            try:
+                with handle.send_lock:
+                    handle.conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for handle in self._workers:
+            handle.process.join(timeout=5)
+            if handle.process.is_alive():
+                handle.process.terminate()
+            handle.conn.close()
+            handle.shm.close()
+            handle.shm.unlink()
+        self._workers = []
+
+    # ------------------------ routing ------------------------
+
+    def worker_for(self, session_id: str) -> int:
+        """Stable session -> worker mapping (same answer in every process)."""
+        return zlib.crc32(session_id.encode("utf-8")) % self.num_workers
+
+    # ------------------------ per-frame API ------------------------
+
+    async def submit(
+        self,
+        session_id: str,
+        frame: np.ndarray,
+        degradation: DegradationSettings = DegradationSettings(),
+    ) -> Optional[dict]:
+        """
+        Run one frame for `session_id` on its worker and return the
+        focus_result dict (None if the worker failed on this frame).
+        Waits for a free ring slot when the worker is saturated.
+        """
+        handle = self._workers[self.worker_for(session_id)]
+        if not handle.process.is_alive():
+            raise RuntimeError(f"inference worker {handle.idx} is not running")
+
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.nbytes > handle.slot_bytes:
+            # Explicit, rounded-down size: with fx/fy OpenCV rounds to the
+            # nearest pixel, which can come out a few bytes over the slot
+            scale = (handle.slot_bytes / float(frame.nbytes)) ** 0.5
+            h, w = frame.shape[:2]
+            dsize = (max(1, math.floor(w * scale)), max(1, math.floor(h * scale)))
+            frame = np.ascontiguousarray(cv2.resize(frame, dsize, interpolation=cv2.INTER_AREA))
+        assert frame.nbytes <= handle.slot_bytes, (frame.shape, handle.slot_bytes)
+
+        slot = await handle.free_slots.get()
+        try:
+            dst = np.ndarray(
+                frame.shape, dtype=np.uint8, buffer=handle.shm.buf,
+                offset=slot * handle.slot_bytes,
+            )
+            dst[...] = frame
+            del dst
+
+            request_id = next(self._request_ids)
+            future = self._loop.create_future()
+            handle.pending[request_id] = (future, slot)
+
+            with handle.send_lock:
+                handle.conn.send(("frame", request_id, session_id, slot, frame.shape, degradation))
+        except BaseException:
+            handle.free_slots.put_nowait(slot)
+            raise
+
+        return await future
+
+    def close_session(self, session_id: str) -> None:
+        """Let the worker return the session's Holistic instance to its pool."""
+        handle = self._workers[self.worker_for(session_id)]
+        try:
+            with handle.send_lock:
+                handle.conn.send(("close", session_id))
+        except (BrokenPipeError, OSError):
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.num_workers,
+            "slots_per_worker": self.n_slots,
+            "in_flight": [len(handle.pending) for handle in self._workers],
+            "alive": [handle.process.is_alive() for handle in self._workers],
+        }
+
+    # ------------------------ result reader threads ------------------------
+
+    def _read_results(self, handle: _WorkerHandle) -> None:
+        while True:
+            try:
+                payload = handle.conn.recv_bytes()
+            except (EOFError, OSError):
+                self._loop.call_soon_threadsafe(self._fail_pending, handle)
+                return
+            self._loop.call_soon_threadsafe(self._resolve, handle, payload)
+
+    def _resolve(self, handle: _WorkerHandle, payload: bytes) -> None:
+        if len(payload) == _ERROR.size:
+            (request_id,), res = _ERROR.unpack(payload), None
+        else:
+            request_id, res = _unpack_result(payload)
+
+        future, slot = handle.pending.pop(request_id, (None, None))
+        if slot is not None:
+            handle.free_slots.put_nowait(slot)
+        if future is not None and not future.done():
+            future.set_result(res)
+
+    def _fail_pending(self, handle: _WorkerHandle) -> None:
+        for future, slot in handle.pending.values():
+            handle.free_slots.put_nowait(slot)
+            if not future.done():
+                future.set_exception(RuntimeError(f"inference worker {handle.idx} exited"))
+        handle.pending.clear()
+
+
+_pool: Optional[InferenceWorkerPool] = None
+
+
+def get_inference_workers() -> Optional[InferenceWorkerPool]:
+    """The running worker pool, or None when inference runs in-process."""
+    return _pool
+
+
+def start_inference_workers() -> None:
+    global _pool
+    if FOCUS_INFERENCE_WORKERS <= 0 or _pool is not None:
+        return
+    _pool = InferenceWorkerPool()
+    _pool.start()
+
+
+def stop_inference_workers() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
@@ -0,0 +1,154 @@
+# backend/services/landmark_adapter.py
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from face_state import LEFT_EYE_INDICES, RIGHT_EYE_INDICES
+
+# The only landmarks FaceStateCalculator ever reads. Recordings store just
+# these, which keeps them small.
+FACE_INDICES = tuple(LEFT_EYE_INDICES + RIGHT_EYE_INDICES)  # includes 33 / 263 (face width)
+POSE_INDICES = (11, 12)  # left / right shoulder
+HAND_INDICES = (0,)      # wrist
+
+# Landmark counts of a full MediaPipe result (face: with / without irises)
+_FULL_FACE_COUNTS = (468, 478)
+_FULL_POSE_COUNT = 33
+_FULL_HAND_COUNT = 21
+
+# Client landmarks must be normalized; MediaPipe puts points slightly off
+# frame for body parts outside it, anything further out is garbage
+_COORD_MIN, _COORD_MAX = -1.0, 2.0
+_MAX_IMAGE_SIDE = 4096
+
+
+class _Point:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+
+
+class _LandmarkView:
+    """Indexable like `NormalizedLandmarkList.landmark`, backed by an (N, 2) array."""
+
+    __slots__ = ("_xy", "_rows")
+
+    def __init__(self, xy: np.ndarray, rows: Optional[Dict[int, int]]):
+        self._xy = xy
+        self._rows = rows
+
+    def __getitem__(self, idx: int) -> _Point:
+        row = idx if self._rows is None else self._rows[idx]
+        return _Point(float(self._xy[row, 0]), float(self._xy[row, 1]))
+
+    def __len__(self) -> int:
+        return len(self._xy)
+
+
+class LandmarkList:
+    """
+    Stand-in for a MediaPipe landmark list (`.landmark[i].x / .y`, normalized).
+
+    `indices` says which MediaPipe landmark each row of `xy` is; leave it out
+    when `xy` holds the full set in MediaPipe order.
+    """
+
+    __slots__ = ("landmark",)
+
+    def __init__(self, xy: np.ndarray, indices: Optional[Sequence[int]] = None):
+        rows = None if indices is None else {int(i): r for r, i in enumerate(indices)}
+        self.landmark = _LandmarkView(xy, rows)
+
+
+class HolisticLandmarks:
+    """
+    Quacks like a Holistic result for FaceStateCalculator.update(), built
+    from plain arrays instead of a MediaPipe graph (recordings, client-side
+    landmark extraction).
+    """
+
+    __slots__ = ("face_landmarks", "pose_landmarks", "left_hand_landmarks", "right_hand_landmarks")
+
+    def __init__(
+        self,
+        face_landmarks: Optional[LandmarkList] = None,
+        pose_landmarks: Optional[LandmarkList] = None,
+        left_hand_landmarks: Optional[LandmarkList] = None,
+        right_hand_landmarks: Optional[LandmarkList] = None,
+    ):
+        self.face_landmarks = face_landmarks
+        self.pose_landmarks = pose_landmarks
+        self.left_hand_landmarks = left_hand_landmarks
+        self.right_hand_landmarks = right_hand_landmarks
+
+
+# ---------------- CLIENT-EXTRACTED LANDMARKS ---------------- #
+
+@dataclass
+class ClientLandmarks:
+    """One `landmarks` message from /ws/focus, ready for FaceStateCalculator."""
+    results: HolisticLandmarks
+    img_h: int
+    img_w: int
+
+    @property
+    def present(self) -> bool:
+        return self.results.face_landmarks is not None or self.results.pose_landmarks is not None
+
+
+def _parse_part(data: dict, key: str, indices: Sequence[int], full_counts: Sequence[int]) -> Optional[LandmarkList]:
+    values = data.get(key)
+    if values is None or (isinstance(values, list) and not values):
+        return None
+    if not isinstance(values, list) or len(values) % 2:
+        raise ValueError(f"{key}: expected a flat [x0, y0, x1, y1, ...] list")
+    try:
+        xy = np.asarray(values, dtype=np.float32).reshape(-1, 2)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key}: coordinates must be numbers")
+    if not np.isfinite(xy).all() or xy.min() < _COORD_MIN or xy.max() > _COORD_MAX:
+        raise ValueError(f"{key}: coordinates must be normalized to the frame")
+
+    # Either just the landmarks we use (cheap to send) or MediaPipe's full list
+    if len(xy) == len(indices):
+        return LandmarkList(xy, indices)
+    if len(xy) in full_counts:
+        return LandmarkList(xy)
+    raise ValueError(f"{key}: expected {len(indices)} or {'/'.join(map(str, full_counts))} points, got {len(xy)}")
+
+
+def parse_client_landmarks(data: dict) -> ClientLandmarks:
+    """
+    Validate a `landmarks` message and wrap it for FaceStateCalculator:
+
+        {"type": "landmarks", "width": 320, "height": 240,
+         "face": [x, y, ...], "pose": [...], "left_hand": [...], "right_hand": [...]}
+
+    Each part is a flat list of normalized x/y pairs, either for the points
+    in FACE_INDICES / POSE_INDICES / HAND_INDICES (in that order) or for
+    MediaPipe's full landmark list. Missing or empty parts weren't detected.
+    Raises ValueError describing the first problem found.
+    """
+    img_w, img_h = data.get("width"), data.get("height")
+    for side in (img_w, img_h):
+        if not isinstance(side, int) or isinstance(side, bool) or not 16 <= side <= _MAX_IMAGE_SIDE:
+            raise ValueError(f"width / height must be whole pixels between 16 and {_MAX_IMAGE_SIDE}")
+
+    results = HolisticLandmarks(
+        face_landmarks=_parse_part(data, "face", FACE_INDICES, _FULL_FACE_COUNTS),
+        pose_landmarks=_parse_part(data, "pose", POSE_INDICES, (_FULL_POSE_COUNT,)),
+        left_hand_landmarks=_parse_part(data, "left_hand", HAND_INDICES, (_FULL_HAND_COUNT,)),
+        right_hand_landmarks=_parse_part(data, "right_hand", HAND_INDICES, (_FULL_HAND_COUNT,)),
+    )
+    return ClientLandmarks(results, img_h, img_w)
+
+
+def extract_xy(landmark_list, indices: Sequence[int]) -> Optional[np.ndarray]:
+    """Pull (len(indices), 2) normalized x/y out of a MediaPipe landmark list."""
+    if not landmark_list:
+        return None
+    lm = landmark_list.landmark
+    return np.array([[lm[i].x, lm[i].y] for i in indices], dtype=np.float32)
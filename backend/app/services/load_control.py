@@ -0,0 +1,169 @@
+# backend/services/load_control.py
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# ---------------- CONFIG ---------------- #
+
+# Max concurrent /ws/focus sessions this process accepts
+FOCUS_MAX_SESSIONS = int(os.getenv("FOCUS_MAX_SESSIONS", "32"))
+
+# Per-frame inference latency we try to stay under (ms)
+FOCUS_TARGET_FRAME_MS = float(os.getenv("FOCUS_TARGET_FRAME_MS", "150"))
+
+# Step down a level only once latency is comfortably below target, and never
+# change level more often than this, so we don't flap between levels.
+_RECOVER_RATIO = 0.6
+_LEVEL_HOLD_S = 5.0
+
+# Moving-average weight for the latency signal
+_EWMA_ALPHA = 0.1
+
+# Frame cadence the webcam feed normally uses
+DEFAULT_FRAME_INTERVAL_MS = 500
+
+
+# ---------------- DEGRADATION LADDER ---------------- #
+
+LEVEL_NORMAL = 0
+LEVEL_LOW_RES_HOLISTIC = 1  # Holistic on a half-size frame
+LEVEL_SLOW_PHONE = 2        # + YOLO / phone tracker only every 3rd frame
+LEVEL_LOW_FPS = 3           # + ask clients for 1 frame/s, drop extra frames
+LEVEL_REJECT = 4            # + turn new sessions away with a retry hint
+
+
+@dataclass(frozen=True)
+class DegradationSettings:
+    level: int = LEVEL_NORMAL
+    holistic_scale: float = 1.0   # frame scale fed to Holistic
+    phone_every: int = 1          # run phone detection every N frames
+    frame_interval_ms: int = DEFAULT_FRAME_INTERVAL_MS
+
+
+_LADDER = [
+    DegradationSettings(LEVEL_NORMAL),
+    DegradationSettings(LEVEL_LOW_RES_HOLISTIC, holistic_scale=0.5),
+    DegradationSettings(LEVEL_SLOW_PHONE, holistic_scale=0.5, phone_every=3),
+    DegradationSettings(LEVEL_LOW_FPS, holistic_scale=0.5, phone_every=3, frame_interval_ms=1000),
+    DegradationSettings(LEVEL_REJECT, holistic_scale=0.5, phone_every=3, frame_interval_ms=1000),
+]
+
+
+class LoadController:
+    """
+    Admission control + a degradation ladder driven by measured frame latency.
+
+    When the moving-average per-frame latency goes over target, every session
+    gets a bit cheaper, one rung at a time: smaller Holistic input, then less
+    frequent phone detection, then fewer frames per second. Only when all of
+    that still isn't enough are new sessions turned away. Latency dropping
+    well below target walks back down the ladder.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = FOCUS_MAX_SESSIONS,
+        target_frame_ms: float = FOCUS_TARGET_FRAME_MS,
+    ):
+        self.max_sessions = max_sessions
+        self.target_frame_ms = target_frame_ms
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._level = LEVEL_NORMAL
+        self._level_changed_t = 0.0
+        self._latency_ms: Optional[float] = None
+        self._last_frame_t = 0.0
+        self._rejected = 0
+
+    # ------------------------ admission ------------------------
+
+    def try_admit(self) -> bool:
+        with self._lock:
+            self._recover_idle_locked(time.monotonic())
+            if self._active >= self.max_sessions or self._level >= LEVEL_REJECT:
+                self._rejected += 1
+                return False
+            self._active += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._active = max(0, self._active - 1)
+
+    def retry_after_s(self) -> int:
+        """Rough hint for rejected clients: at least one level-hold period."""
+        return int(_LEVEL_HOLD_S * 2)
+
+    # ------------------------ latency feedback ------------------------
+
+    def _recover_idle_locked(self, now_t: float) -> None:
+        """
+        The level only moves on frame latency, so without frames (everyone
+        left, or the sessions that are left stopped sending) nothing would
+        ever bring it back down, and LEVEL_REJECT would stick forever.
+        """
+        if self._level == LEVEL_NORMAL:
+            return
+        if self._active == 0:
+            # Nothing running: the latency we measured says nothing any more
+            self._latency_ms = None
+            self._set_level_locked(LEVEL_NORMAL, now_t, "idle")
+        elif now_t - self._last_frame_t >= _LEVEL_HOLD_S and now_t - self._level_changed_t >= _LEVEL_HOLD_S:
+            self._set_level_locked(self._level - 1, now_t, "no frames")
+
+    def record_frame_latency(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self._last_frame_t = time.monotonic()
+            if self._latency_ms is None:
+                self._latency_ms = elapsed_ms
+            else:
+                self._latency_ms = (1.0 - _EWMA_ALPHA) * self._latency_ms + _EWMA_ALPHA * elapsed_ms
+
+            now_t = time.monotonic()
+            if now_t - self._level_changed_t < _LEVEL_HOLD_S:
+                return
+
+            if self._latency_ms > self.target_frame_ms and self._level < LEVEL_REJECT:
+                self._set_level_locked(self._level + 1, now_t)
+            elif self._latency_ms < self.target_frame_ms * _RECOVER_RATIO and self._level > LEVEL_NORMAL:
+                self._set_level_locked(self._level - 1, now_t)
+
+    def _set_level_locked(self, level: int, now_t: float, reason: Optional[str] = None) -> None:
+        if reason is None:
+            reason = f"frame latency {self._latency_ms:.0f} ms, target {self.target_frame_ms:.0f} ms"
+        print(f"[load_control] degradation level {self._level} -> {level} ({reason})")
+        self._level = level
+        self._level_changed_t = now_t
+
+    # ------------------------ reporting ------------------------
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    def settings(self) -> DegradationSettings:
+        return _LADDER[self._level]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active_sessions": self._active,
+                "max_sessions": self.max_sessions,
+                "degradation_level": self._level,
+                "frame_latency_ms": self._latency_ms or 0.0,
+                "target_frame_ms": self.target_frame_ms,
+                "rejected": self._rejected,
+            }
+
+
+_controller: Optional[LoadController] = None
+
+
+def get_load_controller() -> LoadController:
+    global _controller
+    if _controller is None:
+        _controller = LoadController()
+    return _controller
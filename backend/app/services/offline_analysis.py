@@ -0,0 +1,278 @@
+# backend/services/offline_analysis.py
+import asyncio
+import multiprocessing as mp_proc
+import os
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+
+from .focus_session import FocusSession
+from .focus_stats import FocusStats
+
+# ---------------- CONFIG ---------------- #
+
+# Frames analyzed per second of video. 2 fps matches the live webcam feed
+# (one frame every 500 ms), so offline numbers line up with live ones.
+OFFLINE_SAMPLE_FPS = 2.0
+
+# Videos are split into chunks of this many seconds that run in parallel.
+# Each chunk starts with fresh detector state, so don't make them tiny.
+OFFLINE_CHUNK_SECONDS = 60.0
+
+# Processes used for offline jobs (each loads its own YOLO + Holistic)
+OFFLINE_MAX_WORKERS = int(os.getenv("OFFLINE_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+# Finished jobs kept around for status queries (oldest are dropped first)
+OFFLINE_KEEP_FINISHED_JOBS = 100
+
+# Largest upload accepted per job (all files together), in MB
+OFFLINE_MAX_UPLOAD_MB = float(os.getenv("OFFLINE_MAX_UPLOAD_MB", "2048"))
+
+# Check for cancellation every this many source frames
+_CANCEL_CHECK_EVERY = 32
+
+# One compact row per analyzed frame:
+# (t, away, away_seconds, phone, tired, fidgety, focus_score)
+FrameRow = Tuple[float, bool, float, bool, bool, bool, float]
+
+
+def _row(t: float, res: dict) -> FrameRow:
+    return (
+        t, res["away"], res["away_seconds"], res["phone"],
+        res["tired"], res["fidgety"], res["focus_score"],
+    )
+
+
+# ---------------- CHUNK WORKERS (run in worker processes) ---------------- #
+
+def analyze_video_chunk(
+    video_path: str,
+    session_id: str,
+    start_frame: int,
+    end_frame: Optional[int],
+    src_fps: float,
+    sample_fps: float,
+    cancel_path: str,
+) -> List[FrameRow]:
+    """
+    Decode [start_frame, end_frame) as a stream and run every sampled frame
+    through a fresh FocusSession, using video time as the session's clock.
+    Skipped frames are only grab()-ed (demuxed), never fully decoded.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    # No frame budget offline: every sampled frame gets every detector
+    session = FocusSession(session_id, start_t=start_frame / src_fps, frame_budget_ms=0)
+    session.open_blocking()
+
+    step = src_fps / sample_fps
+    next_sample = float(start_frame)
+    idx = start_frame
+    rows: List[FrameRow] = []
+
+    try:
+        while end_frame is None or idx < end_frame:
+            if idx % _CANCEL_CHECK_EVERY == 0 and os.path.exists(cancel_path):
+                break
+
+            if idx + 0.5 < next_sample:
+                if not cap.grab():
+                    break
+            else:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                next_sample += step
+                t = idx / src_fps
+                rows.append(_row(t, session.process(frame, t=t)))
+            idx += 1
+    finally:
+        session.close()
+        cap.release()
+
+    return rows
+
+
+def analyze_image_chunk(
+    image_paths: List[str],
+    session_id: str,
+    first_index: int,
+    sample_fps: float,
+    cancel_path: str,
+) -> List[FrameRow]:
+    """Images are treated as consecutive frames, 1 / sample_fps seconds apart."""
+    start_t = first_index / sample_fps
+    session = FocusSession(session_id, start_t=start_t, frame_budget_ms=0)
+    session.open_blocking()
+    rows: List[FrameRow] = []
+
+    try:
+        for i, path in enumerate(image_paths):
+            if os.path.exists(cancel_path):
+                break
+            frame = cv2.imread(path, cv2.IMREAD_COLOR)
+            if frame is None:
+                print(f"[offline_analysis] skipping unreadable image {path}")
+                continue
+            t = start_t + i / sample_fps
+            rows.append(_row(t, session.process(frame, t=t)))
+    finally:
+        session.close()
+
+    return rows
+
+
+# ---------------- JOBS (run in the server process) ---------------- #
+
+class AnalysisJob:
+    """One uploaded video / image batch being analyzed in the background."""
+
+    def __init__(self, sample_fps: float, chunk_seconds: float):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"  # queued -> running -> done | cancelled | failed
+        self.sample_fps = sample_fps
+        self.chunk_seconds = chunk_seconds
+        self.error: Optional[str] = None
+        self.summary: Optional[dict] = None
+
+        self.chunks_total = 0
+        self.chunks_done = 0
+        self.frames_processed = 0
+
+        self.workdir = Path(tempfile.mkdtemp(prefix=f"focus-job-{self.id}-"))
+        self.cancel_path = str(self.workdir / "CANCEL")
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "done":
+            return 1.0
+        return self.chunks_done / self.chunks_total if self.chunks_total else 0.0
+
+    def cancel(self) -> None:
+        if self.status in ("queued", "running"):
+            # Running chunks notice this file and stop early; chunks that
+            # haven't started yet return as soon as they do
+            Path(self.cancel_path).touch()
+            self.status = "cancelled"
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+_jobs: Dict[str, AnalysisJob] = {}
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: don't fork a process that already has MediaPipe threads running
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, OFFLINE_MAX_WORKERS), mp_context=mp_proc.get_context("spawn")
+        )
+    return _executor
+
+
+def get_job(job_id: str) -> Optional[AnalysisJob]:
+    return _jobs.get(job_id)
+
+
+def create_job(sample_fps: float = OFFLINE_SAMPLE_FPS, chunk_seconds: float = OFFLINE_CHUNK_SECONDS) -> AnalysisJob:
+    finished = [j for j in _jobs.values() if j.status in ("done", "cancelled", "failed")]
+    for old in finished[: max(0, len(finished) - OFFLINE_KEEP_FINISHED_JOBS + 1)]:
+        del _jobs[old.id]
+
+    job = AnalysisJob(sample_fps, chunk_seconds)
+    _jobs[job.id] = job
+    return job
+
+
+def _chunk_session_id(job: AnalysisJob, chunk_idx: int) -> str:
+    # Unique across jobs: it names the chunk's recording with FOCUS_RECORD_DIR set
+    return f"offline-{job.id}-{chunk_idx}"
+
+
+def plan_video_chunks(job: AnalysisJob, video_path: str) -> List[tuple]:
+    """Split a video into per-chunk argument tuples for analyze_video_chunk."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError("Could not open video")
+    src_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+
+    # Some containers (e.g. webm from MediaRecorder) don't report a frame
+    # count; those are streamed start to end as a single chunk.
+    if n_frames <= 0:
+        return [(video_path, _chunk_session_id(job, 0), 0, None, src_fps, job.sample_fps, job.cancel_path)]
+
+    frames_per_chunk = max(1, int(round(job.chunk_seconds * src_fps)))
+    return [
+        (video_path, _chunk_session_id(job, i), start, min(start + frames_per_chunk, n_frames), src_fps, job.sample_fps, job.cancel_path)
+        for i, start in enumerate(range(0, n_frames, frames_per_chunk))
+    ]
+
+
+def plan_image_chunks(job: AnalysisJob, image_paths: List[str]) -> List[tuple]:
+    per_chunk = max(1, int(round(job.chunk_seconds * job.sample_fps)))
+    return [
+        (image_paths[start:start + per_chunk], _chunk_session_id(job, i), start, job.sample_fps, job.cancel_path)
+        for i, start in enumerate(range(0, len(image_paths), per_chunk))
+    ]
+
+
+def start_job(job: AnalysisJob, chunk_fn, chunk_args: List[tuple]) -> None:
+    job._task = asyncio.create_task(_run_job(job, chunk_fn, chunk_args))
+
+
+async def _run_job(job: AnalysisJob, chunk_fn, chunk_args: List[tuple]) -> None:
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+
+    if job.status != "queued":
+        job.cleanup()
+        return
+    job.status = "running"
+    job.chunks_total = len(chunk_args)
+    results: List[Optional[List[FrameRow]]] = [None] * len(chunk_args)
+
+    async def run_chunk(i: int, args: tuple) -> None:
+        rows = await loop.run_in_executor(executor, chunk_fn, *args)
+        results[i] = rows
+        job.chunks_done += 1
+        job.frames_processed += len(rows)
+
+    try:
+        await asyncio.gather(*(run_chunk(i, args) for i, args in enumerate(chunk_args)))
+    except Exception as e:
+        print(f"[offline_analysis] job {job.id} failed: {e}")
+        Path(job.cancel_path).touch()  # stop the job's other chunks
+        job.status = "failed"
+        job.error = str(e)
+        job.cleanup()
+        return
+
+    if job.status == "cancelled":
+        job.cleanup()
+        return
+
+    # Chunks finish in any order; stitch them back together in time order
+    stats = FocusStats()
+    for rows in results:
+        for t, away, away_seconds, phone, tired, fidgety, focus_score in rows or []:
+            stats.update(
+                phone=phone, tired=tired, fidgety=fidgety, focus_score=focus_score,
+                away=away, away_seconds=away_seconds, t=t,
+            )
+
+    job.summary = stats.summary()
+    job.status = "done"
+    job.cleanup()
@@ -1,6 +1,7 @@
 # backend/services/phone_detection.py
 from dataclasses import dataclass
 from pathlib import Path
+import threading
 from typing import List, Optional, Tuple, Union
 
 import cv2
@@ -14,6 +15,8 @@ PHONE_LABELS = {"cell phone", "cellphone", "mobile phone"}
 class PhoneDetectionResult:
     phone_detected: bool
     confidence: float = 0.0
+    box: Optional[Tuple[int, int, int, int]] = None  # x, y, w, h in frame pixels
+    source: str = "detection"  # "detection" (full YOLO) or "tracking"
 
 
 # ---------------- YOLO MODEL LOADING (from your old init_phone_detector) ---------------- #
@@ -35,6 +38,9 @@ _yolo_net: Optional[any] = None #CHANGED THIS NOT SURE IF OK
 
 _class_names: List[str] = []
 
+# cv2.dnn networks aren't thread-safe, and sessions now run detectors in threads
+_yolo_lock = threading.Lock()
+
 
 def _load_yolo_model_if_needed() -> None:
     global _yolo_net, _class_names
@@ -42,6 +48,14 @@ def _load_yolo_model_if_needed() -> None:
     if _yolo_net is not None and _class_names:
         return
 
+    with _yolo_lock:
+        if _yolo_net is None or not _class_names:
+            _load_yolo_model()
+
+
+def _load_yolo_model() -> None:
+    global _yolo_net, _class_names
+
     # if not (_WEIGHTS_PATH.exists() and _CONFIG_PATH.exists() and _NAMES_PATH.exists()):
     #     # If any file is missing, just leave the model as None
     #     # (detection will always return no phone).
@@ -81,12 +95,14 @@ def detect_phone(frame: np.ndarray) -> PhoneDetectionResult:
     class_names = _class_names
 
     # Upscale the frame so small objects (like a phone low in the frame) appear larger
-    bigger = cv2.resize(frame, None, fx=1.5, fy=1.5)
+    upscale = 1.5
+    bigger = cv2.resize(frame, None, fx=upscale, fy=upscale)
 
     # Slightly lower confThreshold for more sensitivity (from your old code)
-    class_ids, confidences, boxes = net.detect(
-        bigger, confThreshold=0.25, nmsThreshold=0.4
-    )
+    with _yolo_lock:
+        class_ids, confidences, boxes = net.detect(
+            bigger, confThreshold=0.25, nmsThreshold=0.4
+        )
 
     # Some OpenCV builds return None or empty tuples/lists when nothing is detected
     if class_ids is None:
@@ -96,6 +112,7 @@ def detect_phone(frame: np.ndarray) -> PhoneDetectionResult:
 
     # Track the best confidence among any "phone" detections
     best_phone_conf = 0.0
+    best_phone_box = None
     num_dets = len(boxes)
 
     for i in range(num_dets):
@@ -117,8 +134,116 @@ def detect_phone(frame: np.ndarray) -> PhoneDetectionResult:
         if label in PHONE_LABELS:
             if conf > best_phone_conf:
                 best_phone_conf = conf
+                best_phone_box = boxes[i]
 
     if best_phone_conf > 0.0:
-        return PhoneDetectionResult(phone_detected=True, confidence=best_phone_conf)
+        # Boxes come back in upscaled coordinates, map them to the original frame
+        x, y, w, h = (int(round(float(v) / upscale)) for v in best_phone_box)
+        return PhoneDetectionResult(
+            phone_detected=True, confidence=best_phone_conf, box=(x, y, w, h)
+        )
+
+    return PhoneDetectionResult(phone_detected=False, confidence=0.0)
+
+
+# ---------------- DETECT-THEN-TRACK (cheap frames between YOLO runs) ---------------- #
+
+# While a phone is being tracked, full YOLO still re-runs at least this often
+PHONE_REDETECT_EVERY = 10
+
+# Tracked confidence decays a bit every frame we don't re-check with YOLO.
+# Once it falls below the floor, we re-run YOLO early.
+PHONE_TRACK_DECAY = 0.93
+PHONE_TRACK_MIN_CONFIDENCE = 0.2
+
 
-    return PhoneDetectionResult(phone_detected=False, confidence=0.0)
\ No newline at end of file
+def _create_tracker():
+    """KCF from opencv-contrib; newer builds only expose it under cv2.legacy."""
+    if hasattr(cv2, "legacy") and hasattr(cv2.legacy, "TrackerKCF_create"):
+        return cv2.legacy.TrackerKCF_create()
+    return cv2.TrackerKCF_create()
+
+
+def _box_is_usable(box, img_w: int, img_h: int) -> bool:
+    x, y, w, h = box
+    if w < 4 or h < 4:
+        return False
+    # Mostly outside the frame means the tracker drifted off
+    cx, cy = x + w / 2.0, y + h / 2.0
+    return 0 <= cx < img_w and 0 <= cy < img_h
+
+
+class PhoneTracker:
+    """
+    Per-session detect-then-track wrapper around detect_phone().
+
+    Once YOLO finds a phone, a KCF tracker follows its box on the next frames,
+    which is a lot cheaper than full inference. YOLO runs again every
+    PHONE_REDETECT_EVERY frames, or straight away when the tracker loses the
+    box or its confidence has decayed too far.
+    """
+
+    def __init__(
+        self,
+        redetect_every: int = PHONE_REDETECT_EVERY,
+        decay: float = PHONE_TRACK_DECAY,
+        min_confidence: float = PHONE_TRACK_MIN_CONFIDENCE,
+    ):
+        self.redetect_every = redetect_every
+        self.decay = decay
+        self.min_confidence = min_confidence
+
+        self._tracker = None
+        self._confidence = 0.0
+        self._frames_since_detect = 0
+
+    def reset(self) -> None:
+        self._tracker = None
+        self._confidence = 0.0
+        self._frames_since_detect = 0
+
+    def detect(self, frame: np.ndarray) -> PhoneDetectionResult:
+        if self._tracker is not None and self._frames_since_detect < self.redetect_every:
+            tracked = self._track(frame)
+            if tracked is not None:
+                return tracked
+
+        self.reset()
+        result = detect_phone(frame)
+
+        if result.phone_detected and result.box is not None:
+            try:
+                tracker = _create_tracker()
+                tracker.init(frame, result.box)
+            except (AttributeError, cv2.error) as e:
+                # No contrib build / bad box: just keep running YOLO every frame
+                print(f"[phone_detection] Could not start tracker: {e}")
+            else:
+                self._tracker = tracker
+                self._confidence = result.confidence
+
+        return result
+
+    def _track(self, frame: np.ndarray) -> Optional[PhoneDetectionResult]:
+        self._frames_since_detect += 1
+
+        try:
+            ok, box = self._tracker.update(frame)
+        except cv2.error:
+            return None
+
+        img_h, img_w = frame.shape[:2]
+        if not ok or not _box_is_usable(box, img_w, img_h):
+            return None
+
+        self._confidence *= self.decay
+        if self._confidence < self.min_confidence:
+            return None
+
+        x, y, w, h = (int(round(v)) for v in box)
+        return PhoneDetectionResult(
+            phone_detected=True,
+            confidence=self._confidence,
+            box=(x, y, w, h),
+            source="tracking",
+        )
\ No newline at end of file
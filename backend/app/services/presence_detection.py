@@ -0,0 +1,129 @@
+# backend/services/presence_detection.py
+from dataclasses import dataclass
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class PresenceDetectionResult:
+    present: bool
+    away: bool = False
+    away_seconds: float = 0.0  # away time accounted for by this frame
+
+
+# ---------------- CHEAP PRESENCE CHECK (Haar cascades on a tiny frame) ---------------- #
+
+# Presence only needs "is somebody sitting there", so we look at a heavily
+# downscaled grayscale frame. This costs well under a millisecond, compared to
+# tens of milliseconds for Holistic + YOLO.
+PRESENCE_FRAME_WIDTH = 160
+
+# Nobody seen for this many seconds -> the student is away from the desk.
+# Short enough to catch real breaks, long enough that looking down at notes
+# for a moment doesn't count.
+AWAY_AFTER_SECONDS = 5.0
+
+# CascadeClassifier isn't thread-safe and sessions run detect_presence() in
+# threads, so every thread gets its own pair (a few hundred KB each) instead
+# of all sessions queueing behind one lock
+_cascades = threading.local()
+
+
+def _get_cascades() -> Tuple[cv2.CascadeClassifier, cv2.CascadeClassifier]:
+    face = getattr(_cascades, "face", None)
+    if face is None:
+        # The cascade XML files ship with opencv-python(-contrib)
+        face = _cascades.face = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        )
+        _cascades.body = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_upperbody.xml"
+        )
+        print(f"[presence_detection] Haar cascades loaded in {threading.current_thread().name}.")
+    return face, _cascades.body
+
+
+def detect_presence(frame: np.ndarray) -> PresenceDetectionResult:
+    """
+    Return whether somebody is in front of the camera.
+
+    Tries a frontal face first (the common case), then falls back to an
+    upper-body cascade so a student looking down at their notes still counts
+    as present.
+    """
+    face_cascade, body_cascade = _get_cascades()
+
+    img_h, img_w = frame.shape[:2]
+    scale = PRESENCE_FRAME_WIDTH / float(img_w) if img_w > PRESENCE_FRAME_WIDTH else 1.0
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    gray = cv2.equalizeHist(gray)
+
+    faces = face_cascade.detectMultiScale(
+        gray, scaleFactor=1.2, minNeighbors=3, minSize=(16, 16)
+    )
+    if len(faces) > 0:
+        return PresenceDetectionResult(present=True)
+
+    bodies = body_cascade.detectMultiScale(
+        gray, scaleFactor=1.1, minNeighbors=2, minSize=(40, 40)
+    )
+    return PresenceDetectionResult(present=len(bodies) > 0)
+
+
+# ---------------- PER-SESSION AWAY STATE ---------------- #
+
+class PresenceGate:
+    """
+    Debounces detect_presence() for one session.
+
+    While the student is around, check() says "not away" and the caller runs
+    the full detectors. Once nobody has been seen for `away_after_s`, check()
+    reports away and the caller can skip Holistic and YOLO entirely. The first
+    frame with somebody in it ends the away state.
+    """
+
+    def __init__(self, away_after_s: float = AWAY_AFTER_SECONDS):
+        self.away_after_s = away_after_s
+        self.is_away = False
+        self._last_seen_t: Optional[float] = None
+        self._last_check_t: Optional[float] = None
+
+    def check(self, frame: np.ndarray, now_t: Optional[float] = None) -> PresenceDetectionResult:
+        """`now_t` (seconds) lets offline analysis use video time instead of the wall clock."""
+        return self.observe(detect_presence(frame).present, now_t)
+
+    def observe(self, present: bool, now_t: Optional[float] = None) -> PresenceDetectionResult:
+        """Same as check(), when somebody else already looked (client-side landmarks)."""
+        if now_t is None:
+            now_t = time.monotonic()
+        prev_check_t = self._last_check_t
+        self._last_check_t = now_t
+
+        # The session counts as "seen" when it starts
+        if self._last_seen_t is None:
+            self._last_seen_t = now_t
+
+        if present:
+            self._last_seen_t = now_t
+            self.is_away = False
+            return PresenceDetectionResult(present=True)
+
+        unseen_for = now_t - self._last_seen_t
+        if unseen_for < self.away_after_s:
+            return PresenceDetectionResult(present=False)
+
+        if not self.is_away:
+            # Just crossed the threshold: the whole unseen stretch was away time
+            self.is_away = True
+            away_seconds = unseen_for
+        else:
+            away_seconds = now_t - prev_check_t
+
+        return PresenceDetectionResult(present=False, away=True, away_seconds=away_seconds)
@@ -0,0 +1,159 @@
+# backend/services/profiler.py
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Optional
+
+# ---------------- CONFIG ---------------- #
+
+# Longest profile one request may ask for (seconds), and the fastest
+# sampling rate (Hz). Both keep an accidental request from hurting a live node.
+PROFILE_MAX_SECONDS = 60.0
+PROFILE_MAX_HZ = 250.0
+
+# Most frames a single trace may record
+TRACE_MAX_FRAMES = 500
+
+
+# ---------------- STAGE / SESSION TAGS ---------------- #
+
+# thread id -> "stage=...;session=..." for whatever that thread is doing
+# right now. Plain dict writes are atomic under the GIL.
+_thread_tags: Dict[int, str] = {}
+
+
+@contextmanager
+def stage_tag(stage: str, session_id: str):
+    """
+    Mark the current thread as working on `stage` for `session_id`, so
+    profiler samples taken meanwhile are attributed to it. Only wrap
+    synchronous code: on the event loop thread an await inside the block
+    would let other sessions run under this tag.
+    """
+    tid = threading.get_ident()
+    prev = _thread_tags.get(tid)
+    _thread_tags[tid] = f"stage={stage};session={session_id}"
+    try:
+        yield
+    finally:
+        if prev is None:
+            _thread_tags.pop(tid, None)
+        else:
+            _thread_tags[tid] = prev
+
+
+def tagged(stage: str, session_id: str, fn):
+    """`fn` wrapped in stage_tag(), for handing to asyncio.to_thread()."""
+    def run(*args, **kwargs):
+        with stage_tag(stage, session_id):
+            return fn(*args, **kwargs)
+    return run
+
+
+# ---------------- SAMPLING PROFILER ---------------- #
+
+_profile_lock = threading.Lock()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def collect_profile(seconds: float, hz: float = 100.0, all_threads: bool = False) -> Optional[str]:
+    """
+    Sample every thread's Python stack `hz` times a second for `seconds` and
+    return the samples in collapsed-stack format ("a;b;c 42" per line), which
+    flamegraph.pl, speedscope and inferno all read.
+
+    Stacks of tagged threads start with their stage and session. Untagged
+    threads (idle pool threads, uvicorn internals) are only included with
+    `all_threads`. Native code (imdecode, MediaPipe, the YOLO forward pass)
+    shows up as the Python line that called into it.
+
+    Returns None if another profile is already running. Blocks for
+    `seconds`; call it from a worker thread.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        seconds = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+        interval = 1.0 / min(max(hz, 1.0), PROFILE_MAX_HZ)
+        own_tid = threading.get_ident()
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        counts: Counter = Counter()
+
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for tid, frame in sys._current_frames().items():
+                if tid == own_tid:
+                    continue
+                tag = _thread_tags.get(tid)
+                if tag is None:
+                    if not all_threads:
+                        continue
+                    tag = f"thread={thread_names.get(tid, tid)}"
+
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(tag)
+                counts[";".join(reversed(stack))] += 1
+            time.sleep(interval)
+
+        return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+    finally:
+        _profile_lock.release()
+
+
+# ---------------- PER-SESSION FRAME TRACES ---------------- #
+
+class _Trace:
+    def __init__(self, frames: int):
+        self.remaining = frames
+        self.records: Deque[dict] = deque(maxlen=frames)
+        self.started_at = time.time()
+
+
+_traces: Dict[str, _Trace] = {}
+
+
+def start_trace(session_id: str, frames: int) -> None:
+    """Record stage timings for the next `frames` frames of `session_id`."""
+    _traces[session_id] = _Trace(max(1, min(frames, TRACE_MAX_FRAMES)))
+
+
+def new_trace_record(session_id: str) -> Optional[dict]:
+    """A record to fill in for this frame, or None when it isn't traced."""
+    trace = _traces.get(session_id)
+    if trace is None or trace.remaining <= 0:
+        return None
+    trace.remaining -= 1
+    record = {"received_at": time.time()}
+    trace.records.append(record)
+    return record
+
+
+def get_trace(session_id: str) -> Optional[dict]:
+    trace = _traces.get(session_id)
+    if trace is None:
+        return None
+    return {
+        "session_id": session_id,
+        "started_at": trace.started_at,
+        "remaining": trace.remaining,
+        # Frames still in the pipeline aren't complete yet
+        "frames": [r for r in trace.records if "total_ms" in r or "error" in r],
+    }
+
+
+def stop_trace(session_id: str) -> Optional[dict]:
+    """Stop tracing and hand back what was recorded."""
+    result = get_trace(session_id)
+    _traces.pop(session_id, None)
+    return result
@@ -0,0 +1,116 @@
+# backend/services/result_encoding.py
+import json
+import struct
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# ---------------- FIELDS ---------------- #
+
+# Every focus_result field a client can subscribe to, with its struct code
+# in the binary encoding: "?" = one bit of the leading flags word, "f" =
+# float32, "B" / "H" = unsigned 8 / 16-bit int. None = JSON only.
+RESULT_FIELDS: Dict[str, Optional[str]] = {
+    "away": "?",
+    "away_seconds": "f",
+    "phone": "?",
+    "phone_confidence": "f",
+    "phone_source": None,  # "detection" / "tracking"
+    "tired": "?",
+    "tired_score": "f",
+    "fidgety": "?",
+    "fidgety_score": "f",
+    "focus_score": "f",
+    "is_focused": "?",
+    "phone_age_s": "f",
+    "tired_age_s": "f",
+    "fidgety_age_s": "f",
+    "degradation_level": "B",
+    "frame_interval_ms": "H",
+}
+
+ENCODING_JSON = "json"
+ENCODING_STRUCT = "struct"
+ENCODINGS = (ENCODING_JSON, ENCODING_STRUCT)
+
+# Built once: json.dumps() with non-default separators makes a new encoder per call
+_json_encoder = json.JSONEncoder(separators=(",", ":"))
+
+
+@lru_cache(maxsize=64)
+def _struct_layout(fields: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Tuple[str, ...], struct.Struct]:
+    """
+    (flag fields in bit order, value fields in order, Struct) for a
+    subscription. Cached: sessions subscribing to the same fields share it.
+    """
+    flags = tuple(f for f in fields if RESULT_FIELDS[f] == "?")
+    values = tuple(f for f in fields if RESULT_FIELDS[f] not in ("?", None))
+    flags_code = "B" if len(flags) <= 8 else "H"
+    return flags, values, struct.Struct("<" + flags_code + "".join(RESULT_FIELDS[f] for f in values))
+
+
+class ResultEncoder:
+    """
+    Serializes focus_result dicts for one connection, as negotiated when it
+    opened (?encoding=struct&fields=phone,tired,fidgety):
+
+    json    text messages with "type" plus the subscribed fields (all of them
+            when no list was given), the same shape as before
+    struct  binary messages, little-endian: a flags word (uint8, or uint16
+            past 8 flags) with bit i set when flags[i] is true, then each
+            value field in order. The layout goes to the client once, in the
+            encoding_ready message; only focus_results are ever binary.
+
+    Fields the encoding can't carry or that don't exist are dropped, and
+    encoding_ready lists what is actually sent.
+    """
+
+    def __init__(self, encoding: str = ENCODING_JSON, fields: Optional[Sequence[str]] = None):
+        self.encoding = encoding if encoding in ENCODINGS else ENCODING_JSON
+        self.binary = self.encoding == ENCODING_STRUCT
+
+        requested = list(RESULT_FIELDS) if not fields else [f for f in fields if f in RESULT_FIELDS]
+        if self.binary:
+            requested = [f for f in requested if RESULT_FIELDS[f] is not None]
+        # Keep the client's order, minus repeats
+        self.fields: List[str] = list(dict.fromkeys(requested))
+
+        if self.binary:
+            self._flags, self._values, self._struct = _struct_layout(tuple(self.fields))
+            self._ints = tuple(RESULT_FIELDS[f] in ("B", "H") for f in self._values)
+            self._buf = bytearray(self._struct.size)
+        self._all_fields = fields is None or not fields
+
+    def encode(self, res: dict) -> Union[str, bytes]:
+        if not self.binary:
+            if self._all_fields:
+                return _json_encoder.encode(res)
+            out = {"type": res["type"]}
+            for f in self.fields:
+                out[f] = res[f]
+            return _json_encoder.encode(out)
+
+        flags = 0
+        for bit, f in enumerate(self._flags):
+            if res[f]:
+                flags |= 1 << bit
+        values = [int(res[f]) if is_int else res[f] for f, is_int in zip(self._values, self._ints)]
+        self._struct.pack_into(self._buf, 0, flags, *values)
+        return bytes(self._buf)
+
+    def describe(self) -> dict:
+        """encoding_ready message telling the client what it will get."""
+        msg = {"type": "encoding_ready", "encoding": self.encoding, "fields": self.fields}
+        if self.binary:
+            msg["layout"] = {
+                "flags": list(self._flags),
+                "flags_bytes": 1 if self._struct.format[1] == "B" else 2,
+                "values": [[f, RESULT_FIELDS[f]] for f in self._values],
+                "size": self._struct.size,
+            }
+        return msg
+
+
+def negotiate_encoder(encoding: Optional[str], fields: Optional[str]) -> ResultEncoder:
+    """ResultEncoder from the /ws/focus `encoding` / `fields` query params."""
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    return ResultEncoder((encoding or ENCODING_JSON).lower(), field_list)
@@ -0,0 +1,184 @@
+# backend/services/session_recorder.py
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .landmark_adapter import FACE_INDICES, POSE_INDICES, HAND_INDICES, extract_xy
+
+# Set to a directory to record every session's per-frame landmarks and
+# detections there (one sub-directory per session). Unset = no recording.
+FOCUS_RECORD_DIR = os.getenv("FOCUS_RECORD_DIR", "")
+
+# Rows buffered in memory before they are appended to the column files
+_CHUNK_ROWS = 256
+
+# name -> (dtype, per-row shape). One raw little-endian file per column, so a
+# replay can np.memmap exactly the columns it needs.
+COLUMNS = {
+    "t": ("<f8", ()),                # wall clock, seconds
+    "img_h": ("<u2", ()),
+    "img_w": ("<u2", ()),
+    "away": ("u1", ()),
+    "phone": ("u1", ()),
+    "phone_confidence": ("<f4", ()),
+    "holistic": ("u1", ()),          # 1 = Holistic ran and the analyzer was updated
+    "posture_carried": ("u1", ()),   # 1 = tired / fidgety carried over from an earlier frame
+    "face_ok": ("u1", ()),
+    "face_xy": ("<f4", (len(FACE_INDICES), 2)),
+    "pose_ok": ("u1", ()),
+    "pose_xy": ("<f4", (len(POSE_INDICES), 2)),
+    "left_hand_ok": ("u1", ()),
+    "left_hand_xy": ("<f4", (len(HAND_INDICES), 2)),
+    "right_hand_ok": ("u1", ()),
+    "right_hand_xy": ("<f4", (len(HAND_INDICES), 2)),
+}
+
+_META_FILE = "meta.json"
+
+
+class SessionRecorder:
+    """
+    Append-only columnar recording of one session.
+
+    Only the landmarks FaceStateCalculator reads are kept (a few dozen floats
+    per frame), so hours of session fit in a few MB and replaying them
+    doesn't need MediaPipe or YOLO at all. See load_recording() and
+    tools/rescore.py.
+    """
+
+    def __init__(self, directory: Path, session_id: str, start_t: Optional[float] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.session_id = session_id
+        self.start_t = time.time() if start_t is None else start_t
+
+        self._buffers = {
+            name: np.zeros((_CHUNK_ROWS,) + shape, dtype=dtype)
+            for name, (dtype, shape) in COLUMNS.items()
+        }
+        self._files = {
+            name: open(self.directory / f"{name}.bin", "ab") for name in COLUMNS
+        }
+        self._row = 0
+        self._frames = 0
+        self._write_meta()
+
+    def record(
+        self,
+        t: float,
+        img_h: int,
+        img_w: int,
+        away: bool,
+        phone_detected: bool = False,
+        phone_confidence: float = 0.0,
+        holistic_results=None,
+        posture_carried: bool = False,
+    ) -> None:
+        """
+        Add one frame. `holistic_results` is what the analyzer was fed (or None);
+        `posture_carried` is set when the frame scheduler skipped Holistic.
+        """
+        i = self._row
+        b = self._buffers
+
+        b["t"][i] = t
+        b["img_h"][i] = img_h
+        b["img_w"][i] = img_w
+        b["away"][i] = away
+        b["phone"][i] = phone_detected
+        b["phone_confidence"][i] = phone_confidence
+        b["holistic"][i] = holistic_results is not None
+        b["posture_carried"][i] = posture_carried
+
+        parts = (
+            ("face", "face_landmarks", FACE_INDICES),
+            ("pose", "pose_landmarks", POSE_INDICES),
+            ("left_hand", "left_hand_landmarks", HAND_INDICES),
+            ("right_hand", "right_hand_landmarks", HAND_INDICES),
+        )
+        for name, attr, indices in parts:
+            xy = None
+            if holistic_results is not None:
+                xy = extract_xy(getattr(holistic_results, attr, None), indices)
+            b[f"{name}_ok"][i] = xy is not None
+            b[f"{name}_xy"][i] = 0.0 if xy is None else xy
+
+        self._row += 1
+        if self._row == _CHUNK_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._row == 0:
+            return
+        for name, f in self._files.items():
+            self._buffers[name][: self._row].tofile(f)
+            f.flush()
+        self._frames += self._row
+        self._row = 0
+        self._write_meta()
+
+    def close(self) -> None:
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def _write_meta(self) -> None:
+        meta = {
+            "session_id": self.session_id,
+            "start_t": self.start_t,  # when the session's analyzer started its clock
+            "frames": self._frames,
+            "face_indices": list(FACE_INDICES),
+            "pose_indices": list(POSE_INDICES),
+            "hand_indices": list(HAND_INDICES),
+            "columns": {
+                name: {"dtype": dtype, "shape": list(shape)}
+                for name, (dtype, shape) in COLUMNS.items()
+            },
+        }
+        tmp = self.directory / (_META_FILE + ".tmp")
+        tmp.write_text(json.dumps(meta))
+        tmp.replace(self.directory / _META_FILE)
+
+
+def open_recorder(session_id: str, start_t: Optional[float] = None) -> Optional[SessionRecorder]:
+    """A recorder for this session if FOCUS_RECORD_DIR is set, else None."""
+    if not FOCUS_RECORD_DIR:
+        return None
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    root = Path(FOCUS_RECORD_DIR).resolve()
+    name = f"{stamp}-{session_id}"
+    directory = (root / name).resolve()
+    if directory.parent != root or directory.name != name:
+        # Never let a session id pick a directory outside FOCUS_RECORD_DIR
+        print(f"[session_recorder] not recording session {session_id!r}: bad directory name")
+        return None
+    return SessionRecorder(directory, session_id, start_t=start_t)
+
+
+def load_recording(directory: Path) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """
+    Memory-map every column of a recording -> (meta, columns). Nothing is read
+    until it's used, and frames written after the last flush aren't visible yet.
+    """
+    directory = Path(directory)
+    meta = json.loads((directory / _META_FILE).read_text())
+    n = meta["frames"]
+    missing = [name for name in COLUMNS if name not in meta["columns"]]
+    if missing:
+        raise ValueError(f"{directory}: recording has no {', '.join(missing)} column")
+
+    columns = {}
+    for name, spec in meta["columns"].items():
+        shape = (n,) + tuple(spec["shape"])
+        if n == 0:
+            columns[name] = np.zeros(shape, dtype=spec["dtype"])
+        else:
+            columns[name] = np.memmap(
+                directory / f"{name}.bin", dtype=spec["dtype"], mode="r", shape=shape
+            )
+    return meta, columns
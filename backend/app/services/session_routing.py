@@ -0,0 +1,73 @@
+# backend/services/session_routing.py
+import bisect
+import hashlib
+import os
+from typing import List, Optional
+
+# ---------------- CONFIG ---------------- #
+
+# Base URLs of every backend instance, comma-separated and listed in the
+# same order on every instance, e.g. "ws://10.0.0.5:8001,ws://10.0.0.5:8002".
+# Empty = a single instance, nothing is routed.
+FOCUS_WORKER_URLS = [u.strip().rstrip("/") for u in os.getenv("FOCUS_WORKER_URLS", "").split(",") if u.strip()]
+
+# This instance's position in FOCUS_WORKER_URLS
+FOCUS_WORKER_INDEX = int(os.getenv("FOCUS_WORKER_INDEX", "0"))
+
+# Points per instance on the hash ring. More = more even spread.
+_VNODES = 64
+
+
+def _hash(key: str) -> int:
+    # Stable across processes and restarts (unlike hash())
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hashing of session ids onto instances. Adding or removing an
+    instance only moves the sessions that hashed next to it, not everyone's.
+    """
+
+    def __init__(self, nodes: List[str], vnodes: int = _VNODES):
+        self.nodes = list(nodes)
+        points = sorted(
+            (_hash(f"{node}#{v}"), idx)
+            for idx, node in enumerate(self.nodes)
+            for v in range(vnodes)
+        )
+        self._keys = [h for h, _ in points]
+        self._owners = [idx for _, idx in points]
+
+    def owner(self, key: str) -> int:
+        """Index (into nodes) of the instance responsible for `key`."""
+        i = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[i]
+
+
+_ring: Optional[HashRing] = HashRing(FOCUS_WORKER_URLS) if FOCUS_WORKER_URLS else None
+
+
+def owner_url(session_id: str) -> str:
+    """Base URL of the instance that runs `session_id` ("" when not routing)."""
+    if _ring is None:
+        return ""
+    return _ring.nodes[_ring.owner(session_id)]
+
+
+def redirect_url(session_id: str) -> Optional[str]:
+    """
+    Base URL to send this session to, or None if it belongs here. A session
+    always lands on the same instance, so its stateful detectors (Holistic
+    tracking, blink history, phone tracker) survive reconnects.
+    """
+    if _ring is None or _ring.owner(session_id) == FOCUS_WORKER_INDEX:
+        return None
+    return owner_url(session_id)
+
+
+def routing_stats() -> dict:
+    return {
+        "instances": len(FOCUS_WORKER_URLS),
+        "index": FOCUS_WORKER_INDEX if FOCUS_WORKER_URLS else None,
+    }
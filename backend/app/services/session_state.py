@@ -0,0 +1,353 @@
+# backend/services/session_state.py
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional
+
+from .focus_stats import FocusAnalytics, FocusStats
+
+# ---------------- CONFIG ---------------- #
+
+# Where the /focus/summary counters live:
+#   "memory" - in this process (fine for a single uvicorn worker)
+#   "sqlite" - in a SQLite file every worker on the host shares, so any
+#              worker can answer for any session
+FOCUS_STATE_BACKEND = os.getenv("FOCUS_STATE_BACKEND", "memory")
+FOCUS_STATE_DB_PATH = os.getenv("FOCUS_STATE_DB_PATH", "focus_state.db")
+
+# Per-session counters kept, in memory or in the SQLite file (the sessions
+# updated longest ago are dropped first)
+FOCUS_STATE_KEEP_SESSIONS = int(os.getenv("FOCUS_STATE_KEEP_SESSIONS", "1000"))
+
+# Pseudo session that every frame is also counted under: the old process-wide
+# summary, used when no session_id is given. Counters only, no timeline.
+ALL_SESSIONS = "*"
+
+# SQLite backend: frames are queued and committed in batches by a background
+# thread, at most this long after they arrive (seconds), at most this many
+# per transaction. Past _QUEUE_MAX queued frames new ones are dropped.
+_FLUSH_INTERVAL_S = 0.25
+_BATCH_MAX = 2000
+_QUEUE_MAX = 10000
+
+# How often the SQLite writer drops sessions past FOCUS_STATE_KEEP_SESSIONS (seconds)
+_PRUNE_EVERY_S = 60.0
+
+
+class SessionStateBackend(ABC):
+    """
+    Running per-session focus counters behind /focus/summary.
+
+    Every frame is counted under its own session and under ALL_SESSIONS, and
+    summaries come back in FocusStats.summary() form. `t` is the frame's time
+    in seconds (wall clock if left out). update() is called on the event
+    loop for every frame, so it must never wait on I/O.
+    """
+
+    @abstractmethod
+    def update(
+        self,
+        session_id: str,
+        *,
+        phone: bool,
+        tired: bool,
+        fidgety: bool,
+        focus_score: float,
+        away: bool = False,
+        away_seconds: float = 0.0,
+        t: Optional[float] = None,
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def summary(self, session_id: str = ALL_SESSIONS, timeline: bool = True) -> dict:
+        """`timeline=False` leaves out the per-frame timeline, the only part that grows."""
+
+    @abstractmethod
+    def reset(self, session_id: str = ALL_SESSIONS) -> None:
+        """Clear one session, or everything for ALL_SESSIONS."""
+
+
+class InProcessSessionState(SessionStateBackend):
+    def __init__(self, keep_sessions: int = FOCUS_STATE_KEEP_SESSIONS):
+        self.keep_sessions = keep_sessions
+        self._stats: "OrderedDict[str, FocusStats]" = OrderedDict()
+        self._stats[ALL_SESSIONS] = FocusStats(aggregate=True)
+
+    def update(self, session_id: str, **frame) -> None:
+        # Same timestamp for the session and the overall stats
+        frame.setdefault("t", time.time())
+        stats = self._stats.get(session_id)
+        if stats is None:
+            stats = self._stats[session_id] = FocusStats()
+            while len(self._stats) > self.keep_sessions + 1:
+                oldest = next(k for k in self._stats if k != ALL_SESSIONS)
+                del self._stats[oldest]
+        self._stats.move_to_end(session_id)
+
+        stats.update(**frame)
+        if session_id != ALL_SESSIONS:
+            self._stats[ALL_SESSIONS].update(**frame)
+
+    def summary(self, session_id: str = ALL_SESSIONS, timeline: bool = True) -> dict:
+        return self._stats.get(session_id, FocusStats()).summary(timeline)
+
+    def reset(self, session_id: str = ALL_SESSIONS) -> None:
+        if session_id == ALL_SESSIONS:
+            self._stats.clear()
+            self._stats[ALL_SESSIONS] = FocusStats(aggregate=True)
+        else:
+            self._stats.pop(session_id, None)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS focus_state (
+    session_id   TEXT PRIMARY KEY,
+    phone        INTEGER NOT NULL DEFAULT 0,
+    tired        INTEGER NOT NULL DEFAULT 0,
+    fidgety      INTEGER NOT NULL DEFAULT 0,
+    away         INTEGER NOT NULL DEFAULT 0,
+    away_seconds REAL NOT NULL DEFAULT 0,
+    time_counter REAL NOT NULL DEFAULT 0,
+    analytics    TEXT,  -- FocusAnalytics.to_dict() as JSON
+    updated_at   REAL
+);
+CREATE TABLE IF NOT EXISTS focus_timeline (
+    session_id   TEXT NOT NULL,
+    t            REAL NOT NULL,
+    score        REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS focus_timeline_session ON focus_timeline (session_id, t);
+"""
+
+def _load_analytics(key: str, blob: Optional[str]) -> FocusAnalytics:
+    """A row's FocusAnalytics (empty for a row that was only just inserted)."""
+    if blob:
+        return FocusAnalytics.from_dict(json.loads(blob))
+    return FocusAnalytics(aggregate=key == ALL_SESSIONS)
+
+
+class SQLiteSessionState(SessionStateBackend):
+    """
+    Counters in a SQLite file (WAL mode) shared by every worker process on
+    the host. Same numbers as FocusStats: counters and timeline in SQL, the
+    FocusAnalytics state as JSON in the session's row.
+
+    update() only queues the frame; one writer thread per process commits
+    queued frames in batches, loading and storing each session's analytics
+    once per batch rather than once per frame. summary() and reset() first
+    wait for this process's queued frames to be committed; frames queued in
+    other workers show up within _FLUSH_INTERVAL_S.
+    """
+
+    def __init__(self, path: str = FOCUS_STATE_DB_PATH, keep_sessions: int = FOCUS_STATE_KEEP_SESSIONS):
+        self.path = path
+        self.keep_sessions = keep_sessions
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._dropped = 0
+        self._last_prune_t = 0.0
+        self._thread = threading.Thread(target=self._writer, daemon=True, name="focus-state-writer")
+        self._thread.start()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def update(
+        self,
+        session_id: str,
+        *,
+        phone: bool,
+        tired: bool,
+        fidgety: bool,
+        focus_score: float,
+        away: bool = False,
+        away_seconds: float = 0.0,
+        t: Optional[float] = None,
+    ) -> None:
+        if self._queue.qsize() >= _QUEUE_MAX:
+            self._dropped += 1
+            if self._dropped % 1000 == 1:
+                print(f"[session_state] writer is behind, dropped {self._dropped} frames so far")
+            return
+        self._queue.put_nowait((
+            "frame",
+            session_id,
+            time.time() if t is None else t,
+            bool(phone),
+            bool(tired),
+            bool(fidgety),
+            float(focus_score),
+            bool(away),
+            float(away_seconds),
+        ))
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait (up to `timeout`) until every frame queued so far is committed."""
+        done = threading.Event()
+        self._queue.put_nowait(("flush", done))
+        done.wait(timeout)
+
+    # ------------------------ writer thread ------------------------
+
+    def _writer(self) -> None:
+        conn = self._conn()
+        while True:
+            try:
+                batch = [self._queue.get(timeout=_FLUSH_INTERVAL_S)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < _BATCH_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            frames = [item for item in batch if item[0] == "frame"]
+            if frames:
+                try:
+                    self._write_batch(conn, frames)
+                except sqlite3.Error as e:
+                    print(f"[session_state] dropped a batch of {len(frames)} frames: {e}")
+
+            now_t = time.time()
+            if now_t - self._last_prune_t >= _PRUNE_EVERY_S:
+                self._last_prune_t = now_t
+                self._prune(conn)
+
+            for item in batch:
+                if item[0] == "flush":
+                    item[1].set()
+
+    def _write_batch(self, conn: sqlite3.Connection, frames: List[tuple]) -> None:
+        per_key: Dict[str, List[tuple]] = defaultdict(list)
+        for frame in frames:
+            per_key[frame[1]].append(frame)
+            if frame[1] != ALL_SESSIONS:
+                per_key[ALL_SESSIONS].append(frame)
+
+        now_t = time.time()
+        with conn:
+            for key, rows in per_key.items():
+                # The insert takes the write lock, so no other worker updates
+                # the analytics between our read and write below
+                conn.execute("INSERT OR IGNORE INTO focus_state (session_id) VALUES (?)", (key,))
+                time_counter, blob = conn.execute(
+                    "SELECT time_counter, analytics FROM focus_state WHERE session_id = ?", (key,)
+                ).fetchone()
+                analytics = _load_analytics(key, blob)
+
+                phone_n = tired_n = fidgety_n = away_n = 0
+                away_s = 0.0
+                timeline = []
+                for _, _, t, phone, tired, fidgety, score, away, away_seconds in rows:
+                    analytics.update(t, away, (phone, tired, fidgety), score)
+                    away_s += away_seconds
+                    if away:
+                        away_n += 1
+                    else:
+                        phone_n += phone
+                        tired_n += tired
+                        fidgety_n += fidgety
+                        if key != ALL_SESSIONS:
+                            timeline.append((key, time_counter, score))
+                    time_counter += 1
+
+                if timeline:
+                    conn.executemany("INSERT INTO focus_timeline VALUES (?, ?, ?)", timeline)
+                conn.execute(
+                    "UPDATE focus_state SET phone = phone + ?, tired = tired + ?, fidgety = fidgety + ?, "
+                    "away = away + ?, away_seconds = away_seconds + ?, time_counter = ?, "
+                    "analytics = ?, updated_at = ? WHERE session_id = ?",
+                    (
+                        phone_n, tired_n, fidgety_n, away_n, away_s, time_counter,
+                        json.dumps(analytics.to_dict()), now_t, key,
+                    ),
+                )
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Drop the sessions updated longest ago, past keep_sessions."""
+        try:
+            with conn:
+                stale = conn.execute(
+                    "SELECT session_id FROM focus_state WHERE session_id != ? "
+                    "ORDER BY updated_at DESC LIMIT -1 OFFSET ?",
+                    (ALL_SESSIONS, self.keep_sessions),
+                ).fetchall()
+                conn.executemany("DELETE FROM focus_state WHERE session_id = ?", stale)
+                conn.executemany("DELETE FROM focus_timeline WHERE session_id = ?", stale)
+            if stale:
+                print(f"[session_state] pruned {len(stale)} old sessions")
+        except sqlite3.Error as e:
+            print(f"[session_state] pruning failed: {e}")
+
+    # ------------------------ reads ------------------------
+
+    def summary(self, session_id: str = ALL_SESSIONS, timeline: bool = True) -> dict:
+        self.flush()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT phone, tired, fidgety, away, away_seconds, analytics FROM focus_state WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if row is None:
+            return FocusStats(aggregate=session_id == ALL_SESSIONS).summary(timeline)
+
+        points = []
+        if timeline:
+            points = conn.execute(
+                "SELECT t, score FROM focus_timeline WHERE session_id = ? ORDER BY t", (session_id,)
+            ).fetchall()
+        phone, tired, fidgety, away, away_seconds, blob = row
+        analytics = _load_analytics(session_id, blob)
+        return {
+            "focus_score": analytics.score_sum / analytics.frames if analytics.frames else 0.0,
+            "phone": phone,
+            "tired": tired,
+            "fidgety": fidgety,
+            "away": away,
+            "away_seconds": away_seconds,
+            "focus_timeline": [[t, s] for t, s in points],
+            **analytics.summary(),
+        }
+
+    def reset(self, session_id: str = ALL_SESSIONS) -> None:
+        self.flush()
+        conn = self._conn()
+        with conn:
+            if session_id == ALL_SESSIONS:
+                conn.execute("DELETE FROM focus_state")
+                conn.execute("DELETE FROM focus_timeline")
+            else:
+                conn.execute("DELETE FROM focus_state WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM focus_timeline WHERE session_id = ?", (session_id,))
+
+
+_backend: Optional[SessionStateBackend] = None
+
+
+def get_session_state() -> SessionStateBackend:
+    global _backend
+    if _backend is None:
+        if FOCUS_STATE_BACKEND == "sqlite":
+            _backend = SQLiteSessionState()
+        elif FOCUS_STATE_BACKEND == "memory":
+            _backend = InProcessSessionState()
+        else:
+            raise ValueError(f"Unknown FOCUS_STATE_BACKEND: {FOCUS_STATE_BACKEND!r}")
+    return _backend
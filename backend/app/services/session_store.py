@@ -0,0 +1,350 @@
+# backend/services/session_store.py
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# ---------------- CONFIG ---------------- #
+
+# SQLite file holding session history, e.g. "focus.db". Off unless set.
+FOCUS_DB_PATH = os.getenv("FOCUS_DB_PATH", "")
+
+# Raw per-frame rows older than this are deleted; sessions and per-minute
+# rollups are kept, so history and charts survive compaction.
+FOCUS_RAW_RETENTION_DAYS = float(os.getenv("FOCUS_RAW_RETENTION_DAYS", "7"))
+
+# Writes are queued and committed in batches by a background thread. Past
+# this many queued writes, frame rows are dropped instead of slowing the
+# WebSocket path down.
+FOCUS_STORE_QUEUE_MAX = int(os.getenv("FOCUS_STORE_QUEUE_MAX", "10000"))
+
+# Longest a queued write waits before it is committed (seconds), and the
+# most writes committed in one transaction
+_FLUSH_INTERVAL_S = 1.0
+_BATCH_MAX = 2000
+
+# How often the writer thread applies the retention policy (seconds)
+_RETENTION_EVERY_S = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id   TEXT PRIMARY KEY,
+    user_id      TEXT,
+    started_at   REAL NOT NULL,
+    ended_at     REAL,
+    last_frame_at REAL,
+    frames       INTEGER NOT NULL DEFAULT 0,
+    away_frames  INTEGER NOT NULL DEFAULT 0,
+    phone        INTEGER NOT NULL DEFAULT 0,
+    tired        INTEGER NOT NULL DEFAULT 0,
+    fidgety      INTEGER NOT NULL DEFAULT 0,
+    away_seconds REAL NOT NULL DEFAULT 0,
+    focus_sum    REAL NOT NULL DEFAULT 0,
+    scored       INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_user_started ON sessions (user_id, started_at DESC);
+
+CREATE TABLE IF NOT EXISTS frames (
+    session_id   TEXT NOT NULL,
+    t            REAL NOT NULL,
+    away         INTEGER NOT NULL,
+    away_seconds REAL NOT NULL,
+    phone        INTEGER NOT NULL,
+    tired        INTEGER NOT NULL,
+    fidgety      INTEGER NOT NULL,
+    focus_score  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS frames_session_t ON frames (session_id, t);
+CREATE INDEX IF NOT EXISTS frames_t ON frames (t);
+
+CREATE TABLE IF NOT EXISTS minute_rollups (
+    session_id   TEXT NOT NULL,
+    minute       INTEGER NOT NULL,  -- unix time of the start of the minute
+    frames       INTEGER NOT NULL,
+    away_frames  INTEGER NOT NULL,
+    phone        INTEGER NOT NULL,
+    tired        INTEGER NOT NULL,
+    fidgety      INTEGER NOT NULL,
+    away_seconds REAL NOT NULL,
+    focus_sum    REAL NOT NULL,
+    scored       INTEGER NOT NULL,
+    PRIMARY KEY (session_id, minute)
+);
+"""
+
+# Column order of the per-session / per-minute counters, as accumulated below
+_COUNTERS = ("frames", "away_frames", "phone", "tired", "fidgety", "away_seconds", "focus_sum", "scored")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # WAL: readers (history queries) never wait for the writer and vice versa
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SessionStore:
+    """
+    Durable session history in an embedded SQLite database.
+
+    The WebSocket path only ever puts small tuples on a queue; a single
+    writer thread commits them in batches, keeps the per-session totals and
+    per-minute rollups up to date in the same transaction, and periodically
+    compacts raw frames past the retention window. History queries only read
+    the sessions and minute_rollups tables, never the raw frames.
+    """
+
+    def __init__(self, path: str = FOCUS_DB_PATH, raw_retention_days: float = FOCUS_RAW_RETENTION_DAYS):
+        self.path = path
+        self.raw_retention_s = raw_retention_days * 86400.0
+
+        conn = sqlite3.connect(path)
+        # Has to be set before the first table exists to take effect
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._dropped = 0
+        self._written = 0
+        self._last_retention_t = 0.0
+
+    # ------------------------ lifecycle ------------------------
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._writer, daemon=True, name="focus-session-store")
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Commit everything still queued, then stop the writer."""
+        if self._thread is None:
+            return
+        self._queue.put(("stop",))
+        self._thread.join(timeout=30)
+        self._thread = None
+
+    # ------------------------ write API (never blocks) ------------------------
+
+    def start_session(self, session_id: str, user_id: Optional[str] = None) -> None:
+        self._queue.put_nowait(("start", session_id, user_id, time.time()))
+
+    def end_session(self, session_id: str) -> None:
+        self._queue.put_nowait(("end", session_id, time.time()))
+
+    def record_frame(self, session_id: str, result: dict) -> None:
+        """Queue one focus_result. Dropped (and counted) if the writer is far behind."""
+        if self._queue.qsize() >= FOCUS_STORE_QUEUE_MAX:
+            self._dropped += 1
+            return
+        self._queue.put_nowait((
+            "frame",
+            session_id,
+            time.time(),
+            bool(result["away"]),
+            float(result["away_seconds"]),
+            bool(result["phone"]),
+            bool(result["tired"]),
+            bool(result["fidgety"]),
+            float(result["focus_score"]),
+        ))
+
+    # ------------------------ writer thread ------------------------
+
+    def _writer(self) -> None:
+        conn = _connect(self.path)
+        running = True
+        try:
+            while running:
+                try:
+                    batch = [self._queue.get(timeout=_FLUSH_INTERVAL_S)]
+                except queue.Empty:
+                    batch = []
+                while len(batch) < _BATCH_MAX:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                # stop() is the last thing queued, but a write racing it can
+                # land after it: commit everything either side, then stop
+                if any(item[0] == "stop" for item in batch):
+                    batch = [item for item in batch if item[0] != "stop"]
+                    while True:
+                        try:
+                            batch.append(self._queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    running = False
+                if batch:
+                    try:
+                        self._write_batch(conn, batch)
+                    except (sqlite3.Error, ValueError) as e:
+                        print(f"[session_store] dropped a batch of {len(batch)} writes: {e}")
+
+                now_t = time.time()
+                if running and now_t - self._last_retention_t >= _RETENTION_EVERY_S:
+                    self._last_retention_t = now_t
+                    self._apply_retention(conn, now_t)
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[tuple]) -> None:
+        frames = []
+        per_session: Dict[str, list] = defaultdict(lambda: [0, 0, 0, 0, 0, 0.0, 0.0, 0, 0.0])
+        per_minute: Dict[tuple, list] = defaultdict(lambda: [0, 0, 0, 0, 0, 0.0, 0.0, 0])
+
+        with conn:
+            for item in batch:
+                kind = item[0]
+                if kind == "start":
+                    _, session_id, user_id, t = item
+                    # A reconnect with the same id continues the session
+                    conn.execute(
+                        "INSERT INTO sessions (session_id, user_id, started_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT (session_id) DO UPDATE SET ended_at = NULL, "
+                        "user_id = COALESCE(excluded.user_id, sessions.user_id)",
+                        (session_id, user_id, t),
+                    )
+                elif kind == "end":
+                    _, session_id, t = item
+                    conn.execute("UPDATE sessions SET ended_at = ? WHERE session_id = ?", (t, session_id))
+                else:
+                    _, session_id, t, away, away_s, phone, tired, fidgety, score = item
+                    frames.append((session_id, t, away, away_s, phone, tired, fidgety, score))
+
+                    row = (
+                        1, int(away), int(phone and not away), int(tired and not away),
+                        int(fidgety and not away), away_s,
+                        0.0 if away else score, 0 if away else 1,
+                    )
+                    for acc in (per_session[session_id], per_minute[(session_id, int(t // 60) * 60)]):
+                        for i, v in enumerate(row):
+                            acc[i] += v
+                    per_session[session_id][8] = max(per_session[session_id][8], t)
+
+            if frames:
+                conn.executemany("INSERT INTO frames VALUES (?, ?, ?, ?, ?, ?, ?, ?)", frames)
+                conn.executemany(
+                    "INSERT INTO minute_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (session_id, minute) DO UPDATE SET "
+                    + ", ".join(f"{c} = {c} + excluded.{c}" for c in _COUNTERS),
+                    [(sid, minute, *acc) for (sid, minute), acc in per_minute.items()],
+                )
+                conn.executemany(
+                    "UPDATE sessions SET "
+                    + ", ".join(f"{c} = {c} + ?" for c in _COUNTERS)
+                    + ", last_frame_at = MAX(COALESCE(last_frame_at, 0), ?) WHERE session_id = ?",
+                    [(*acc, sid) for sid, acc in per_session.items()],
+                )
+
+        self._written += len(batch)
+
+    def _apply_retention(self, conn: sqlite3.Connection, now_t: float) -> None:
+        """Delete raw frames past retention and give the pages back to the OS."""
+        try:
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM frames WHERE t < ?", (now_t - self.raw_retention_s,)
+                ).rowcount
+            if deleted:
+                conn.execute("PRAGMA incremental_vacuum")
+                print(f"[session_store] compacted {deleted} raw frame rows")
+        except sqlite3.Error as e:
+            print(f"[session_store] retention failed: {e}")
+
+    # ------------------------ queries ------------------------
+
+    def list_sessions(self, user_id: str, limit: int = 20, before: Optional[float] = None) -> List[dict]:
+        """A user's sessions, newest first (served from the user/started_at index)."""
+        conn = _connect(self.path)
+        try:
+            rows = conn.execute(
+                "SELECT * FROM sessions WHERE user_id = ? AND started_at < ? "
+                "ORDER BY started_at DESC LIMIT ?",
+                (user_id, float("inf") if before is None else before, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [_session_dict(row) for row in rows]
+
+    def get_session(self, session_id: str) -> Optional[dict]:
+        conn = _connect(self.path)
+        try:
+            row = conn.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            minutes = conn.execute(
+                "SELECT * FROM minute_rollups WHERE session_id = ? ORDER BY minute", (session_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        session = _session_dict(row)
+        session["minutes"] = [
+            {
+                "minute": m["minute"],
+                "frames": m["frames"],
+                "away": m["away_frames"],
+                "phone": m["phone"],
+                "tired": m["tired"],
+                "fidgety": m["fidgety"],
+                "away_seconds": m["away_seconds"],
+                "focus_score": m["focus_sum"] / m["scored"] if m["scored"] else 0.0,
+            }
+            for m in minutes
+        ]
+        return session
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "written": self._written,
+            "dropped": self._dropped,
+        }
+
+
+def _session_dict(row: sqlite3.Row) -> dict:
+    return {
+        "session_id": row["session_id"],
+        "user_id": row["user_id"],
+        "started_at": row["started_at"],
+        "ended_at": row["ended_at"],
+        "duration_seconds": (row["ended_at"] or row["last_frame_at"] or row["started_at"]) - row["started_at"],
+        "frames": row["frames"],
+        "phone": row["phone"],
+        "tired": row["tired"],
+        "fidgety": row["fidgety"],
+        "away": row["away_frames"],
+        "away_seconds": row["away_seconds"],
+        "focus_score": row["focus_sum"] / row["scored"] if row["scored"] else 0.0,
+    }
+
+
+_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> Optional[SessionStore]:
+    """The running store, or None when persistence is off (FOCUS_DB_PATH unset)."""
+    return _store
+
+
+def start_session_store() -> None:
+    global _store
+    if not FOCUS_DB_PATH or _store is not None:
+        return
+    _store = SessionStore()
+    _store.start()
+
+
+def stop_session_store() -> None:
+    global _store
+    if _store is not None:
+        _store.stop()
+        _store = None
@@ -3,10 +3,11 @@ from dataclasses import dataclass
 from typing import Optional
 
 import cv2
-import mediapipe as mp
 import numpy as np
 
-from face_state import FaceStateCalculator 
+from face_state import FaceStateCalculator
+
+from .holistic_pool import build_holistic
 
 
 @dataclass
@@ -15,27 +16,35 @@ class TiredDetectionResult:
     score: float  # 0–1 (1 = extremely tired)
 
 
+# Thresholds (module-level so tools/rescore.py can try other values)
+LONG_CLOSURE_FRAMES = 30       # consecutive closed-eye frames
+VERY_HIGH_BLINK_RATE = 40.0    # blinks per minute
+
+
 # ---------- GLOBAL ANALYZER + MEDIAPIPE HOLISTIC (stateful, like your old app) ---------- #
 
 # We keep one BodyLanguageAnalyzer and one Holistic model for the whole process.
 # This allows blink_rate and eye_closed_frames to accumulate across frames.
 _analyzer = FaceStateCalculator()
 
-_mp_holistic = mp.solutions.holistic
-_holistic = _mp_holistic.Holistic(
-    model_complexity=0,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5,
-    refine_face_landmarks=True,
-)
+# Built on first use, so importing the assess_* helpers (sessions, the
+# rescoring tool) doesn't build a Holistic graph nobody runs.
+_holistic = None
+
+
+def _get_holistic():
+    global _holistic
+    if _holistic is None:
+        _holistic = build_holistic()
+    return _holistic
 
 
 def detect_tired(frame: np.ndarray) -> TiredDetectionResult:
     """
     Detect tiredness for a single frame, using your old logic:
 
-        long_closure = analyzer.eye_closed_frames >= 30  # ~1–1.5 seconds
-        very_high_blink_rate = blink_rate > 40.0
+        long_closure = analyzer.eye_closed_frames >= LONG_CLOSURE_FRAMES  # ~1–1.5 seconds
+        very_high_blink_rate = blink_rate > VERY_HIGH_BLINK_RATE
         is_tired = long_closure or very_high_blink_rate
 
     We also return a simple 0–1 score:
@@ -46,11 +55,20 @@ def detect_tired(frame: np.ndarray) -> TiredDetectionResult:
 
     # MediaPipe expects RGB
     frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = _holistic.process(frame_rgb)
+    results = _get_holistic().process(frame_rgb)
 
     # Update your existing analyzer with the new frame
     _analyzer.update(results, img_h, img_w)
-    feedback = _analyzer.get_feedback()
+
+    return assess_tired(_analyzer)
+
+
+def assess_tired(analyzer: FaceStateCalculator) -> TiredDetectionResult:
+    """
+    Tiredness from an analyzer that has already been updated with this frame.
+    Lets a session run Holistic once and feed both tired and fidgety checks.
+    """
+    feedback = analyzer.get_feedback()
 
     # Default: not tired
     is_tired = False
@@ -59,8 +77,8 @@ def detect_tired(frame: np.ndarray) -> TiredDetectionResult:
     if feedback:
         # Same variables 
         blink_rate = feedback["blink_rate"]["rate"]
-        long_closure = _analyzer.eye_closed_frames >= 30  # ~1–1.5 seconds
-        very_high_blink_rate = blink_rate > 40.0
+        long_closure = analyzer.eye_closed_frames >= LONG_CLOSURE_FRAMES  # ~1–1.5 seconds
+        very_high_blink_rate = blink_rate > VERY_HIGH_BLINK_RATE
 
         if long_closure or very_high_blink_rate:
             is_tired = True
@@ -70,4 +88,4 @@ def detect_tired(frame: np.ndarray) -> TiredDetectionResult:
             # If you want something more graded, you can tune this block.
             score = 0.0
 
-    return TiredDetectionResult(is_tired=is_tired, score=score)
\ No newline at end of file
+    return TiredDetectionResult(is_tired=is_tired, score=score)
@@ -0,0 +1,182 @@
+# backend/services/video_ingest.py
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+try:
+    import av  # PyAV, only needed for streamed sessions
+except ImportError:  # JPEG frames still work without it
+    av = None
+
+# ---------------- CONFIG ---------------- #
+
+# Accept a compressed video stream on /ws/focus instead of JPEG stills.
+# 0 = always tell clients to fall back to sending frames.
+FOCUS_STREAM_INGEST = os.getenv("FOCUS_STREAM_INGEST", "1") == "1"
+
+# Analyse a streamed session at most this often (ms of stream time). Every
+# frame in between is still decoded (VP8/VP9 need them as references) but
+# never converted to BGR or analysed. Cheaper than stills, so it can be
+# faster than the JPEG cadence; the load controller can still slow it down.
+FOCUS_STREAM_FRAME_INTERVAL_MS = int(os.getenv("FOCUS_STREAM_FRAME_INTERVAL_MS", "250"))
+
+# Compressed chunks buffered ahead of the decoder before the socket reader
+# has to wait (MediaRecorder sends one every ~200 ms)
+STREAM_MAX_BUFFERED_CHUNKS = 32
+
+# Container formats we can demux incrementally, by MediaRecorder mime type
+_DEMUXERS = {
+    "video/webm": "matroska",
+    "video/x-matroska": "matroska",
+}
+
+
+def stream_format(mime: str) -> Optional[str]:
+    """Demuxer for a client's MediaRecorder mime type, or None if we can't take it."""
+    if av is None or not FOCUS_STREAM_INGEST:
+        return None
+    return _DEMUXERS.get(mime.split(";", 1)[0].strip().lower())
+
+
+class _ChunkReader:
+    """Blocking file-like view of the chunks the socket reader pushes in."""
+
+    def __init__(self, chunks: "queue.Queue[Optional[bytes]]"):
+        self._chunks = chunks
+        self._buf = bytearray()
+        self._eof = False
+
+    def read(self, n: int = -1) -> bytes:
+        while not self._buf and not self._eof:
+            chunk = self._chunks.get()
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buf += chunk
+        if n < 0:
+            n = len(self._buf)
+        out = bytes(self._buf[:n])
+        del self._buf[:n]
+        return out
+
+
+class StreamDecoder:
+    """
+    Decodes one client's compressed video stream as it arrives.
+
+    The socket reader feed()s chunks; a dedicated thread demuxes and decodes
+    them (PyAV blocks on reads, so it can't live on the event loop) and hands
+    a BGR frame to `on_frame(frame, convert_ms)` once every `interval_ms()`
+    of stream time. Sampling goes by the frames' timestamps, not wall clock,
+    so a recorded stream replays the same way however fast it is sent.
+
+    on_frame is called from the decoder thread and must not block: a
+    decoder stalled behind inference would back up into the socket for
+    frames that are going to be skipped anyway.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        fmt: str,
+        on_frame: Callable[[np.ndarray, float], None],
+        interval_ms: Callable[[], float],
+    ):
+        self.session_id = session_id
+        self.fmt = fmt
+        self._on_frame = on_frame
+        self._interval_ms = interval_ms
+        self._chunks: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=STREAM_MAX_BUFFERED_CHUNKS)
+        self._thread: Optional[threading.Thread] = None
+        self._next_t: Optional[float] = None
+
+        self.error: Optional[str] = None
+        self.bytes_in = 0
+        self.frames_decoded = 0
+        self.frames_sampled = 0
+
+    # ------------------------ lifecycle ------------------------
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name=f"stream-decode-{self.session_id[:8]}", daemon=True
+        )
+        self._thread.start()
+
+    def feed(self, chunk: bytes) -> None:
+        """Queue compressed bytes; blocks while the decoder is behind."""
+        if self.error is not None:
+            return
+        self.bytes_in += len(chunk)
+        self._chunks.put(chunk)
+
+    def close(self) -> None:
+        """End of stream; the thread finishes whatever is buffered and exits."""
+        if self._thread is None:
+            return
+        try:
+            self._chunks.put_nowait(None)
+        except queue.Full:
+            # Nobody is waiting for the backlog any more
+            self.error = self.error or "closed"
+            while True:
+                try:
+                    self._chunks.get_nowait()
+                except queue.Empty:
+                    break
+            self._chunks.put_nowait(None)
+        self._thread = None
+
+    # ------------------------ decoding ------------------------
+
+    def _run(self) -> None:
+        try:
+            # Small probe: the stream's header says what it is, and waiting
+            # for seconds of video before the first result defeats the point
+            container = av.open(
+                _ChunkReader(self._chunks), mode="r", format=self.fmt,
+                options={"probesize": "32768", "analyzeduration": "0"},
+            )
+            with container:
+                stream = container.streams.video[0]
+                stream.thread_type = "AUTO"
+                for frame in container.decode(stream):
+                    if self.error is not None:
+                        break
+                    self.frames_decoded += 1
+                    self._maybe_sample(frame)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"[video_ingest] {self.session_id}: stream decode failed: {self.error}")
+            # Unblock a reader waiting on a full queue
+            while True:
+                try:
+                    self._chunks.get_nowait()
+                except queue.Empty:
+                    break
+
+    def _maybe_sample(self, frame) -> None:
+        t = frame.time if frame.time is not None else time.monotonic()
+        if self._next_t is not None and t < self._next_t:
+            return
+        self._next_t = t + self._interval_ms() / 1000.0
+
+        t0 = time.perf_counter()
+        img = frame.to_ndarray(format="bgr24")
+        convert_ms = (time.perf_counter() - t0) * 1000.0
+        self.frames_sampled += 1
+        self._on_frame(img, convert_ms)
+
+    def stats(self) -> dict:
+        return {
+            "format": self.fmt,
+            "bytes_in": self.bytes_in,
+            "frames_decoded": self.frames_decoded,
+            "frames_sampled": self.frames_sampled,
+            "buffered_chunks": self._chunks.qsize(),
+            "error": self.error,
+        }
@@ -0,0 +1,120 @@
+# backend/benchmarks/fixtures.py
+"""
+Deterministic inputs for the benchmarks: the same seed always gives the same
+frames, landmarks and timelines, so runs on different commits are comparable.
+"""
+import base64
+import random
+from typing import List
+
+import numpy as np
+
+# cv2 / MediaPipe-backed modules are imported inside the fixtures that need
+# them, so benchmarks that don't (summary) run without them
+
+FRAME_W = 640
+FRAME_H = 480
+
+
+def synthetic_frame(seed: int = 0, width: int = FRAME_W, height: int = FRAME_H) -> np.ndarray:
+    """
+    A webcam-sized BGR frame: smooth background + noise, a skin-toned head
+    and shoulders, and a dark phone-shaped rectangle. Nothing here is meant to
+    fool the detectors; it just gives them realistic image statistics.
+    """
+    import cv2
+
+    rng = np.random.RandomState(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = (90 + 60 * xx / width).astype(np.uint8)
+    frame[..., 1] = (100 + 50 * yy / height).astype(np.uint8)
+    frame[..., 2] = 120
+    noise = rng.randint(-12, 13, size=frame.shape)
+    frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+    cx, cy = width // 2, height // 2 - 40
+    cv2.ellipse(frame, (cx, cy + 230), (200, 120), 0, 180, 360, (60, 60, 140), -1)  # shoulders
+    cv2.ellipse(frame, (cx, cy), (75, 100), 0, 0, 360, (150, 180, 220), -1)         # head
+    cv2.ellipse(frame, (cx - 28, cy - 15), (14, 7), 0, 0, 360, (40, 40, 40), -1)    # eyes
+    cv2.ellipse(frame, (cx + 28, cy - 15), (14, 7), 0, 0, 360, (40, 40, 40), -1)
+    cv2.rectangle(frame, (cx + 120, cy + 120), (cx + 170, cy + 210), (20, 20, 20), -1)  # phone
+    return frame
+
+
+def synthetic_jpeg_b64(seed: int = 0, quality: int = 80) -> str:
+    """What the webcam feed sends: a base64 JPEG of a synthetic frame."""
+    import cv2
+
+    ok, buf = cv2.imencode(".jpg", synthetic_frame(seed), [cv2.IMWRITE_JPEG_QUALITY, quality])
+    assert ok
+    return base64.b64encode(buf.tobytes()).decode("ascii")
+
+
+def _eye(cx: float, cy: float, openness: float) -> List[List[float]]:
+    """Six EAR-ordered eye points (corner, top, top, corner, bottom, bottom), in pixels."""
+    w, h = 30.0, 12.0 * openness
+    return [
+        [cx - w / 2, cy], [cx - w / 6, cy - h / 2], [cx + w / 6, cy - h / 2],
+        [cx + w / 2, cy], [cx + w / 6, cy + h / 2], [cx - w / 6, cy + h / 2],
+    ]
+
+
+def landmark_sequence(n: int = 300, seed: int = 0) -> list:
+    """
+    `n` consecutive Holistic-like results: a face that blinks every couple of
+    seconds (with the odd long closure), steady shoulders and wandering wrists.
+    """
+    from face_state import LEFT_EYE_INDICES, RIGHT_EYE_INDICES
+    from app.services.landmark_adapter import (
+        FACE_INDICES,
+        HAND_INDICES,
+        POSE_INDICES,
+        HolisticLandmarks,
+        LandmarkList,
+    )
+
+    rng = random.Random(seed)
+    eye_rows = {i: r for r, i in enumerate(FACE_INDICES)}
+    frames = []
+
+    for k in range(n):
+        phase = k % 5
+        openness = 0.1 if phase == 0 or (k % 97) < 8 else 1.0
+        jitter_x = rng.uniform(-2.0, 2.0)
+        jitter_y = rng.uniform(-2.0, 2.0)
+
+        face = np.zeros((len(FACE_INDICES), 2), dtype=np.float32)
+        for indices, cx in ((LEFT_EYE_INDICES, 290.0), (RIGHT_EYE_INDICES, 350.0)):
+            for idx, (x, y) in zip(indices, _eye(cx + jitter_x, 200.0 + jitter_y, openness)):
+                face[eye_rows[idx]] = (x / FRAME_W, y / FRAME_H)
+
+        pose = np.array([[0.35, 0.75], [0.65, 0.75]], dtype=np.float32)[: len(POSE_INDICES)]
+        left = np.array([[0.3 + 0.05 * rng.random(), 0.85 + 0.05 * rng.random()]], dtype=np.float32)
+        right = np.array([[0.7 + 0.05 * rng.random(), 0.85 + 0.05 * rng.random()]], dtype=np.float32)
+
+        frames.append(HolisticLandmarks(
+            face_landmarks=LandmarkList(face, FACE_INDICES),
+            pose_landmarks=LandmarkList(pose, POSE_INDICES),
+            left_hand_landmarks=LandmarkList(left[: len(HAND_INDICES)], HAND_INDICES),
+            right_hand_landmarks=LandmarkList(right[: len(HAND_INDICES)], HAND_INDICES) if k % 7 else None,
+        ))
+    return frames
+
+
+def focus_frames(n: int, seed: int = 0) -> List[dict]:
+    """`n` per-frame focus results 0.5 s apart, as fed to update_focus_counters()."""
+    rng = random.Random(seed)
+    frames = []
+    for i in range(n):
+        away = rng.random() < 0.05
+        frames.append({
+            "phone": not away and rng.random() < 0.1,
+            "tired": not away and rng.random() < 0.1,
+            "fidgety": not away and rng.random() < 0.2,
+            "focus_score": 0.0 if away else rng.random(),
+            "away": away,
+            "away_seconds": 0.5 if away else 0.0,
+            "t": i * 0.5,
+        })
+    return frames
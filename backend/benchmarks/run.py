@@ -0,0 +1,204 @@
+# backend/benchmarks/run.py
+"""
+Microbenchmarks for the per-frame components, checked against budgets.
+
+    cd backend
+    python -m benchmarks.run                 # everything
+    python -m benchmarks.run decode_frame face_state_update
+
+Each benchmark is timed on deterministic synthetic inputs (see fixtures.py)
+and its peak Python allocation per call is measured with tracemalloc.
+Results are written to benchmarks/results/<commit>.json and compared with
+the previous run. Exits with status 1 when any component is over its
+latency or allocation budget (budgets.json), so CI can gate on it.
+
+CPU-only and offline: nothing is downloaded. Benchmarks whose models aren't
+on disk (e.g. yolov3-tiny.weights) are reported as skipped and their budgets
+aren't checked; CI should run with --strict so that fails instead.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Keep benchmark state in this process, whatever the environment says
+os.environ["FOCUS_STATE_BACKEND"] = "memory"
+
+from .suite import BENCHMARKS, Benchmark, Skip  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+BUDGETS_PATH = BENCH_DIR / "budgets.json"
+RESULTS_DIR = BENCH_DIR / "results"
+
+# Calls measured under tracemalloc (it slows everything down, so fewer)
+_ALLOC_ITERATIONS = 10
+
+
+def _commit() -> str:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=BENCH_DIR,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True, cwd=BENCH_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{sha}-dirty" if dirty else sha
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def measure(bench: Benchmark, scale: float = 1.0) -> dict:
+    fn = bench.setup()
+
+    for _ in range(bench.warmup):
+        fn()
+
+    iterations = max(1, int(bench.iterations * scale))
+    times_ms = []
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        fn()
+        times_ms.append((time.perf_counter_ns() - t0) / 1e6)
+    times_ms.sort()
+
+    # Peak Python-heap growth during one call. numpy buffers are tracked;
+    # memory OpenCV / MediaPipe allocate natively is not.
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(iterations, _ALLOC_ITERATIONS)):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(max(0, peak - base))
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(times_ms),
+        "p50_ms": _percentile(times_ms, 0.50),
+        "p95_ms": _percentile(times_ms, 0.95),
+        "max_ms": times_ms[-1],
+        "peak_alloc_kb": max(peaks) / 1024.0,
+    }
+
+
+def check_budget(result: dict, budget: Optional[dict]) -> List[str]:
+    """Human-readable budget violations (empty = within budget)."""
+    if not budget:
+        return []
+    problems = []
+    for key, unit in (("p50_ms", "ms"), ("p95_ms", "ms"), ("peak_alloc_kb", "KB")):
+        limit = budget.get(key)
+        if limit is not None and result[key] > limit:
+            problems.append(f"{key} {result[key]:.2f} {unit} > budget {limit} {unit}")
+    return problems
+
+
+def _previous_results(commit: str) -> Optional[dict]:
+    runs = sorted(
+        (p for p in RESULTS_DIR.glob("*.json") if p.stem != commit),
+        key=lambda p: p.stat().st_mtime,
+    )
+    if not runs:
+        return None
+    return json.loads(runs[-1].read_text())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every benchmark's iteration count")
+    parser.add_argument("--strict", action="store_true", help="also fail when a benchmark is skipped")
+    parser.add_argument("--no-save", action="store_true", help="don't write results/<commit>.json")
+    args = parser.parse_args(argv)
+
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    budgets: Dict[str, dict] = json.loads(BUDGETS_PATH.read_text())
+    commit = _commit()
+    previous = _previous_results(commit)
+    prev_results = previous["results"] if previous else {}
+
+    results: Dict[str, dict] = {}
+    failed = skipped = 0
+
+    for name in args.names or list(BENCHMARKS):
+        try:
+            result = measure(BENCHMARKS[name], args.scale)
+        except Skip as e:
+            results[name] = {"status": "skipped", "reason": str(e)}
+            skipped += 1
+            print(f"{name:<24} SKIP  {e}")
+            continue
+        except ImportError as e:
+            results[name] = {"status": "skipped", "reason": f"missing dependency: {e.name}"}
+            skipped += 1
+            print(f"{name:<24} SKIP  missing dependency: {e.name}")
+            continue
+        except Exception as e:
+            results[name] = {"status": "error", "reason": repr(e)}
+            failed += 1
+            print(f"{name:<24} ERROR {e!r}")
+            continue
+
+        problems = check_budget(result, budgets.get(name))
+        result["status"] = "over_budget" if problems else "ok"
+        result["budget"] = budgets.get(name)
+        results[name] = result
+        failed += bool(problems)
+
+        delta = ""
+        prev = prev_results.get(name, {})
+        if prev.get("p95_ms"):
+            delta = f"  ({(result['p95_ms'] / prev['p95_ms'] - 1.0) * 100:+.0f}% vs {previous['commit']})"
+        print(
+            f"{name:<24} {'FAIL' if problems else 'ok':<5} p50 {result['p50_ms']:8.3f} ms  "
+            f"p95 {result['p95_ms']:8.3f} ms  alloc {result['peak_alloc_kb']:9.1f} KB{delta}"
+        )
+        for problem in problems:
+            print(f"{'':<24}       {problem}")
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out = {
+            "commit": commit,
+            "created_at": time.time(),
+            "machine": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+            },
+            "results": results,
+        }
+        (RESULTS_DIR / f"{commit}.json").write_text(json.dumps(out, indent=2))
+
+    print(f"\n{len(results) - skipped - failed} ok, {failed} failed, {skipped} skipped")
+    if skipped:
+        names = ", ".join(n for n, r in results.items() if r["status"] == "skipped")
+        print(
+            f"WARNING: no budget was enforced for {names}"
+            + ("" if args.strict else " (pass --strict to fail on skipped benchmarks)")
+        )
+    return 1 if failed or (args.strict and skipped) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# backend/benchmarks/suite.py
+"""
+The benchmarks. Each one is a setup function that builds its inputs (not
+timed) and returns the call to time. Budgets live in budgets.json.
+"""
+import itertools
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+from . import fixtures
+
+
+class Skip(Exception):
+    """Raised by a setup function when the component can't run here."""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    iterations: int
+    warmup: int
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, iterations: int = 100, warmup: int = 5):
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, iterations, warmup)
+        return setup
+    return register
+
+
+def _require_yolo_weights() -> None:
+    from app.services import phone_detection
+
+    if not phone_detection._WEIGHTS_PATH.exists():
+        raise Skip(f"{phone_detection._WEIGHTS_PATH.name} not found")
+
+
+def _require_holistic_models() -> None:
+    # MediaPipe downloads the model_complexity=0 pose model on first use;
+    # the benchmarks must not touch the network
+    import mediapipe
+
+    model = os.path.join(
+        os.path.dirname(mediapipe.__file__), "modules", "pose_landmark", "pose_landmark_lite.tflite"
+    )
+    if not os.path.exists(model):
+        raise Skip("MediaPipe pose_landmark_lite.tflite not downloaded yet")
+
+
+# ---------------- frame path ---------------- #
+
+@benchmark("decode_frame", iterations=200)
+def bench_decode_frame():
+    from utils.image_utils import decode_base64_image
+
+    b64 = fixtures.synthetic_jpeg_b64()
+    return lambda: decode_base64_image(b64)
+
+
+@benchmark("phone_tracker_detect", iterations=30, warmup=3)
+def bench_phone_tracker_detect():
+    # What a session runs for the phone signal. Nothing to track in the
+    # synthetic frame, so this is YOLO every call (the worst case).
+    _require_yolo_weights()
+    from app.services.phone_detection import PhoneTracker
+
+    frame = fixtures.synthetic_frame()
+    tracker = PhoneTracker()
+    return lambda: tracker.detect(frame)
+
+
+def _bench_session(session_id: str):
+    """A FocusSession with a Holistic instance of its own, as a live session has."""
+    from app.services.focus_session import FocusSession
+    from app.services.holistic_pool import HolisticPool
+
+    session = FocusSession(session_id, holistic_pool=HolisticPool(max_size=1), recorder=None)
+    session.open_blocking()
+    return session
+
+
+@benchmark("detect_posture", iterations=30, warmup=3)
+def bench_detect_posture():
+    # One Holistic pass feeding both tired and fidgety
+    _require_holistic_models()
+    frame = fixtures.synthetic_frame()
+    session = _bench_session("bench-posture")
+    return lambda: session.detect_posture(frame)
+
+
+@benchmark("focus_session_process", iterations=20, warmup=3)
+def bench_focus_session_process():
+    # The whole live per-frame path (detect_focus). Runs every detector once;
+    # its budget is what catches a detector accidentally being invoked twice
+    # per frame. A fixed timestamp keeps the presence gate from ever
+    # declaring the synthetic student away and skipping the detectors.
+    _require_yolo_weights()
+    _require_holistic_models()
+    frame = fixtures.synthetic_frame()
+    session = _bench_session("bench-process")
+    return lambda: session.process(frame, t=0.0)
+
+
+# ---------------- delivery ---------------- #
+
+_FOCUS_RESULT = {
+    "type": "focus_result", "away": False, "away_seconds": 0.0,
+    "phone": True, "phone_confidence": 0.81, "phone_source": "tracking",
+    "tired": False, "tired_score": 0.12, "fidgety": True, "fidgety_score": 0.66,
+    "focus_score": 0.41, "is_focused": False,
+    "phone_age_s": 0.5, "tired_age_s": 0.0, "fidgety_age_s": 0.0,
+    "degradation_level": 0, "frame_interval_ms": 500,
+}
+
+
+@benchmark("encode_result_json", iterations=2000, warmup=50)
+def bench_encode_result_json():
+    # What every client without a subscription gets
+    from app.services.result_encoding import negotiate_encoder
+
+    encoder = negotiate_encoder(None, None)
+    return lambda: encoder.encode(_FOCUS_RESULT)
+
+
+@benchmark("encode_result_struct", iterations=2000, warmup=50)
+def bench_encode_result_struct():
+    # What the web client subscribes to
+    from app.services.result_encoding import negotiate_encoder
+
+    encoder = negotiate_encoder("struct", "phone,tired,fidgety,frame_interval_ms")
+    return lambda: encoder.encode(_FOCUS_RESULT)
+
+
+# ---------------- analysis ---------------- #
+
+@benchmark("face_state_update", iterations=2000, warmup=50)
+def bench_face_state_update():
+    from face_state import FaceStateCalculator
+
+    frames = itertools.cycle(fixtures.landmark_sequence())
+    now = [0.0]
+    analyzer = FaceStateCalculator(clock=lambda: now[0])
+
+    def run():
+        now[0] += 0.5  # the webcam feed's frame interval
+        analyzer.update(next(frames), fixtures.FRAME_H, fixtures.FRAME_W)
+
+    return run
+
+
+@benchmark("focus_summary_100k", iterations=10, warmup=1)
+def bench_focus_summary():
+    # A long session: 100k frames is ~14 hours at 2 fps
+    from app.routers.focus_score import get_focus_summary, update_focus_counters
+
+    for frame in fixtures.focus_frames(100_000):
+        update_focus_counters("bench", **frame)
+    return lambda: get_focus_summary(session_id="bench")
+
+
+@benchmark("focus_analytics_100k", iterations=200, warmup=5)
+def bench_focus_analytics():
+    # Same long session without the timeline: must not grow with its length
+    from app.routers.focus_score import get_focus_summary, update_focus_counters
+
+    for frame in fixtures.focus_frames(100_000):
+        update_focus_counters("bench-analytics", **frame)
+    return lambda: get_focus_summary(session_id="bench-analytics", timeline=False)
+
+
+@benchmark("focus_counters_update", iterations=5000, warmup=50)
+def bench_focus_counters_update():
+    from app.routers.focus_score import update_focus_counters
+
+    frames = itertools.cycle(fixtures.focus_frames(5_000))
+    return lambda: update_focus_counters("bench-update", **next(frames))
@@ -1,5 +1,6 @@
 import time
 from collections import deque
+from typing import Callable
 
 import cv2
 import mediapipe as mp
@@ -27,6 +28,10 @@ HAND_VEL_OVERACTIVE_THRESHOLD = 1.2
 # Seconds of history used to summarize hand behaviour
 HAND_ACTIVITY_WINDOW_S = 10.0
 
+# Face mesh points used for the eye aspect ratio (p1..p6 per eye)
+LEFT_EYE_INDICES = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
+
 
 class FaceStateCalculator:
     """
@@ -36,18 +41,22 @@ class FaceStateCalculator:
     External code relies on:
       - BodyLanguageAnalyzer(...)
       - update(results, img_h, img_w)
+      - an optional `clock` (seconds, defaults to time.time) so recorded
+        sessions can be replayed faster than real time
       - get_feedback()
       - attributes: blink_total, eye_closed_frames
       - get_feedback()["blink_rate"]["rate"]
       - get_feedback()["hand_gestures"]["score" / "feedback"]
     """
 
-    def __init__(self):
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+
         # Blink tracking
         self.blink_total = 0
         self.eye_closed_frames = 0
         self.total_frames = 0
-        self.start_time = time.time()
+        self.start_time = clock()
 
         # Per-hand state (left / right)
         self._hand_state = {
@@ -67,7 +76,7 @@ class FaceStateCalculator:
 
     def _current_time(self) -> float:
         """Return current time in seconds (used for windowing)."""
-        return time.time()
+        return self._clock()
 
     # ------------------------ Eye / blink helpers ------------------------
 
@@ -219,15 +228,12 @@ class FaceStateCalculator:
         if results.face_landmarks:
             face_lm = results.face_landmarks.landmark
 
-            left_eye_indices = [33, 160, 158, 133, 153, 144]
-            right_eye_indices = [362, 385, 387, 263, 373, 380]
-
             left_eye_pts = np.array(
-                [[face_lm[i].x * img_w, face_lm[i].y * img_h] for i in left_eye_indices],
+                [[face_lm[i].x * img_w, face_lm[i].y * img_h] for i in LEFT_EYE_INDICES],
                 dtype=float,
             )
             right_eye_pts = np.array(
-                [[face_lm[i].x * img_w, face_lm[i].y * img_h] for i in right_eye_indices],
+                [[face_lm[i].x * img_w, face_lm[i].y * img_h] for i in RIGHT_EYE_INDICES],
                 dtype=float,
             )
 
@@ -256,7 +262,7 @@ class FaceStateCalculator:
         if self.total_frames == 0:
             return {}
 
-        elapsed_min = (time.time() - self.start_time) / 60.0
+        elapsed_min = (self._current_time() - self.start_time) / 60.0
         blink_rate = self.blink_total / elapsed_min if elapsed_min > 0 else 0.0
 
         # Interpret hand intensity
@@ -0,0 +1,203 @@
+# backend/tools/rescore.py
+"""
+Replay recorded sessions through the tired / fidgety / focus-score logic,
+so threshold changes can be evaluated without MediaPipe, YOLO or real time.
+
+Record sessions by starting the backend with FOCUS_RECORD_DIR=<dir>, then:
+
+    cd backend
+    python -m tools.rescore <dir> --jobs 8 \\
+        --set tired_detection.LONG_CLOSURE_FRAMES=40 \\
+        --set focus_score_calculator.FOCUSED_THRESHOLD=0.5
+
+Prints one JSON line per recording (same counters as /api/focus/summary)
+and a final line with totals.
+"""
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+import face_state
+from face_state import FaceStateCalculator
+from app.services import fidgety_detection, focus_score_calculator, tired_detection
+from app.services.fidgety_detection import assess_fidgety, FidgetyDetectionResult
+from app.services.focus_score_calculator import combine_focus_score
+from app.services.landmark_adapter import HolisticLandmarks, LandmarkList
+from app.services.phone_detection import PhoneDetectionResult
+from app.services.session_recorder import load_recording
+from app.services.tired_detection import assess_tired, TiredDetectionResult
+
+# Modules whose UPPER_CASE constants can be overridden with --set
+TUNABLE_MODULES = {
+    "face_state": face_state,
+    "tired_detection": tired_detection,
+    "fidgety_detection": fidgety_detection,
+    "focus_score_calculator": focus_score_calculator,
+}
+
+
+def _parse_value(key: str, current, value: str):
+    """`value` as the type of the constant it replaces."""
+    if isinstance(current, bool):
+        if value.lower() in ("1", "true", "yes", "on"):
+            return True
+        if value.lower() in ("0", "false", "no", "off"):
+            return False
+        raise SystemExit(f"{key} takes true / false, got {value!r}")
+    try:
+        return type(current)(value)
+    except ValueError:
+        raise SystemExit(f"{key} takes a {type(current).__name__}, got {value!r}")
+
+
+def parse_overrides(items: List[str]) -> Dict[Tuple[str, str], Union[bool, int, float]]:
+    overrides = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        module_name, _, attr = key.partition(".")
+        module = TUNABLE_MODULES.get(module_name)
+        if module is None or not attr.isupper() or not hasattr(module, attr):
+            raise SystemExit(f"Unknown setting: {key}")
+        current = getattr(module, attr)
+        # Only plain numbers and flags: tables and tuples of thresholds can't
+        # be set from one string
+        if not isinstance(current, (bool, int, float)):
+            raise SystemExit(f"{key} is a {type(current).__name__}, only int / float / bool settings can be --set")
+        overrides[(module_name, attr)] = _parse_value(key, current, value)
+    return overrides
+
+
+def apply_overrides(overrides: Dict[Tuple[str, str], Union[bool, int, float]]) -> None:
+    for (module_name, attr), value in overrides.items():
+        setattr(TUNABLE_MODULES[module_name], attr, value)
+
+
+def find_recordings(paths: List[str]) -> List[Path]:
+    found = []
+    for p in paths:
+        p = Path(p)
+        if (p / "meta.json").exists():
+            found.append(p)
+        else:
+            found.extend(sorted(m.parent for m in p.rglob("meta.json")))
+    return found
+
+
+def rescore_recording(directory: Path) -> dict:
+    """Replay one recording with the current module settings."""
+    meta, cols = load_recording(directory)
+    n = meta["frames"]
+
+    # Scalar columns as plain Python lists: much cheaper to index per frame
+    t = cols["t"].tolist()
+    img_h = cols["img_h"].tolist()
+    img_w = cols["img_w"].tolist()
+    away = cols["away"].tolist()
+    phone = cols["phone"].tolist()
+    phone_conf = cols["phone_confidence"].tolist()
+    holistic = cols["holistic"].tolist()
+    carried = cols["posture_carried"].tolist()
+    face_ok = cols["face_ok"].tolist()
+    pose_ok = cols["pose_ok"].tolist()
+    left_ok = cols["left_hand_ok"].tolist()
+    right_ok = cols["right_hand_ok"].tolist()
+
+    face_xy = np.asarray(cols["face_xy"])
+    pose_xy = np.asarray(cols["pose_xy"])
+    left_xy = np.asarray(cols["left_hand_xy"])
+    right_xy = np.asarray(cols["right_hand_xy"])
+    face_idx = meta["face_indices"]
+    pose_idx = meta["pose_indices"]
+    hand_idx = meta["hand_indices"]
+
+    # The analyzer sees recorded time, not wall-clock time
+    now = [meta.get("start_t", t[0] if n else 0.0)]
+    analyzer = FaceStateCalculator(clock=lambda: now[0])
+
+    not_tired = TiredDetectionResult(is_tired=False, score=0.0)
+    not_fidgety = FidgetyDetectionResult(is_fidgety=False, movement_score=0.0)
+
+    tired_res, fidgety_res = not_tired, not_fidgety
+
+    counts = {"phone": 0, "tired": 0, "fidgety": 0, "away": 0}
+    score_sum = 0.0
+    scored = 0
+
+    for i in range(n):
+        if away[i]:
+            counts["away"] += 1
+            continue
+
+        # Frames the live scheduler skipped reuse the previous tired / fidgety
+        if not holistic[i] and not carried[i]:
+            tired_res, fidgety_res = not_tired, not_fidgety
+        elif holistic[i]:
+            now[0] = t[i]
+            results = HolisticLandmarks(
+                face_landmarks=LandmarkList(face_xy[i], face_idx) if face_ok[i] else None,
+                pose_landmarks=LandmarkList(pose_xy[i], pose_idx) if pose_ok[i] else None,
+                left_hand_landmarks=LandmarkList(left_xy[i], hand_idx) if left_ok[i] else None,
+                right_hand_landmarks=LandmarkList(right_xy[i], hand_idx) if right_ok[i] else None,
+            )
+            analyzer.update(results, img_h[i], img_w[i])
+            tired_res = assess_tired(analyzer)
+            fidgety_res = assess_fidgety(analyzer)
+
+        phone_res = PhoneDetectionResult(phone_detected=bool(phone[i]), confidence=phone_conf[i])
+        focus_res = combine_focus_score(phone_res, tired_res, fidgety_res)
+
+        counts["phone"] += phone_res.phone_detected
+        counts["tired"] += tired_res.is_tired
+        counts["fidgety"] += fidgety_res.is_fidgety
+        score_sum += focus_res.focus_score
+        scored += 1
+
+    return {
+        "recording": str(directory),
+        "session_id": meta["session_id"],
+        "frames": n,
+        **counts,
+        "focus_score": score_sum / scored if scored else 0.0,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="recording directories (searched recursively)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        metavar="MODULE.CONSTANT=VALUE", help="override a threshold for this run")
+    parser.add_argument("--jobs", type=int, default=1, help="recordings replayed in parallel")
+    args = parser.parse_args(argv)
+
+    overrides = parse_overrides(args.overrides)
+    recordings = find_recordings(args.paths)
+    if not recordings:
+        print("No recordings found", file=sys.stderr)
+        return 1
+
+    totals = {"frames": 0, "phone": 0, "tired": 0, "fidgety": 0, "away": 0}
+    weighted_score = 0.0
+
+    with ProcessPoolExecutor(
+        max_workers=max(1, args.jobs), initializer=apply_overrides, initargs=(overrides,)
+    ) as executor:
+        for summary in executor.map(rescore_recording, recordings):
+            print(json.dumps(summary))
+            for key in totals:
+                totals[key] += summary[key]
+            weighted_score += summary["focus_score"] * (summary["frames"] - summary["away"])
+
+    scored = totals["frames"] - totals["away"]
+    totals["focus_score"] = weighted_score / scored if scored else 0.0
+    totals["recordings"] = len(recordings)
+    print(json.dumps({"totals": totals}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# backend/tools/serve.py
+"""
+Run several backend instances on one host, with sticky session routing and
+shared focus counters set up between them.
+
+`uvicorn app.main:app --workers N` puts every worker behind one port, so a
+session can't be steered to the worker holding its detectors. This starts
+one single-worker uvicorn per port instead:
+
+    cd backend
+    python -m tools.serve --instances 4 --port 8001 --public-host 10.0.0.5
+
+Each instance knows every instance's URL (FOCUS_WORKER_URLS) and its own
+position in the list (FOCUS_WORKER_INDEX). A client connecting to
+/ws/focus?session_id=... on the wrong one is redirected to the owner;
+GET /api/focus/route?session_id=... answers the same question up front.
+Counters go to a shared SQLite file, so /api/focus/summary works on any
+instance. Put any load balancer in front for the plain HTTP endpoints.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0", help="address to bind")
+    parser.add_argument("--port", type=int, default=8001, help="port of the first instance")
+    parser.add_argument("--public-host", default="localhost", help="host clients use to reach this machine")
+    parser.add_argument("--state-db", default="focus_state.db", help="shared SQLite file for the counters")
+    args = parser.parse_args(argv)
+
+    ports = [args.port + i for i in range(max(1, args.instances))]
+    urls = ",".join(f"ws://{args.public_host}:{port}" for port in ports)
+
+    procs = []
+    for idx, port in enumerate(ports):
+        env = dict(
+            os.environ,
+            FOCUS_WORKER_URLS=urls,
+            FOCUS_WORKER_INDEX=str(idx),
+            FOCUS_STATE_BACKEND="sqlite",
+            FOCUS_STATE_DB_PATH=args.state_db,
+        )
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", args.host, "--port", str(port)],
+            env=env,
+        ))
+        print(f"[serve] instance {idx} on port {port} (pid {procs[-1].pid})")
+
+    def shutdown(*_):
+        for proc in procs:
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGINT)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        # Stop everything as soon as one instance dies: a hole in the ring
+        # would strand every session that hashes to it
+        while all(proc.poll() is None for proc in procs):
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown()
+        for proc in procs:
+            proc.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# backend/tools/stream_replay.py
+"""
+Send a recorded WebM file to /ws/focus the way the browser streams it, and
+print the focus results that come back. Handy for checking stream ingest
+without a webcam:
+
+    cd backend
+    python -m tools.stream_replay recording.webm --url ws://localhost:8000
+
+Record a file with the browser's MediaRecorder, or with ffmpeg:
+
+    ffmpeg -f v4l2 -i /dev/video0 -t 30 -c:v libvpx -s 320x240 recording.webm
+
+Chunks are sent at the recording's real-time pace by default (--speed 0 sends
+as fast as the server accepts them).
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+
+import websockets
+
+# Roughly what MediaRecorder produces with a 200 ms timeslice at 320x240
+_CHUNK_BYTES = 8 * 1024
+
+
+async def replay(path: str, url: str, mime: str, speed: float, duration_s: float) -> int:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    session_id = uuid.uuid4().hex
+    results = 0
+    async with websockets.connect(f"{url}/ws/focus?session_id={session_id}") as ws:
+        await ws.send(json.dumps({"type": "stream_start", "mime": mime}))
+        reply = json.loads(await ws.recv())
+        if reply.get("type") != "stream_ready":
+            print(f"Server won't take the stream: {reply}")
+            return 1
+
+        async def send_chunks():
+            # Spread the file evenly over its duration
+            n_chunks = max(1, -(-len(data) // _CHUNK_BYTES))
+            delay = duration_s / n_chunks / speed if speed > 0 else 0.0
+            for i in range(0, len(data), _CHUNK_BYTES):
+                await ws.send(data[i:i + _CHUNK_BYTES])
+                if delay:
+                    await asyncio.sleep(delay)
+            # Leave time for the last frames to come back
+            await asyncio.sleep(2.0)
+            await ws.close()
+
+        sender = asyncio.create_task(send_chunks())
+        t0 = time.monotonic()
+        try:
+            async for msg in ws:
+                res = json.loads(msg)
+                if res.get("type") == "stream_unsupported":
+                    print(f"Stream rejected mid-way: {res}")
+                    break
+                if res.get("type") != "focus_result":
+                    continue
+                results += 1
+                print(
+                    f"{time.monotonic() - t0:7.2f}s  score {res['focus_score']:.2f}  "
+                    f"phone {res['phone']}  tired {res['tired']}  fidgety {res['fidgety']}  away {res['away']}"
+                )
+        except websockets.ConnectionClosed:
+            pass
+        sender.cancel()
+
+    print(f"{results} focus results for {len(data)} bytes")
+    return 0 if results else 1
+
+
+def _duration_s(path: str) -> float:
+    import av
+
+    with av.open(path) as container:
+        stream = container.streams.video[0]
+        if stream.duration is not None and stream.time_base is not None:
+            return float(stream.duration * stream.time_base)
+        if container.duration is not None:
+            return container.duration / 1_000_000
+        return float(sum(1 for _ in container.decode(stream))) / float(stream.average_rate or 30)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="WebM file to stream")
+    parser.add_argument("--url", default="ws://localhost:8000", help="backend base URL")
+    parser.add_argument("--mime", default="video/webm;codecs=vp8")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed; 0 = as fast as possible")
+    args = parser.parse_args(argv)
+
+    return asyncio.run(replay(args.path, args.url, args.mime, args.speed, _duration_s(args.path)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
 # backend/utils/image_utils.py
+import base64
+
 from fastapi import UploadFile
 import numpy as np
 import cv2
@@ -14,3 +16,15 @@ async def read_image_to_ndarray(file: UploadFile) -> np.ndarray:
     if img is None:
         raise ValueError("Could not decode image")
     return img
+
+
+def decode_base64_image(base64_image: str) -> np.ndarray:
+    """
+    Decode a base64 JPEG/PNG (what the webcam feed sends) into a BGR image.
+    """
+    img_bytes = base64.b64decode(base64_image)
+    np_img = np.frombuffer(img_bytes, np.uint8)
+    img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode image")
+    return img
@@ -74,6 +74,7 @@ export default function SessionSummary() {
 
   // What the previous page passed in via navigate("/session-summary", { state: { stats: ... } })
   const sessionInput: FrontendSessionInput | undefined = location.state?.stats;
+  const sessionId: string | undefined = location.state?.sessionId;
 
   const [stats, setStats] = useState<SessionStats | null>(null);
   const [loading, setLoading] = useState<boolean>(true);
@@ -93,7 +94,8 @@ export default function SessionSummary() {
       };
 
       try {
-        const res = await fetch("/api/focus/summary", {
+        const query = sessionId ? `?reset=true&session_id=${sessionId}` : "";
+        const res = await fetch(`/api/focus/summary${query}`, {
           method: "GET"
         });
 
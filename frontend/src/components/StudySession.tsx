@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { useLocation, useNavigate } from "react-router-dom";
 import SessionTimer from "./study-session/SessionTimer";
 import WebcamFeed from "./study-session/WebcamFeed";
@@ -35,6 +35,15 @@ export default function StudySession() {
 
   const [interruptionCount, setInterruptionCount] = useState(0);
 
+  // Identifies this study session to the backend (routing, summary, history)
+  const [sessionId] = useState(() => crypto.randomUUID());
+
+  // Signed-in user, so the backend can keep this session in their history
+  const [userId, setUserId] = useState<string | undefined>(undefined);
+  useEffect(() => {
+    supabase.auth.getUser().then(({ data: { user } }) => setUserId(user?.id));
+  }, []);
+
   // Handle focus lost from WebcamFeed / WS
   const handleFocusLost = ({ phone, tired, fidgety }: { phone: boolean; tired: boolean; fidgety: boolean }) => {
     let message = "";
@@ -55,7 +64,8 @@ export default function StudySession() {
   };
 
   // Hook to handle WebSocket notifications
-  const { incoming: incomingNotif, sendFrame, isFocused } = useWebSocketNotifs(handleFocusLost);
+  const { incoming: incomingNotif, sendFrame, sendChunk, isFocused, frameIntervalMs, streamMode, streamEpoch } =
+    useWebSocketNotifs(handleFocusLost, userId, sessionId);
 
   const handleVideoRequest = (videoUrl: string) => setCurrentVideo(videoUrl);
   const handleCloseVideo = () => setCurrentVideo(null);
@@ -69,7 +79,8 @@ export default function StudySession() {
     let focusScore = 0; // fallback
 
     try {
-      const res = await fetch("/api/focus/summary?reset=true", {
+      // Counters are per session now; the summary page reads them once more and resets
+      const res = await fetch(`/api/focus/summary?session_id=${sessionId}`, {
         method: "GET",
       });
   
@@ -105,6 +116,7 @@ export default function StudySession() {
     // Pass frontend-tracked counts to the summary page
     navigate("/session-summary", {
             state: {
+              sessionId,
               stats: {
                 duration: stats.duration,
                 breaks: stats.breaks,
@@ -164,7 +176,15 @@ export default function StudySession() {
             breakDuration={breakDuration * 60}
             onSessionEnd={handleSessionEnd}
           />
-          <WebcamFeed sendFrame={sendFrame} isFocused={isFocused} onFocusLost={handleFocusLost} />
+          <WebcamFeed
+            sendFrame={sendFrame}
+            sendChunk={sendChunk}
+            isFocused={isFocused}
+            onFocusLost={handleFocusLost}
+            frameIntervalMs={frameIntervalMs}
+            streamMode={streamMode}
+            streamEpoch={streamEpoch}
+          />
           <FocusNotifications notifications={notifications} />
         </div>
       </div>
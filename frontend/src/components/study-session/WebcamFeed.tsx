@@ -3,14 +3,31 @@ import { Camera, CameraOff, AlertCircle } from "lucide-react";
 import { Card } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Alert, AlertDescription } from "@/components/ui/alert";
+import { STREAM_MIME, StreamMode } from "@/hooks/useWebSocketNotifs";
 
 interface WebcamFeedProps {
   onFocusLost: ({ phone, tired, fidgety }: { phone: boolean; tired: boolean; fidgety: boolean }) => void;
   sendFrame: (base64: string) => void;
+  sendChunk: (chunk: Blob, epoch: number) => void;
   isFocused: boolean;
+  frameIntervalMs?: number;
+  streamMode: StreamMode;
+  streamEpoch: number;
 }
 
-export default function WebcamFeed({ onFocusLost, sendFrame, isFocused }: WebcamFeedProps) {
+// How often MediaRecorder hands us a chunk to send, and its target bitrate
+const STREAM_TIMESLICE_MS = 200;
+const STREAM_BITS_PER_SECOND = 250_000;
+
+export default function WebcamFeed({
+  onFocusLost,
+  sendFrame,
+  sendChunk,
+  isFocused,
+  frameIntervalMs = 500,
+  streamMode,
+  streamEpoch,
+}: WebcamFeedProps) {
   const [hasPermission, setHasPermission] = useState<boolean | null>(null);
   const [stream, setStream] = useState<MediaStream | null>(null);
   const videoRef = useRef<HTMLVideoElement>(null);
@@ -35,9 +52,26 @@ export default function WebcamFeed({ onFocusLost, sendFrame, isFocused }: Webcam
     }
   };
 
+  // Stream compressed video when the server takes it
+  useEffect(() => {
+    if (!hasPermission || !stream || streamMode !== "stream") return;
+
+    const recorder = new MediaRecorder(stream, { mimeType: STREAM_MIME, videoBitsPerSecond: STREAM_BITS_PER_SECOND });
+    recorder.ondataavailable = (e) => {
+      if (e.data.size > 0) sendChunk(e.data, streamEpoch);
+    };
+    recorder.start(STREAM_TIMESLICE_MS);
+
+    return () => {
+      // The last chunk belongs to the old stream, don't send it into a new one
+      recorder.ondataavailable = null;
+      if (recorder.state !== "inactive") recorder.stop();
+    };
+  }, [hasPermission, stream, streamMode, streamEpoch, sendChunk]);
+
   // Capture frames
   useEffect(() => {
-    if (!hasPermission || !videoRef.current) return;
+    if (!hasPermission || !videoRef.current || streamMode !== "frames") return;
 
     const interval = setInterval(() => {
       const video = videoRef.current;
@@ -57,10 +91,10 @@ export default function WebcamFeed({ onFocusLost, sendFrame, isFocused }: Webcam
       const base64Image = dataUrl.split(",")[1];
 
       sendFrame(base64Image);
-    }, 500);
+    }, frameIntervalMs);
 
     return () => clearInterval(interval);
-  }, [hasPermission, sendFrame]);
+  }, [hasPermission, sendFrame, frameIntervalMs, streamMode]);
 
   return (
     <Card className="m-4 p-4 bg-gradient-to-br from-blue-100 to-purple-100 border-blue-200 rounded-2xl shadow-lg flex-shrink-0">
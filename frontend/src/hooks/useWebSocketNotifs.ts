@@ -1,8 +1,52 @@
 import { useEffect, useState, useRef, useCallback } from "react";
 import { AppNotification } from "@/components/study-session/NotificationManager";
 
+// Compressed video we stream to the backend instead of JPEG stills, when the
+// browser can record it and the server can decode it
+export const STREAM_MIME = "video/webm;codecs=vp8";
+const canStream = () => typeof MediaRecorder !== "undefined" && MediaRecorder.isTypeSupported(STREAM_MIME);
+
+// "pending" until the server answers stream_start
+export type StreamMode = "pending" | "stream" | "frames";
+
+// Focus results come back as a few bytes holding just what we read
+const RESULT_FIELDS = ["phone", "tired", "fidgety", "frame_interval_ms"];
+
+// Binary focus_result layout, from the server's encoding_ready message
+interface ResultLayout {
+  flags: string[];
+  flags_bytes: number;
+  values: [string, "f" | "B" | "H"][];
+  size: number;
+}
+
+const decodeResult = (buf: ArrayBuffer, layout: ResultLayout) => {
+  const view = new DataView(buf);
+  const data: Record<string, unknown> = { type: "focus_result" };
+  const flags = layout.flags_bytes === 1 ? view.getUint8(0) : view.getUint16(0, true);
+  layout.flags.forEach((name, bit) => {
+    data[name] = (flags & (1 << bit)) !== 0;
+  });
+  let offset = layout.flags_bytes;
+  for (const [name, code] of layout.values) {
+    if (code === "f") {
+      data[name] = view.getFloat32(offset, true);
+      offset += 4;
+    } else if (code === "H") {
+      data[name] = view.getUint16(offset, true);
+      offset += 2;
+    } else {
+      data[name] = view.getUint8(offset);
+      offset += 1;
+    }
+  }
+  return data;
+};
+
 export default function useWebSocketNotifs(
-  onFocusLost: (data: { phone: boolean; tired: boolean; fidgety: boolean }) => void
+  onFocusLost: (data: { phone: boolean; tired: boolean; fidgety: boolean }) => void,
+  userId?: string,
+  sessionId?: string
 ) {
   const [incoming, setIncoming] = useState<AppNotification | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
@@ -10,27 +54,104 @@ export default function useWebSocketNotifs(
   // Focused state logic
   const [isFocused, setIsFocused] = useState(true);
 
+  // Read through refs inside the socket handlers: as effect dependencies they
+  // would reconnect on every distraction, and each new connection starts the
+  // server-side detectors (blink / fidget history, Holistic, stream) from scratch
+  const isFocusedRef = useRef(isFocused);
+  isFocusedRef.current = isFocused;
+  const onFocusLostRef = useRef(onFocusLost);
+  onFocusLostRef.current = onFocusLost;
+
+  // How often to send frames; the server asks for fewer when it's overloaded
+  const [frameIntervalMs, setFrameIntervalMs] = useState(500);
+
+  // Video stream vs stills; the epoch changes whenever the server is ready
+  // for a fresh stream (new connection), so the recorder restarts with a header
+  const [streamMode, setStreamMode] = useState<StreamMode>("pending");
+  const [streamEpoch, setStreamEpoch] = useState(0);
+  // Epoch the current connection accepts chunks for (null = none yet)
+  const activeEpochRef = useRef<number | null>(null);
+
   useEffect(() => {
-    const ws = new WebSocket("ws://localhost:8000/ws/focus");
-    wsRef.current = ws;
+    // session_id keeps reconnects on the backend instance holding this
+    // session's detectors; user_id files it under the user's history
+    const params = new URLSearchParams();
+    if (sessionId) params.set("session_id", sessionId);
+    if (userId) params.set("user_id", userId);
+    params.set("encoding", "struct");
+    params.set("fields", RESULT_FIELDS.join(","));
+    let ws: WebSocket;
+    let layout: ResultLayout | null = null;
+    // Pending reconnect after the server turned us away
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const connect = (url: string) => {
+      ws = new WebSocket(url);
+      ws.binaryType = "arraybuffer";
+      wsRef.current = ws;
+      // Each connection announces its own layout
+      layout = null;
 
-    ws.onopen = () => console.log("WS CONNECTED");
-    ws.onclose = () => console.log("WS CLOSED");
-    ws.onerror = (err) => console.error("WS ERROR:", err);
+      ws.onopen = () => {
+        console.log("WS CONNECTED");
+        activeEpochRef.current = null;
+        if (canStream()) {
+          ws.send(JSON.stringify({ type: "stream_start", mime: STREAM_MIME }));
+        } else {
+          setStreamMode("frames");
+        }
+      };
+      ws.onclose = () => console.log("WS CLOSED");
+      ws.onerror = (err) => console.error("WS ERROR:", err);
 
-    ws.onmessage = (event) => {
-      try {
-        const data = JSON.parse(event.data);
+      const handleData = (data: any) => {
+        if (data.type === "encoding_ready") {
+          layout = data.layout ?? null;
+          return;
+        }
+        if (data.type === "redirect") {
+          // This session lives on another backend instance
+          ws.close();
+          connect(data.url);
+          return;
+        }
+        if (data.type === "rejected") {
+          // The server closes the socket right after; come back when it says
+          const retryAfter = typeof data.retry_after === "number" ? data.retry_after : 10;
+          console.warn(`Focus server busy, retry in ${retryAfter}s`);
+          const url = ws.url;
+          retryTimer = setTimeout(() => connect(url), retryAfter * 1000);
+          return;
+        }
+        if (data.type === "stream_ready") {
+          setStreamMode("stream");
+          setStreamEpoch((e) => {
+            activeEpochRef.current = e + 1;
+            return e + 1;
+          });
+          return;
+        }
+        if (data.type === "stream_unsupported") {
+          console.warn(`Focus server can't take video (${data.reason}), sending frames`);
+          activeEpochRef.current = null;
+          setStreamMode("frames");
+          return;
+        }
         if (data.type !== "focus_result") return;
 
+        if (typeof data.frame_interval_ms === "number") {
+          setFrameIntervalMs(data.frame_interval_ms);
+        }
+
         const phone = !!data.phone;
         const tired = !!data.tired;
         const fidgety = !!data.fidgety;
         const distracted = phone || tired || fidgety;
 
-        if (distracted && isFocused) {
+        if (distracted && isFocusedRef.current) {
+          isFocusedRef.current = false;
           setIsFocused(false);
-          onFocusLost({ phone, tired, fidgety });
+          onFocusLostRef.current({ phone, tired, fidgety });
           // Back to focused after 3s
           setTimeout(() => setIsFocused(true), 3000);
         }
@@ -64,13 +185,30 @@ export default function useWebSocketNotifs(
           : null;
 
         if (notif) setIncoming(notif);
-      } catch (e) {
-        console.error("Invalid WS message:", e);
-      }
+      };
+
+      ws.onmessage = (event) => {
+        try {
+          if (event.data instanceof ArrayBuffer) {
+            // Binary messages are always focus results
+            if (!layout) return;
+            handleData(decodeResult(event.data, layout));
+          } else {
+            handleData(JSON.parse(event.data));
+          }
+        } catch (e) {
+          console.error("Invalid WS message:", e);
+        }
+      };
     };
 
-    return () => ws.close();
-  }, [isFocused, onFocusLost]);
+    connect(`ws://localhost:8000/ws/focus?${params}`);
+
+    return () => {
+      clearTimeout(retryTimer);
+      ws.close();
+    };
+  }, [userId, sessionId]);
 
   // Function to send frames to backend
   const sendFrame = useCallback((base64Image: string) => {
@@ -79,5 +217,14 @@ export default function useWebSocketNotifs(
     ws.send(JSON.stringify({ type: "frame", image: base64Image }));
   }, []);
 
-  return { incoming, sendFrame, isFocused };
+  // Function to send a recorded video chunk to backend. Chunks from a
+  // recorder started for an older epoch (previous connection) would corrupt
+  // the stream the server is decoding now, so they're dropped.
+  const sendChunk = useCallback((chunk: Blob, epoch: number) => {
+    const ws = wsRef.current;
+    if (!ws || ws.readyState !== WebSocket.OPEN || epoch !== activeEpochRef.current) return;
+    ws.send(chunk);
+  }, []);
+
+  return { incoming, sendFrame, sendChunk, isFocused, frameIntervalMs, streamMode, streamEpoch };
 }
\ No newline at end of file